@@ -0,0 +1,137 @@
+"""
+Benchmark: HR booking-ID detection, openpyxl cell walk vs columnar search.
+
+Usage (from 15.python/):
+    python benchmarks/bench_booking_scan.py --cells 100000
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mvtools.booking import (  # noqa: E402
+    booking_ids,
+    scan_workbook_cells,
+    scan_workbook_columnar,
+    sheet_matches,
+)
+
+COLUMNS = 20
+
+
+# Previous detect_booking_id.py implementation, kept here as the baseline
+def detect_hr_pattern_in_excel(file_path):
+    pattern = re.compile(r'HR\d+', re.IGNORECASE)
+    results = []
+    wb = openpyxl.load_workbook(file_path, data_only=True)
+    for sheet_name in wb.sheetnames:
+        sheet = wb[sheet_name]
+        for row in sheet.iter_rows():
+            for cell in row:
+                if cell.value:
+                    if pattern.search(str(cell.value)):
+                        results.append({
+                            'file': Path(file_path).name,
+                            'sheet': sheet_name,
+                            'cell': cell.coordinate,
+                            'value': cell.value
+                        })
+    return results
+
+
+def make_workbook(path: Path, cells: int, seed: int = 0):
+    """Itinerary-like sheet: text, numbers, blanks and ~1% booking IDs."""
+    rng = np.random.default_rng(seed)
+    rows = -(-cells // COLUMNS)
+    words = ["Hanoi", "Day 2 - Ha Long cruise", "Breakfast", "Transfer", "Hoi An"]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for _ in range(rows):
+        kind = rng.random(COLUMNS)
+        row = []
+        for k in kind:
+            if k < 0.01:
+                row.append(f"Booking HR{rng.integers(100000, 999999)} confirmed")
+            elif k < 0.2:
+                row.append(None)
+            elif k < 0.5:
+                row.append(int(rng.integers(0, 10_000)))
+            else:
+                row.append(words[int(k * 100) % len(words)])
+        ws.append(row)
+    wb.save(path)
+
+
+def search_cells(rows):
+    """Search step of the cell walk, on already-loaded values."""
+    return [
+        (r, c, booking_ids(str(v)))
+        for r, row in enumerate(rows, start=1)
+        for c, v in enumerate(row, start=1)
+        if v is not None and v != "" and HR.search(str(v))
+    ]
+
+
+HR = re.compile(r'HR\d+', re.IGNORECASE)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def best_of(n, fn, *args):
+    return min(timed(fn, *args)[1] for _ in range(n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cells", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "itinerary.xlsx"
+        make_workbook(path, args.cells)
+
+        legacy, t_legacy = timed(detect_hr_pattern_in_excel, path)
+        cells, t_cells = timed(scan_workbook_cells, path)
+        columnar, t_columnar = timed(scan_workbook_columnar, path)
+
+        # Search step alone, on values already read from the sheet
+        wb = openpyxl.load_workbook(path, read_only=True)
+        rows = list(wb.active.iter_rows(values_only=True))
+        wb.close()
+        t_search_cells = best_of(5, search_cells, rows)
+        t_search_columnar = best_of(
+            5, lambda: sheet_matches(pd.DataFrame(rows, dtype=object))
+        )
+
+    key = lambda m: (m["sheet"], m["cell"])  # noqa: E731
+    assert [key(m) for m in legacy] == [key(m) for m in cells], "cell walk matches differ"
+    assert [key(m) for m in cells] == [key(m) for m in columnar], "columnar matches differ"
+    assert [m["booking_ids"] for m in cells] == [m["booking_ids"] for m in columnar]
+
+    print(f"cells:             {args.cells:,} ({len(columnar):,} with a booking ID)")
+    print(f"full load + walk:  {t_legacy:8.3f} s")
+    print(f"read-only walk:    {t_cells:8.3f} s")
+    print(f"columnar:          {t_columnar:8.3f} s")
+    print(f"speedup:           {t_legacy / t_columnar:8.1f}x vs full load")
+    print("search step only (values already loaded, best of 5):")
+    print(f"  per-cell regex:  {t_search_cells:8.3f} s")
+    print(f"  vectorized:      {t_search_columnar:8.3f} s")
+    print(f"  speedup:         {t_search_cells / t_search_columnar:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: mv-tool-3 check-in date parsing, row-wise apply vs vectorized.
+
+Usage (from 15.python/):
+    python benchmarks/bench_checkin_dates.py --rows 100000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mvtools.funnel import parse_daily_dates  # noqa: E402
+
+# Previous mv-tool-3 implementation, kept here as the baseline
+DATE_REGEX = re.compile(r"^[A-Za-z]+ \d{1,2}, \d{4}$")
+
+
+def normalize_checkin(val):
+    if pd.isna(val):
+        return None
+
+    val = str(val).strip()
+
+    if not DATE_REGEX.match(val):
+        return None
+
+    return pd.to_datetime(val).date()
+
+
+def make_checkin_column(rows: int, seed: int = 0) -> pd.Series:
+    """Daily labels mixed with pivot headers / totals, like a signup export."""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 540, rows), unit="D")
+    labels = pd.Series(days.strftime("%B ") + days.day.astype(str) + days.strftime(", %Y"))
+
+    # Some exports abbreviate months, including the non-%b "Sept"
+    short = rng.random(rows) < 0.05
+    labels[short] = (
+        pd.Series(days.strftime("%b "))[short].str.replace("Sep ", "Sept ")
+        + days.day.astype(str)[short] + pd.Series(days.strftime(", %Y"))[short]
+    )
+
+    noise = rng.random(rows) < 0.03
+    labels[noise] = rng.choice(["Total", "Grand Total", "2025", "", None], noise.sum())
+    return labels
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    values = make_checkin_column(args.rows)
+
+    legacy, t_legacy = timed(lambda v: v.apply(normalize_checkin), values)
+    fast, t_fast = timed(parse_daily_dates, values)
+
+    legacy = pd.to_datetime(legacy)
+    assert legacy.isna().sum() == fast.isna().sum(), "dropped-row counts differ"
+    assert legacy.equals(fast.astype(legacy.dtype)), "parsed dates differ"
+
+    print(f"rows:        {args.rows:,} ({fast.isna().sum():,} non-daily dropped)")
+    print(f"apply:       {t_legacy:8.3f} s")
+    print(f"vectorized:  {t_fast:8.3f} s")
+    print(f"speedup:     {t_legacy / t_fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
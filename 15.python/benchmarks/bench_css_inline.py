@@ -0,0 +1,60 @@
+"""
+Benchmark: CSS inlining per rendered email, stylesheet re-parsed vs cached.
+
+Usage (from 15.python/):
+    python benchmarks/bench_css_inline.py --renders 2000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mvtools.css_inline import inline_css  # noqa: E402
+from mvtools.templates import load_template  # noqa: E402
+
+REPO = Path(__file__).resolve().parents[2]
+TEMPLATES = [
+    REPO / "9.welcome" / "email_welcome_en.html",
+    REPO / "28.wrapped2025" / "platinum-en.html",
+    REPO / "5.einvoice" / "einvoice-pms-updated.html",
+    # Its <style> sits inside a downlevel-hidden <!--[if !mso]> comment, so
+    # nothing is inlined: this one measures the no-stylesheet fast path
+    REPO / "1.bk-loyalty" / "bk-conf-EN.html",
+]
+
+
+def sample_values(fields, n):
+    return {f: f"{f} value {n} & co" for f in fields}
+
+
+def run(documents, cache):
+    start = time.perf_counter()
+    for doc in documents:
+        inline_css(doc, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for path in TEMPLATES:
+        template = load_template(path)
+        documents = [template.render(sample_values(template.fields, n)) for n in range(args.renders)]
+        assert inline_css(documents[0], cache=False) == inline_css(documents[0]), path
+
+        t_naive = run(documents, cache=False)
+        t_cached = run(documents, cache=True)
+
+        print(f"{path.relative_to(REPO)} ({path.stat().st_size / 1024:.1f} KB)")
+        print(f"  re-parse per render:  {args.renders / t_naive:10,.0f} emails/s")
+        print(f"  cached stylesheet:    {args.renders / t_cached:10,.0f} emails/s")
+        print(f"  speedup:              {t_naive / t_cached:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
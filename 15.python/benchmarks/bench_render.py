@@ -0,0 +1,72 @@
+"""
+Benchmark: email template rendering, re.sub per render vs compiled + cached.
+
+Usage (from 15.python/):
+    python benchmarks/bench_render.py --renders 20000
+"""
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mvtools.templates import load_template  # noqa: E402
+
+REPO = Path(__file__).resolve().parents[2]
+TEMPLATES = [
+    REPO / "1.bk-loyalty" / "bk-conf-EN.html",
+    REPO / "28.wrapped2025" / "platinum-en.html",
+    REPO / "21.b2b-send-pass" / "b2b-send-pass-en.html",
+]
+
+
+# Naive baseline: read the file and substitute every placeholder per render
+def render_naive(path, values):
+    text = Path(path).read_text(encoding="utf-8")
+    return re.sub(
+        r"\{\{\s*\.?([A-Za-z0-9_]+)\s*\}\}",
+        lambda m: html.escape(str(values[m.group(1)])),
+        text,
+    )
+
+
+def render_compiled(path, values):
+    return load_template(path).render(values)
+
+
+def sample_values(fields, n):
+    return {f: f"{f} value {n} & co" for f in fields}
+
+
+def run(render, path, rows):
+    start = time.perf_counter()
+    for values in rows:
+        render(path, values)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for path in TEMPLATES:
+        fields = load_template(path).fields
+        rows = [sample_values(fields, n) for n in range(args.renders)]
+        assert render_naive(path, rows[0]) == render_compiled(path, rows[0]), path
+
+        t_naive = run(render_naive, path, rows)
+        t_compiled = run(render_compiled, path, rows)
+
+        print(f"{path.relative_to(REPO)} ({len(fields)} fields, {path.stat().st_size / 1024:.1f} KB)")
+        print(f"  re.sub per render:  {args.renders / t_naive:10,.0f} renders/s")
+        print(f"  compiled + cached:  {args.renders / t_compiled:10,.0f} renders/s")
+        print(f"  speedup:            {t_naive / t_compiled:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
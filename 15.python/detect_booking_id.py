@@ -1,87 +1,90 @@
-import openpyxl
-import re
-from pathlib import Path
-
-def detect_hr_pattern_in_excel(file_path):
-    """
-    Detect cells containing pattern HRxxxxxx (HR followed by digits)
-    in an Excel file.
-    
-    Args:
-        file_path: Path to the Excel file
-        
-    Returns:
-        List of dictionaries containing sheet name, cell address, and cell value
-    """
-    # Pattern: HR followed by one or more digits
-    pattern = re.compile(r'HR\d+', re.IGNORECASE)
-    
-    results = []
-    
-    # Load the workbook
-    wb = openpyxl.load_workbook(file_path, data_only=True)
-    
-    # Iterate through all sheets
-    for sheet_name in wb.sheetnames:
-        sheet = wb[sheet_name]
-        
-        # Iterate through all cells in the sheet
-        for row in sheet.iter_rows():
-            for cell in row:
-                if cell.value:
-                    # Convert cell value to string and search for pattern
-                    cell_str = str(cell.value)
-                    if pattern.search(cell_str):
-                        results.append({
-                            'file': Path(file_path).name,
-                            'sheet': sheet_name,
-                            'cell': cell.coordinate,
-                            'value': cell.value
-                        })
-    
-    return results
-
-
-def main():
-    # List of uploaded files
-    files = [
-        '/Users/hchinhtrung/Documents/GitHub/mvillage-email-template/15.python/Best of Vietnam for Teenager.xlsx',
-        '/Users/hchinhtrung/Documents/GitHub/mvillage-email-template/15.python/Vietnam Explorer for teenager.xlsx',
-        '/Users/hchinhtrung/Documents/GitHub/mvillage-email-template/15.python/Vietnam Family holiday.xlsx'
-    ]
-    
-    all_results = []
-    
-    # Process each file
-    for file_path in files:
-        print(f"\n{'='*60}")
-        print(f"Processing: {Path(file_path).name}")
-        print(f"{'='*60}")
-        
-        try:
-            results = detect_hr_pattern_in_excel(file_path)
-            
-            if results:
-                print(f"Found {len(results)} cell(s) with HR pattern:\n")
-                for result in results:
-                    print(f"  Sheet: {result['sheet']}")
-                    print(f"  Cell:  {result['cell']}")
-                    print(f"  Value: {result['value']}")
-                    print()
-                all_results.extend(results)
+"""
+Find booking IDs (HRxxxxxx) in tour-itinerary workbooks.
+
+Matches are written as they are found, one record per cell, as JSONL or
+CSV. Progress and the summary go to stderr.
+
+Usage:
+    python detect_booking_id.py itineraries/ "archive/**/*.xlsx" --out matches.jsonl
+    python detect_booking_id.py "Vietnam Family holiday.xlsx" --format csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from mvtools.booking import DEFAULT_ENGINE, ENGINES, find_workbooks, scan_files
+
+FORMATS = ("jsonl", "csv")
+FIELDS = ["file", "path", "sheet", "cell", "value", "booking_ids"]
+
+
+class MatchWriter:
+    """Write match records incrementally as JSONL or CSV."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(stream, fieldnames=FIELDS, extrasaction="ignore")
+            self.writer.writeheader()
+
+    def write(self, matches):
+        for match in matches:
+            if self.fmt == "csv":
+                self.writer.writerow({**match, "booking_ids": " ".join(match["booking_ids"])})
             else:
-                print("No cells with HR pattern found.")
-                
-        except Exception as e:
-            print(f"Error processing file: {e}")
-    
-    # Summary
-    print(f"\n{'='*60}")
-    print(f"SUMMARY: Found {len(all_results)} total cell(s) with HR pattern")
-    print(f"{'='*60}")
-    
-    return all_results
+                self.stream.write(json.dumps(match, ensure_ascii=False, default=str) + "\n")
+        self.stream.flush()
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find HRxxxxxx booking IDs in Excel workbooks")
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="Workbooks, directories (searched recursively) or glob patterns"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--engine", choices=ENGINES, default=DEFAULT_ENGINE,
+        help="cells: regex per cell, streamed row by row; columnar: vectorized search per block of rows"
+    )
+    args = parser.parse_args(argv)
+
+    files = find_workbooks(args.inputs)
+    if not files:
+        parser.error("no .xlsx / .xlsm workbooks found")
+
+    log(f"Scanning {len(files)} workbook(s) with {args.workers} worker(s)")
+
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    total = errors = 0
+
+    try:
+        writer = MatchWriter(out, args.format)
+
+        for path, matches, error in scan_files(files, workers=args.workers, engine=args.engine):
+            if error:
+                errors += 1
+                log(f"[ERROR] {path}: {error}")
+                continue
+
+            writer.write(matches)
+            total += len(matches)
+            log(f"[OK] {path}: {len(matches)} cell(s)")
+    finally:
+        if args.out:
+            out.close()
+
+    log(f"SUMMARY: Found {total} total cell(s) with HR pattern in {len(files)} workbook(s), {errors} error(s)")
 
 
 if __name__ == "__main__":
-    results = main()
\ No newline at end of file
+    main()
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 
+from mvtools.cube import build_cube
+from mvtools.loader import RESERVATION_DTYPES, SIGNUP_DTYPES, file_digest, load_file
+from mvtools.metrics import add_rank, conversion_rate
+
 st.set_page_config(page_title="Tool 1: Recruit CR Analyzer", layout="wide")
 st.title("Tool 1: Recruit Signup & CR Analyzer")
 
@@ -15,18 +19,12 @@ with col2:
     reservation_file = st.file_uploader("📤 Upload Reservation File", type=["csv", "xlsx"])
 
 
-def load_file(file):
-    if file.name.endswith(".csv"):
-        return pd.read_csv(file)
-    return pd.read_excel(file)
-
-
 # ======================
 # MAIN
 # ======================
 if signup_file and reservation_file:
-    signup_df = load_file(signup_file)
-    res_df = load_file(reservation_file)
+    signup_df = load_file(signup_file, dtype=SIGNUP_DTYPES)
+    res_df = load_file(reservation_file, dtype=RESERVATION_DTYPES)
 
     st.success("✅ Files uploaded successfully!")
 
@@ -103,38 +101,45 @@ if signup_file and reservation_file:
         max_value=max_date
     )
 
-    signup_f = signup_df[
-        (signup_df[SIGNUP_DATE].dt.date >= from_date) &
-        (signup_df[SIGNUP_DATE].dt.date <= to_date)
-    ]
-
-    res_f = res_df[
-        (res_df[RES_DATE].dt.date >= from_date) &
-        (res_df[RES_DATE].dt.date <= to_date)
-    ]
-
     # ======================
-    # Metrics
+    # Metrics (from the daily cube)
     # ======================
-    checkin_df = (
-        res_f
-        .groupby(['hotel_normalized', RES_CITY, 'brand_model'])[RES_TENANT]
-        .nunique()
-        .reset_index(name='checkin_count')
+    @st.cache_resource(max_entries=4, show_spinner="Building daily cube...")
+    def get_cube(signup_digest, res_digest, _signup_df, _res_df):
+        """Daily cube + hotel display names, built once per pair of uploads."""
+        cube = build_cube(
+            _res_df, _signup_df,
+            hotel_col='hotel_normalized',
+            city_col=RES_CITY,
+            brand_col='brand_model',
+            res_date_col=RES_DATE,
+            tenant_col=RES_TENANT,
+            signup_date_col=SIGNUP_DATE,
+            signup_count_col=SIGNUP_COUNT,
+        )
+        hotel_name_map = (
+            _res_df.groupby('hotel_normalized')[RES_HOTEL]
+            .first()
+            .to_dict()
+        )
+        return cube, hotel_name_map
+
+    cube, hotel_name_map = get_cube(
+        file_digest(signup_file.getvalue()),
+        file_digest(reservation_file.getvalue()),
+        signup_df,
+        res_df
     )
 
-    hotel_name_map = (
-        res_f.groupby('hotel_normalized')[RES_HOTEL]
-        .first()
-        .to_dict()
+    checkin_df = (
+        cube.checkins(from_date, to_date)
+        .rename(columns={'checkin': 'checkin_count'})
     )
     checkin_df['hotel_display'] = checkin_df['hotel_normalized'].map(hotel_name_map)
 
     recruit_df = (
-        signup_f
-        .groupby(['hotel_normalized', SIGNUP_CITY])[SIGNUP_COUNT]
-        .sum()
-        .reset_index(name='recruit_count')
+        cube.signup_totals(from_date, to_date)
+        .rename(columns={'signup': 'recruit_count'})
     )
 
     final_df = checkin_df.merge(
@@ -144,9 +149,24 @@ if signup_file and reservation_file:
     )
 
     final_df['recruit_count'] = final_df['recruit_count'].fillna(0).astype(int)
-    final_df['CR_percent'] = (
-        final_df['recruit_count'] / final_df['checkin_count'] * 100
-    ).round(2)
+    final_df['CR_percent'] = conversion_rate(
+        final_df['recruit_count'], final_df['checkin_count']
+    )
+
+    def rank_table(keys, by=None):
+        """Sum counts per keys, recompute CR and rank hotels within `by`."""
+        table = (
+            final_df
+            .groupby(keys)
+            .agg({'checkin_count': 'sum', 'recruit_count': 'sum'})
+            .reset_index()
+        )
+        table['CR_percent'] = conversion_rate(
+            table.recruit_count, table.checkin_count
+        )
+        table = add_rank(table, 'CR_percent', by, method='first', rank_col='Rank')
+        table['Rank'] = table['Rank'].astype(int)
+        return table.sort_values((by or []) + ['Rank']).reset_index(drop=True)
 
     # ======================
     # Overall Summary
@@ -169,19 +189,7 @@ if signup_file and reservation_file:
     st.divider()
     st.subheader("🏆 Hotel Ranking (Overall)")
 
-    overall = (
-        final_df
-        .groupby(['hotel_display', 'brand_model', RES_CITY])
-        .agg({'checkin_count': 'sum', 'recruit_count': 'sum'})
-        .reset_index()
-    )
-
-    overall['CR_percent'] = (
-        overall.recruit_count / overall.checkin_count * 100
-    ).round(2)
-
-    overall = overall.sort_values('CR_percent', ascending=False).reset_index(drop=True)
-    overall['Rank'] = range(1, len(overall) + 1)
+    overall = rank_table(['hotel_display', 'brand_model', RES_CITY])
 
     st.dataframe(
         overall.rename(columns={
@@ -202,22 +210,10 @@ if signup_file and reservation_file:
     st.divider()
     st.subheader("🌆 Hotel Ranking by City")
 
-    for city, city_df in final_df.groupby(RES_CITY):
-        st.markdown(f"### 📍 {city}")
-
-        city_rank = (
-            city_df
-            .groupby(['hotel_display', 'brand_model'])
-            .agg({'checkin_count': 'sum', 'recruit_count': 'sum'})
-            .reset_index()
-        )
-
-        city_rank['CR_percent'] = (
-            city_rank.recruit_count / city_rank.checkin_count * 100
-        ).round(2)
+    city_ranks = rank_table([RES_CITY, 'hotel_display', 'brand_model'], by=[RES_CITY])
 
-        city_rank = city_rank.sort_values('CR_percent', ascending=False).reset_index(drop=True)
-        city_rank['Rank'] = range(1, len(city_rank) + 1)
+    for city, city_rank in city_ranks.groupby(RES_CITY):
+        st.markdown(f"### 📍 {city}")
 
         s1, s2, s3 = st.columns(3)
         s1.metric("Check-ins", f"{int(city_rank.checkin_count.sum()):,}")
@@ -245,22 +241,10 @@ if signup_file and reservation_file:
     st.divider()
     st.subheader("🏷️ Hotel Ranking by Brand Model")
 
-    for brand_model, bm_df in final_df.groupby('brand_model'):
-        st.markdown(f"### 🏷️ {brand_model}")
-
-        bm_rank = (
-            bm_df
-            .groupby(['hotel_display', RES_CITY])
-            .agg({'checkin_count': 'sum', 'recruit_count': 'sum'})
-            .reset_index()
-        )
-
-        bm_rank['CR_percent'] = (
-            bm_rank.recruit_count / bm_rank.checkin_count * 100
-        ).round(2)
+    bm_ranks = rank_table(['brand_model', 'hotel_display', RES_CITY], by=['brand_model'])
 
-        bm_rank = bm_rank.sort_values('CR_percent', ascending=False).reset_index(drop=True)
-        bm_rank['Rank'] = range(1, len(bm_rank) + 1)
+    for brand_model, bm_rank in bm_ranks.groupby('brand_model'):
+        st.markdown(f"### 🏷️ {brand_model}")
 
         s1, s2, s3 = st.columns(3)
         s1.metric("Check-ins", f"{int(bm_rank.checkin_count.sum()):,}")
@@ -2,6 +2,19 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from mvtools.loader import RESERVATION_DTYPES, SIGNUP_DTYPES, file_digest, load_file
+from mvtools.ranking import (
+    CITY_ORDER,
+    RES_CITY,
+    RES_DATE,
+    city_overview,
+    period_metrics,
+    preprocess,
+    ranked_compare,
+    ranking_cube,
+    report_columns,
+)
+
 # ======================
 # Page config
 # ======================
@@ -17,42 +30,34 @@ with c1:
 with c2:
     reservation_file = st.file_uploader("📤 Upload Reservation File", type=["csv", "xlsx"])
 
-def load_file(file):
-    return pd.read_csv(file) if file.name.endswith(".csv") else pd.read_excel(file)
-
 if not signup_file or not reservation_file:
     st.info("👆 Upload both Signup & Reservation files to start")
     st.stop()
 
-signup_df = load_file(signup_file)
-res_df = load_file(reservation_file)
+signup_df = load_file(signup_file, dtype=SIGNUP_DTYPES)
+res_df = load_file(reservation_file, dtype=RESERVATION_DTYPES)
 
 # ======================
-# Column mapping
+# Preprocessing
 # ======================
-SIGNUP_HOTEL = "hotel_short_name"
-SIGNUP_DATE = signup_df.columns[4]
-SIGNUP_COUNT = signup_df.columns[5]
+signup_df, res_df, COLS = preprocess(signup_df, res_df)
 
-RES_HOTEL = "Hotel Name"
-RES_CITY = "City"
-RES_DATE = "Checkin"
-RES_TENANT = "tenant_id"
-BRAND_MODEL = res_df.columns[1]
+SIGNUP_DATE = COLS["signup_date"]
+BRAND_MODEL = COLS["brand_model"]
 
 # ======================
-# Preprocessing
+# Daily cube (built once per upload)
 # ======================
-signup_df["hotel_key"] = signup_df[SIGNUP_HOTEL].str.lower().str.strip()
-res_df["hotel_key"] = res_df[RES_HOTEL].str.lower().str.strip()
-
-signup_df[SIGNUP_DATE] = pd.to_datetime(signup_df[SIGNUP_DATE], errors="coerce")
-res_df[RES_DATE] = pd.to_datetime(res_df[RES_DATE], errors="coerce")
-
-signup_df[SIGNUP_COUNT] = pd.to_numeric(signup_df[SIGNUP_COUNT], errors="coerce").fillna(0)
-
-signup_df = signup_df.dropna(subset=[SIGNUP_DATE])
-res_df = res_df.dropna(subset=[RES_DATE])
+@st.cache_resource(max_entries=4, show_spinner="Building daily cube...")
+def get_cube(signup_digest, res_digest, _signup_df, _res_df):
+    return ranking_cube(_signup_df, _res_df, COLS)
+
+cube = get_cube(
+    file_digest(signup_file.getvalue()),
+    file_digest(reservation_file.getvalue()),
+    signup_df,
+    res_df
+)
 
 # ======================
 # Date selector
@@ -68,143 +73,38 @@ with c1:
 with c2:
     current_from, current_to = st.date_input("Current Period", value=(max_date, max_date))
 
-def filter_period(df, col, start, end):
-    return df[(df[col].dt.date >= start) & (df[col].dt.date <= end)]
-
-# ======================
-# Metric builder
-# ======================
-def build_metric(res, signup):
-    checkin = (
-        res.groupby(["hotel_key", RES_CITY, BRAND_MODEL])[RES_TENANT]
-        .nunique()
-        .reset_index(name="checkin")
-    )
-
-    signup = (
-        signup.groupby("hotel_key")[SIGNUP_COUNT]
-        .sum()
-        .reset_index(name="signup")
-    )
-
-    df = checkin.merge(signup, on="hotel_key", how="left").fillna(0)
-
-    df["cr"] = np.where(
-        df["checkin"] == 0, 0,
-        (df["signup"] / df["checkin"] * 100).round(2)
-    )
-    return df
-
-last_df = build_metric(
-    filter_period(res_df, RES_DATE, last_from, last_to),
-    filter_period(signup_df, SIGNUP_DATE, last_from, last_to)
-)
-
-current_df = build_metric(
-    filter_period(res_df, RES_DATE, current_from, current_to),
-    filter_period(signup_df, SIGNUP_DATE, current_from, current_to)
-)
-
-# ======================
-# Ranking functions
-# ======================
-def add_global_rank(df):
-    df = df.copy()
-    df["rank"] = df["cr"].rank(ascending=False, method="dense")
-    return df
-
-def add_city_rank(df):
-    df = df.copy()
-    df["rank"] = df.groupby(RES_CITY)["cr"].rank(ascending=False, method="dense")
-    return df
-
-def add_city_brand_rank(df):
-    df = df.copy()
-    df["rank"] = df.groupby([RES_CITY, BRAND_MODEL])["cr"].rank(
-        ascending=False, method="dense"
-    )
-    return df
-
 # ======================
-# Compare helper
+# Metrics + ranking
 # ======================
-def build_compare(last, current):
-    df = last.merge(
-        current,
-        on=["hotel_key", RES_CITY, BRAND_MODEL],
-        suffixes=("_last", "_current"),
-        how="outer"
-    ).fillna(0)
-
-    df["rank_change"] = df["rank_last"] - df["rank_current"]
-
-    df["checkin_change_%"] = np.where(
-        df["checkin_last"] == 0, 0,
-        (df["checkin_current"] / df["checkin_last"]) - 1
-    )
-
-    df["signup_change_%"] = np.where(
-        df["signup_last"] == 0, 0,
-        (df["signup_current"] / df["signup_last"]) - 1
-    )
+last_df = period_metrics(cube, last_from, last_to)
+current_df = period_metrics(cube, current_from, current_to)
 
-    df["cr_change_%"] = np.where(
-        df["cr_last"] == 0, 0,
-        (df["cr_current"] / df["cr_last"]) - 1
-    )
+def build_ranked_compare(level):
+    return ranked_compare(last_df, current_df, BRAND_MODEL, level)
 
-    return df
-
-# ======================
-# Column ordering
-# ======================
 def reorder_columns(df):
-    df = df.copy()
-
-    # ======================
-    # FORMAT hotel_key
-    # ======================
-    if "hotel_key" in df.columns:
-        df["hotel_key"] = df["hotel_key"].str.upper()
-
-    cols = [
-        # Dimensions
-        "hotel_key", RES_CITY, BRAND_MODEL,
-
-        # Rank
-        "rank_last", "rank_current", "rank_change",
-
-        # Checkin
-        "checkin_last", "checkin_current", "checkin_change_%",
-
-        # Signup
-        "signup_last", "signup_current", "signup_change_%",
-
-        # CR
-        "cr_last", "cr_current", "cr_change_%"
-    ]
-
-    return df[[c for c in cols if c in df.columns]]
+    return report_columns(df, BRAND_MODEL)
 
 # ======================
 # Styling helpers
 # ======================
-def color_change(val):
-    try:
-        val = float(val)
-    except:
-        return ""
-
-    if val <= -0.3:
-        return "background-color:#e74c3c;color:white;"
-    elif val <= -0.05:
-        return "background-color:#f39c12;color:black;"
-    elif val < 0.05:
-        return "background-color:#ffffff;color:black;"
-    elif val < 0.3:
-        return "background-color:#2ecc71;color:black;"
-    else:
-        return "background-color:#27ae60;color:white;"
+CHANGE_STYLES = [
+    "background-color:#e74c3c;color:white;",
+    "background-color:#f39c12;color:black;",
+    "background-color:#ffffff;color:black;",
+    "background-color:#2ecc71;color:black;",
+    "background-color:#27ae60;color:white;",
+]
+
+def color_change(col):
+    """CSS for a whole change column at once (bins at ±5% / ±30%)."""
+    val = pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [val <= -0.3, val <= -0.05, val < 0.05, val < 0.3, val >= 0.3],
+            CHANGE_STYLES,
+            ""
+        )
 
 def style_df(df):
     styler = df.style
@@ -247,7 +147,7 @@ def style_df(df):
         "cr_change_%": "{:.2%}",
     })
 
-    styler = styler.applymap(color_change, subset=["cr_change_%"])
+    styler = styler.apply(color_change, subset=["cr_change_%"])
     return styler
 
 # ======================================================
@@ -257,191 +157,18 @@ st.divider()
 st.subheader("📊 Weekly Ranking Comparison (Global)")
 
 global_df = reorder_columns(
-    build_compare(
-        add_global_rank(last_df),
-        add_global_rank(current_df)
-    ).sort_values("rank_current")
+    build_ranked_compare("global").sort_values("rank_current")
 )
 
 st.dataframe(style_df(global_df), use_container_width=True, hide_index=True)
 
-
-
-
-
-def build_city_overview(last_df, current_df):
-    last_city = (
-        last_df
-        .groupby(RES_CITY)
-        .agg(
-            checkin_last=("checkin", "sum"),
-            signup_last=("signup", "sum")
-        )
-        .reset_index()
-    )
-
-    last_city["cr_last"] = np.where(
-        last_city["checkin_last"] == 0,
-        0,
-        (last_city["signup_last"] / last_city["checkin_last"] * 100).round(2)
-    )
-
-    current_city = (
-        current_df
-        .groupby(RES_CITY)
-        .agg(
-            checkin_current=("checkin", "sum"),
-            signup_current=("signup", "sum")
-        )
-        .reset_index()
-    )
-
-    current_city["cr_current"] = np.where(
-        current_city["checkin_current"] == 0,
-        0,
-        (current_city["signup_current"] / current_city["checkin_current"] * 100).round(2)
-    )
-
-    df = last_city.merge(current_city, on=RES_CITY, how="outer").fillna(0)
-
-    df["checkin_change_%"] = np.where(
-        df["checkin_last"] == 0, 0,
-        (df["checkin_current"] / df["checkin_last"]) - 1
-    )
-
-    df["signup_change_%"] = np.where(
-        df["signup_last"] == 0, 0,
-        (df["signup_current"] / df["signup_last"]) - 1
-    )
-
-    df["cr_change_%"] = np.where(
-        df["cr_last"] == 0, 0,
-        (df["cr_current"] / df["cr_last"]) - 1
-    )
-
-    return df
-
-
-
-
 # ======================================================
 # SECTION – City Performance Overview (Last vs Current)
 # ======================================================
 st.divider()
 st.subheader("🏙️ City Performance Overview (Last vs Current)")
 
-def build_city_overview(last_df, current_df):
-    last_city = (
-        last_df
-        .groupby(RES_CITY)
-        .agg(
-            checkin_last=("checkin", "sum"),
-            signup_last=("signup", "sum")
-        )
-        .reset_index()
-    )
-
-    last_city["cr_last"] = np.where(
-        last_city["checkin_last"] == 0,
-        0,
-        (last_city["signup_last"] / last_city["checkin_last"] * 100)
-    )
-
-    current_city = (
-        current_df
-        .groupby(RES_CITY)
-        .agg(
-            checkin_current=("checkin", "sum"),
-            signup_current=("signup", "sum")
-        )
-        .reset_index()
-    )
-
-    current_city["cr_current"] = np.where(
-        current_city["checkin_current"] == 0,
-        0,
-        (current_city["signup_current"] / current_city["checkin_current"] * 100)
-    )
-
-    df = last_city.merge(current_city, on=RES_CITY, how="outer").fillna(0)
-
-    df["checkin_change_%"] = np.where(
-        df["checkin_last"] == 0, 0,
-        (df["checkin_current"] / df["checkin_last"]) - 1
-    )
-
-    df["signup_change_%"] = np.where(
-        df["signup_last"] == 0, 0,
-        (df["signup_current"] / df["signup_last"]) - 1
-    )
-
-    df["cr_change_%"] = np.where(
-        df["cr_last"] == 0, 0,
-        (df["cr_current"] / df["cr_last"]) - 1
-    )
-
-    return df
-
-
-def add_total_row(df):
-    total = {
-        RES_CITY: "TOTAL",
-
-        "checkin_last": df["checkin_last"].sum(),
-        "checkin_current": df["checkin_current"].sum(),
-        "signup_last": df["signup_last"].sum(),
-        "signup_current": df["signup_current"].sum(),
-    }
-
-    total["checkin_change_%"] = (
-        0 if total["checkin_last"] == 0
-        else (total["checkin_current"] / total["checkin_last"]) - 1
-    )
-
-    total["signup_change_%"] = (
-        0 if total["signup_last"] == 0
-        else (total["signup_current"] / total["signup_last"]) - 1
-    )
-
-    total["cr_last"] = (
-        0 if total["checkin_last"] == 0
-        else (total["signup_last"] / total["checkin_last"] * 100)
-    )
-
-    total["cr_current"] = (
-        0 if total["checkin_current"] == 0
-        else (total["signup_current"] / total["checkin_current"] * 100)
-    )
-
-    total["cr_change_%"] = (
-        0 if total["cr_last"] == 0
-        else (total["cr_current"] / total["cr_last"]) - 1
-    )
-
-    return pd.concat([df, pd.DataFrame([total])], ignore_index=True)
-
-
-# build city overview
-city_overview_df = build_city_overview(last_df, current_df)
-
-city_overview_df = city_overview_df[[
-    RES_CITY,
-    "checkin_last", "checkin_current", "checkin_change_%",
-    "signup_last", "signup_current", "signup_change_%",
-    "cr_last", "cr_current", "cr_change_%"
-]]
-
-# add TOTAL row
-city_overview_df = add_total_row(city_overview_df)
-
-# sort city order + TOTAL last
-city_overview_df[RES_CITY] = pd.Categorical(
-    city_overview_df[RES_CITY],
-    categories=["HCM", "HN", "DN", "TOTAL"],
-    ordered=True
-)
-
-city_overview_df = city_overview_df.sort_values(RES_CITY)
+city_overview_df = city_overview(last_df, current_df)
 
 st.dataframe(
     style_df(city_overview_df),
@@ -458,13 +185,13 @@ st.dataframe(
 st.divider()
 st.subheader("🏙️ City-level Ranking (Current Week)")
 
-city_df = build_compare(
-    add_city_rank(last_df),
-    add_city_rank(current_df)
-)
+city_df = build_ranked_compare("city")
 
 for city, df in city_df.groupby(RES_CITY):
-    st.markdown(f"### 📍 {city}")
+    # Tables are only styled / sent to the browser once a city is opened
+    if not st.toggle(f"📍 {city}", key=f"city_rank_{city}"):
+        continue
+
     st.dataframe(
         style_df(reorder_columns(df.sort_values("rank_current"))),
         use_container_width=True,
@@ -479,12 +206,8 @@ st.divider()
 st.subheader("🏙️ City-level Ranking by Brand Model (Current Week)")
 
 BRAND_ORDER = ["savvy", "signature", "hotel", "living", "express"]
-CITY_ORDER = ["HCM", "HN", "DN"]
 
-cb_df = build_compare(
-    add_city_brand_rank(last_df),
-    add_city_brand_rank(current_df)
-).copy()
+cb_df = build_ranked_compare("city_brand")
 
 # normalize
 cb_df[BRAND_MODEL] = (
@@ -523,7 +246,8 @@ for city, city_df in (
     if city_df.empty:
         continue
 
-    st.markdown(f"## 📍 {city}")
+    if not st.toggle(f"📍 {city}", key=f"city_brand_rank_{city}"):
+        continue
 
     city_df = city_df.sort_values([BRAND_MODEL, "rank_current"])
 
@@ -538,7 +262,9 @@ for city, city_df in (
         ):
             continue
 
-        st.markdown(f"### 🏷️ Brand Model: {bm}")
+        if not st.toggle(f"🏷️ Brand Model: {bm}", key=f"city_brand_rank_{city}_{bm}"):
+            continue
+
         st.dataframe(
             style_df(reorder_columns(bm_df)),
             use_container_width=True,
@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 
+from mvtools.loader import load_file
+from mvtools.metrics import add_rank, conversion_rate, movement_labels
+
 # ======================
 # Page config
 # ======================
@@ -35,21 +37,14 @@ def normalize_df(df):
         "Check-ins": "checkin_count"
     })
 
-def calc_cr(signup, checkin):
-    return np.where(
-        checkin > 0,
-        (signup / checkin) * 100,
-        np.nan
-    )
-
-def movement_label(x):
-    if pd.isna(x):
-        return "🆕 New Entry"
-    if x > 0:
-        return f"↑ Up {x}"
-    if x < 0:
-        return f"↓ Down {abs(x)}"
-    return "→ No Change"
+def add_group_ranks(df, by):
+    """Rank current / last week signups within `by` and label the movement."""
+    df = add_rank(df, "current_signup", by, method="first", rank_col="current_rank")
+    df = add_rank(df, "last_signup", by, method="first", rank_col="last_rank")
+    df[["current_rank", "last_rank"]] = df[["current_rank", "last_rank"]].astype("Int64")
+    df["rank_change"] = df["last_rank"] - df["current_rank"]
+    df["movement"] = movement_labels(df["rank_change"])
+    return df
 
 # ======================
 # MAIN
@@ -59,8 +54,8 @@ if before_file and after_file:
     # ------------------
     # Load & normalize
     # ------------------
-    before = normalize_df(pd.read_csv(before_file))
-    after = normalize_df(pd.read_csv(after_file))
+    before = normalize_df(load_file(before_file))
+    after = normalize_df(load_file(after_file))
 
     # ------------------
     # Rename columns
@@ -96,13 +91,13 @@ if before_file and after_file:
     # ======================
     # CR calculation (%)
     # ======================
-    df["last_cr_%"] = calc_cr(
-        df["last_signup"], df["last_checkin"]
-    ).round(2)
+    df["last_cr_%"] = conversion_rate(
+        df["last_signup"], df["last_checkin"], empty=np.nan
+    )
 
-    df["current_cr_%"] = calc_cr(
-        df["current_signup"], df["current_checkin"]
-    ).round(2)
+    df["current_cr_%"] = conversion_rate(
+        df["current_signup"], df["current_checkin"], empty=np.nan
+    )
 
     df["cr_change_%"] = np.where(
         df["last_cr_%"] > 0,
@@ -114,7 +109,7 @@ if before_file and after_file:
     # GLOBAL RANK MOVEMENT
     # ======================
     df["rank_change"] = df["last_rank"] - df["current_rank"]
-    df["movement"] = df["rank_change"].apply(movement_label)
+    df["movement"] = movement_labels(df["rank_change"])
 
     # ======================
     # WEEKLY RANKING – GLOBAL
@@ -145,9 +140,8 @@ if before_file and after_file:
     # ======================
     st.subheader("🏙️ City-level Ranking (Current Week)")
 
-    for city in df["city"].dropna().unique():
-
-        city_current = df[df["city"] == city][
+    city_ranks = add_group_ranks(
+        df[
             [
                 "hotel_name",
                 "brand_model",
@@ -158,33 +152,18 @@ if before_file and after_file:
                 "current_cr_%",
                 "cr_change_%"
             ]
-        ].copy()
-
-        city_current = city_current.sort_values(
-            "current_signup", ascending=False
-        )
-        city_current["current_rank"] = range(1, len(city_current) + 1)
-
-        city_last = city_current.sort_values(
-            "last_signup", ascending=False
-        )
-        city_last["last_rank"] = range(1, len(city_last) + 1)
-
-        city_rank = city_current.merge(
-            city_last[["hotel_name", "last_rank"]],
-            on="hotel_name",
-            how="left"
-        )
+        ].dropna(subset=["city"]),
+        ["city"]
+    )
 
-        city_rank["rank_change"] = (
-            city_rank["last_rank"] - city_rank["current_rank"]
-        )
-        city_rank["movement"] = city_rank["rank_change"].apply(movement_label)
+    for city, city_rank in city_ranks.groupby("city", sort=False):
 
-        st.markdown(f"### 📍 {city}")
+        # Only opened sections build their table
+        if not st.toggle(f"📍 {city}", key=f"city_rank_{city}"):
+            continue
 
         st.dataframe(
-            city_rank[
+            city_rank.sort_values("current_rank")[
                 [
                     "hotel_name",
                     "brand_model",
@@ -207,62 +186,40 @@ if before_file and after_file:
     # ======================
     st.subheader("🏙️ City-level Ranking by Brand Model (Current Week)")
 
-    for city in df["city"].dropna().unique():
-
-        st.markdown(f"## 📍 {city}")
-        city_df = df[df["city"] == city]
-
-        for model in city_df["brand_model"].dropna().unique():
+    model_ranks = add_group_ranks(
+        df[
+            [
+                "hotel_name",
+                "brand_model",
+                "city",
+                "current_signup",
+                "last_signup",
+                "last_cr_%",
+                "current_cr_%",
+                "cr_change_%"
+            ]
+        ].dropna(subset=["city", "brand_model"]),
+        ["city", "brand_model"]
+    )
 
-            model_df = city_df[
-                city_df["brand_model"] == model
-            ][
-                [
-                    "hotel_name",
-                    "brand_model",
-                    "city",
-                    "current_signup",
-                    "last_signup",
-                    "last_cr_%",
-                    "current_cr_%",
-                    "cr_change_%"
-                ]
-            ].copy()
+    for city, city_df in model_ranks.groupby("city", sort=False):
 
-            model_current = model_df.sort_values(
-                "current_signup", ascending=False
-            )
-            model_current["current_rank"] = range(
-                1, len(model_current) + 1
-            )
+        if not st.toggle(f"📍 {city}", key=f"city_model_rank_{city}"):
+            continue
 
-            model_last = model_df.sort_values(
-                "last_signup", ascending=False
-            )
-            model_last["last_rank"] = range(
-                1, len(model_last) + 1
-            )
+        for model, model_rank in city_df.groupby("brand_model", sort=False):
 
-            model_rank = model_current.merge(
-                model_last[["hotel_name", "last_rank"]],
-                on="hotel_name",
-                how="left"
-            )
+            if not st.toggle(
+                f"🏷️ Brand Model: {model}", key=f"city_model_rank_{city}_{model}"
+            ):
+                continue
 
-            model_rank["rank_change"] = (
-                model_rank["last_rank"] - model_rank["current_rank"]
-            )
-            model_rank["movement"] = model_rank["rank_change"].apply(
-                movement_label
-            )
             model_rank = model_rank.sort_values(
                 by="cr_change_%",
                 ascending=False,
                 na_position="last"
             )
 
-            st.markdown(f"### 🏷️ Brand Model: **{model}**")
-
             st.dataframe(
                 model_rank[
                     [
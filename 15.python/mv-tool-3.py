@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
-import re
+
+from mvtools.funnel import NEW_RECRUIT, daily_funnel, daily_labels, funnel_stage, parse_daily_dates
+from mvtools.loader import SIGNUP_DTYPES, load_file
 
 # ======================
 # PAGE CONFIG
@@ -17,16 +19,11 @@ st.title("Tool 3: Daily Recruit Funnel Dashboard (Signup file only)")
 # ======================
 signup_file = st.file_uploader("Upload Signup File", type=["csv", "xlsx"])
 
-def load_file(file):
-    if file.name.endswith(".csv"):
-        return pd.read_csv(file)
-    return pd.read_excel(file)
-
 if not signup_file:
     st.info("👆 Upload signup file to start")
     st.stop()
 
-df = load_file(signup_file)
+df = load_file(signup_file, dtype=SIGNUP_DTYPES)
 st.success("✅ File uploaded successfully")
 
 # ======================
@@ -40,23 +37,15 @@ COUNT_COL_INDEX = 4           # Column E
 # ======================
 # DATE NORMALIZATION (CHECKIN ONLY)
 # ======================
-DATE_REGEX = re.compile(r"^[A-Za-z]+ \d{1,2}, \d{4}$")
-
-def normalize_checkin(val):
-    if pd.isna(val):
-        return None
-
-    val = str(val).strip()
-
-    # Only accept daily dates like "May 19, 2025"
-    if not DATE_REGEX.match(val):
-        return None
-
-    return pd.to_datetime(val).date()
+# Only daily dates like "May 19, 2025" are kept
+df["date"] = parse_daily_dates(df[DATE_COL])
 
-df["date"] = df[DATE_COL].apply(normalize_checkin)
+# Daily-looking labels that still aren't dates are data problems, not
+# pivot rows - report them on their own
+unparsed = daily_labels(df[DATE_COL]) & df["date"].isna()
+unparsed_labels = df.loc[unparsed, DATE_COL].astype(str).unique()
 
-invalid_rows = df["date"].isna().sum()
+invalid_rows = df["date"].isna().sum() - unparsed.sum()
 df = df.dropna(subset=["date"])
 
 if df.empty:
@@ -69,6 +58,12 @@ if invalid_rows > 0:
         "were removed (pivot headers / totals)"
     )
 
+if unparsed.any():
+    st.warning(
+        f"⚠️ {unparsed.sum()} rows in 'checkin' look like dates but could not be parsed "
+        f"and were removed: {', '.join(unparsed_labels[:5])}"
+    )
+
 # ======================
 # SIGNUP COUNT
 # ======================
@@ -80,8 +75,8 @@ df["signup_count"] = pd.to_numeric(
 # ======================
 # DATE FILTER
 # ======================
-min_date = df["date"].min()
-max_date = df["date"].max()
+min_date = df["date"].min().date()
+max_date = df["date"].max().date()
 
 date_range = st.date_input(
     "Select Date Range (Daily View)",
@@ -93,56 +88,14 @@ date_range = st.date_input(
 from_date, to_date = date_range
 
 daily_df = df[
-    (df["date"] >= from_date) &
-    (df["date"] <= to_date)
-]
-
-# ======================
-# STATUS GROUPS
-# ======================
-STATUS_CHUA_SIGNUP = ["Chưa Sign-up"]
-STATUS_MEMBER = ["Đã Sign-up từ trước"]
-STATUS_NEW_RECRUIT = [
-    "Sign-up sau C/I",
-    "Sign up trước 1 ngày check in",
-    "Sign up trước 2 ngày check in"
+    (df["date"] >= pd.Timestamp(from_date)) &
+    (df["date"] <= pd.Timestamp(to_date))
 ]
 
 # ======================
-# DAILY AGGREGATION
-# ======================
-def agg_status(status_list):
-    return (
-        daily_df[daily_df[STATUS_COL].isin(status_list)]
-        .groupby(["date", CITY_COL])["signup_count"]
-        .sum()
-        .reset_index()
-        .pivot(index="date", columns=CITY_COL, values="signup_count")
-        .fillna(0)
-    )
-
-chua_signup = agg_status(STATUS_CHUA_SIGNUP)
-member = agg_status(STATUS_MEMBER)
-new_recruit = agg_status(STATUS_NEW_RECRUIT)
-
+# DAILY FUNNEL (single pivot over date x city x stage)
 # ======================
-# FINAL DAILY TABLE
-# ======================
-final_daily = pd.DataFrame(index=sorted(daily_df["date"].unique()))
-
-for city in ["HCM", "HN", "DN"]:
-    final_daily[f"{city}_Chua_Signup"] = chua_signup.get(city, 0)
-    final_daily[f"{city}_Member"] = member.get(city, 0)
-    final_daily[f"{city}_New_recruit"] = new_recruit.get(city, 0)
-
-final_daily["Total New Recruit"] = new_recruit.sum(axis=1)
-
-final_daily = (
-    final_daily.fillna(0)
-    .astype(int)
-    .reset_index()
-    .rename(columns={"index": "Date"})
-)
+final_daily = daily_funnel(daily_df, CITY_COL, STATUS_COL)
 
 # ======================
 # DISPLAY DAILY
@@ -172,16 +125,16 @@ last_week_start = last_week_end - timedelta(days=6)
 prev_week_end = last_week_start - timedelta(days=1)
 prev_week_start = prev_week_end - timedelta(days=6)
 
-nr_df = df[df[STATUS_COL].isin(STATUS_NEW_RECRUIT)]
+nr_df = df[funnel_stage(df[STATUS_COL]) == NEW_RECRUIT]
 
 last_week_df = nr_df[
-    (nr_df["date"] >= last_week_start) &
-    (nr_df["date"] <= last_week_end)
+    (nr_df["date"] >= pd.Timestamp(last_week_start)) &
+    (nr_df["date"] <= pd.Timestamp(last_week_end))
 ]
 
 prev_week_df = nr_df[
-    (nr_df["date"] >= prev_week_start) &
-    (nr_df["date"] <= prev_week_end)
+    (nr_df["date"] >= pd.Timestamp(prev_week_start)) &
+    (nr_df["date"] <= pd.Timestamp(prev_week_end))
 ]
 
 wow_df = pd.DataFrame({
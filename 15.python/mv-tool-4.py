@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
+from mvtools.loader import SIGNUP_DTYPES, file_digest, load_file
+from mvtools.weekly import build_weekly, preprocess_signup, slice_weeks, wow_metrics
+
 # =====================================================
 # Page config
 # =====================================================
@@ -12,71 +15,6 @@ st.set_page_config(
 
 st.title("📊 Executive BI – Weekly Signup Performance")
 
-# =====================================================
-# Helpers
-# =====================================================
-def load_file(file):
-    if file.name.endswith(".csv"):
-        return pd.read_csv(file)
-    return pd.read_excel(file)
-
-
-def preprocess_signup(df):
-    HOTEL_COL = "hotel_short_name"
-    CITY_COL = "city"
-    DATE_COL = df.columns[4]
-    COUNT_COL = df.columns[5]
-
-    df = df.copy()
-
-    df["hotel_display"] = df[HOTEL_COL].astype(str).str.strip()
-    df["hotel_normalized"] = df["hotel_display"].str.lower()
-    df[CITY_COL] = df[CITY_COL].astype(str).str.strip()
-
-    if "brand_model" not in df.columns:
-        df["brand_model"] = "All"
-
-    df[DATE_COL] = pd.to_datetime(df[DATE_COL], errors="coerce")
-    df[COUNT_COL] = pd.to_numeric(df[COUNT_COL], errors="coerce").fillna(0)
-
-    df = df.dropna(subset=[DATE_COL])
-
-    df["week"] = (
-        df[DATE_COL]
-        .dt.to_period("W-MON")
-        .apply(lambda r: r.start_time)
-    )
-
-    return df, CITY_COL, COUNT_COL
-
-
-def build_weekly(df, city_col, count_col):
-    weekly = (
-        df
-        .groupby(
-            ["week", "hotel_display", city_col, "brand_model"]
-        )[count_col]
-        .sum()
-        .reset_index(name="signup_count")
-    )
-
-    weekly["Rank"] = (
-        weekly
-        .groupby("week")["signup_count"]
-        .rank(method="dense", ascending=False)
-        .astype(int)
-    )
-
-    return weekly
-
-
-def wow_metrics(weekly):
-    weekly = weekly.sort_values(["hotel_display", "week"])
-    weekly["signup_wow"] = weekly.groupby("hotel_display")["signup_count"].pct_change() * 100
-    weekly["rank_wow"] = weekly.groupby("hotel_display")["Rank"].diff() * -1
-    return weekly
-
-
 # =====================================================
 # Upload
 # =====================================================
@@ -85,13 +23,20 @@ if not signup_file:
     st.info("👆 Upload Signup file to start")
     st.stop()
 
-df = load_file(signup_file)
-df, CITY_COL, COUNT_COL = preprocess_signup(df)
+@st.cache_data(max_entries=4, show_spinner="Building weekly aggregates...")
+def load_weekly(signup_digest, _signup_file):
+    """Weekly ranks + WoW over the whole upload, built once per file."""
+    df = load_file(_signup_file, dtype=SIGNUP_DTYPES)
+    df, city_col, count_col = preprocess_signup(df)
+    return wow_metrics(build_weekly(df, city_col, count_col)), city_col
+
+
+all_weekly, CITY_COL = load_weekly(file_digest(signup_file.getvalue()), signup_file)
 
 # =====================================================
 # Date range
 # =====================================================
-min_w, max_w = df["week"].min().date(), df["week"].max().date()
+min_w, max_w = all_weekly["week"].min().date(), all_weekly["week"].max().date()
 
 from_date, to_date = st.date_input(
     "📅 Select Week Range",
@@ -100,13 +45,7 @@ from_date, to_date = st.date_input(
     max_value=max_w
 )
 
-df = df[
-    (df["week"].dt.date >= from_date) &
-    (df["week"].dt.date <= to_date)
-]
-
-weekly = build_weekly(df, CITY_COL, COUNT_COL)
-weekly = wow_metrics(weekly)
+weekly = slice_weeks(all_weekly, from_date, to_date)
 
 latest_week = weekly["week"].max()
 prev_week = latest_week - pd.Timedelta(days=7)
@@ -0,0 +1 @@
+"""Shared helpers for the M Village Streamlit tools and scripts in 15.python/."""
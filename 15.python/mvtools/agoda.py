@@ -0,0 +1,328 @@
+"""
+Agoda review overview client for agoda_review.py.
+
+Hotels are fetched concurrently through mvtools.http (keep-alive sessions,
+rate limit, backoff on 429 / 5xx). Every successful response is cached on
+disk, keyed by hotel URL + languageId, and reused until it is older than
+the TTL, so re-running an analysis doesn't hit the API again.
+
+Each analysis is also appended to a history store - Parquet files
+partitioned by snapshot date - so guest mix trends can be compared across
+weeks without re-querying the hotels.
+"""
+import json
+import os
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mvtools.http import post_all
+from mvtools.loader import CACHE_DIR, file_digest
+
+AGODA_REVIEW_OVERVIEW_API = "https://www.agoda.com/api/cronos/property/review/overview"
+
+LANGUAGE_ID = 38          # Vietnamese
+CURRENCY_CODE = "VND"
+
+TRAVELLER_TYPE_MAP = {
+    1: "Solo traveler",
+    2: "Couple",
+    3: "Family with young children",
+    4: "Family with older children",
+    5: "Group",
+    6: "Business traveler"
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "Origin": "https://www.agoda.com",
+    "Referer": "https://www.agoda.com/"
+}
+
+RESPONSE_CACHE_DIR = CACHE_DIR / "agoda"
+HISTORY_DIR = Path(os.environ.get(
+    "MVTOOLS_AGODA_HISTORY", Path.home() / ".local" / "share" / "mvtools" / "agoda_history"
+))
+RESPONSE_TTL = int(os.environ.get("MVTOOLS_AGODA_TTL", 24 * 3600))   # seconds
+
+CONCURRENCY = 8
+RATE = 5.0                # requests / second
+TIMEOUT = 20
+
+COUNT_COLUMNS = list(TRAVELLER_TYPE_MAP.values())
+
+# Guest mix thresholds, checked in order
+COUPLE_DRIVEN_PCT = 40
+BUSINESS_HEAVY_PCT = 35
+
+
+# ======================
+# Response cache
+# ======================
+def _cache_path(hotel_url: str, language_id: int):
+    key = json.dumps({"url": hotel_url, "languageId": language_id}, sort_keys=True)
+    return RESPONSE_CACHE_DIR / f"{file_digest(key.encode('utf-8'))}.json"
+
+
+def cached_overview(hotel_url: str, language_id: int = LANGUAGE_ID, ttl: int = RESPONSE_TTL) -> Optional[dict]:
+    """Cached API response for the hotel, or None if missing / older than ttl."""
+    path = _cache_path(hotel_url, language_id)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_overview(hotel_url: str, data: dict, language_id: int = LANGUAGE_ID) -> None:
+    """Cache an API response atomically; failures just skip caching."""
+    path = _cache_path(hotel_url, language_id)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+# ======================
+# API
+# ======================
+def overview_payload(hotel_url: str, language_id: int = LANGUAGE_ID) -> dict:
+    return {
+        "hotelUrl": hotel_url,
+        "languageId": language_id,
+        "currencyCode": CURRENCY_CODE
+    }
+
+
+def guest_types(data: dict) -> Dict[str, int]:
+    """Review counts per traveller type label from an overview response."""
+    result = {}
+    for item in data.get("travellerTypeCounts", []):
+        label = TRAVELLER_TYPE_MAP.get(item["travellerType"], "Other")
+        result[label] = result.get(label, 0) + item["count"]
+    return result
+
+
+def fetch_overviews(
+    urls: List[str],
+    *,
+    language_id: int = LANGUAGE_ID,
+    ttl: int = RESPONSE_TTL,
+    api_url: str = AGODA_REVIEW_OVERVIEW_API,
+    concurrency: int = CONCURRENCY,
+    rate: Optional[float] = RATE,
+) -> Dict[str, Tuple[Optional[dict], Optional[str]]]:
+    """
+    Overview response per hotel URL, from the cache where fresh.
+
+    Returns:
+        {url: (data, error)}; data is None when the request failed
+    """
+    results = {}
+    missing = []
+
+    for url in dict.fromkeys(urls):
+        data = cached_overview(url, language_id, ttl) if ttl > 0 else None
+        if data is not None:
+            results[url] = (data, None)
+        else:
+            missing.append(url)
+
+    for result in post_all(
+        api_url,
+        missing,
+        payload_of=lambda url: overview_payload(url, language_id),
+        headers=HEADERS,
+        concurrency=concurrency,
+        rate=rate,
+        timeout=TIMEOUT,
+        idempotent=True,      # a read; safe to resend
+    ):
+        url = result.item
+
+        if not result.ok:
+            error = f"HTTP {result.status}" if result.status else result.text
+            results[url] = (None, error)
+            continue
+
+        try:
+            data = json.loads(result.text)
+        except ValueError as e:
+            results[url] = (None, f"Invalid JSON response: {e}")
+            continue
+
+        store_overview(url, data, language_id)
+        results[url] = (data, None)
+
+    return results
+
+
+def analyze_urls(urls: List[str], **fetch_options) -> pd.DataFrame:
+    """
+    One row per hotel URL: review counts per guest type, or the error
+    (the Error column is only present when a fetch failed, and NaN on the
+    other rows).
+    """
+    urls = [url.strip() for url in urls if url.strip()]
+    overviews = fetch_overviews(urls, **fetch_options)
+
+    rows = []
+    for url in urls:
+        data, error = overviews[url]
+
+        if error is not None:
+            rows.append({
+                "Hotel URL": url,
+                "Error": error
+            })
+            continue
+
+        row = {"Hotel URL": url}
+        row.update(guest_types(data))
+        rows.append(row)
+
+    df = pd.DataFrame(rows)
+
+    # Missing counts are 0; Error stays empty (NaN) on the rows that succeeded
+    counts = [col for col in df.columns if col not in ("Hotel URL", "Error")]
+    df[counts] = df[counts].fillna(0)
+
+    # Ensure consistent columns
+    for col in TRAVELLER_TYPE_MAP.values():
+        if col not in df.columns:
+            df[col] = 0
+
+    return df
+
+
+# ======================
+# Guest mix
+# ======================
+def guest_mix(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add Total Reviews, Couple %, Business % and Primary Guest Mix columns.
+
+    Hotels with >= 40% couples are "Couple-driven", then >= 35% business
+    travellers "Business-heavy", otherwise "Mixed".
+    """
+    df = df.copy()
+
+    df["Total Reviews"] = df[COUNT_COLUMNS].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["Couple %"] = (df["Couple"] / df["Total Reviews"] * 100).round(1)
+        df["Business %"] = (df["Business traveler"] / df["Total Reviews"] * 100).round(1)
+
+    df["Primary Guest Mix"] = np.select(
+        [df["Couple %"] >= COUPLE_DRIVEN_PCT, df["Business %"] >= BUSINESS_HEAVY_PCT],
+        ["Couple-driven", "Business-heavy"],
+        "Mixed"
+    )
+    return df
+
+
+# ======================
+# History
+# ======================
+def append_snapshot(
+    df: pd.DataFrame,
+    snapshot_date: Optional[date] = None,
+    history_dir: Path = HISTORY_DIR,
+) -> Optional[Path]:
+    """
+    Append the successful rows of an analyze_urls() result to the history.
+
+    Writes one Parquet file under snapshot_date=YYYY-MM-DD/. Returns its
+    path, or None if there was nothing to store.
+    """
+    if "Error" in df.columns:
+        df = df[df["Error"].isna()]
+    if df.empty:
+        return None
+
+    snapshot = pd.DataFrame({"hotel_url": df["Hotel URL"].to_numpy()})
+    for col in COUNT_COLUMNS + ["Other"]:
+        if col in df.columns:
+            counts = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy()
+        else:
+            counts = 0
+        snapshot[col] = np.asarray(counts).astype("int64")
+    snapshot["fetched_at"] = pd.Timestamp.now()
+
+    day = snapshot_date or date.today()
+    part = Path(history_dir) / f"snapshot_date={day:%Y-%m-%d}"
+    part.mkdir(parents=True, exist_ok=True)
+
+    path = part / f"{time.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+    snapshot.to_parquet(path, engine="pyarrow", index=False)
+    return path
+
+
+def load_history(
+    urls: Optional[Sequence[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    history_dir: Path = HISTORY_DIR,
+) -> pd.DataFrame:
+    """
+    Stored snapshots (latest per hotel and day), optionally filtered.
+
+    Only the partitions in [start, end] are read.
+    """
+    history_dir = Path(history_dir)
+    if not any(history_dir.glob("snapshot_date=*/*.parquet")):
+        return pd.DataFrame(columns=["snapshot_date", "hotel_url", *COUNT_COLUMNS, "Other", "fetched_at"])
+
+    filters = []
+    if start is not None:
+        filters.append(("snapshot_date", ">=", f"{start:%Y-%m-%d}"))
+    if end is not None:
+        filters.append(("snapshot_date", "<=", f"{end:%Y-%m-%d}"))
+    if urls is not None:
+        filters.append(("hotel_url", "in", list(urls)))
+
+    df = pd.read_parquet(history_dir, engine="pyarrow", filters=filters or None)
+    df["snapshot_date"] = pd.to_datetime(df["snapshot_date"].astype(str))
+
+    return (
+        df.sort_values("fetched_at")
+        .drop_duplicates(["snapshot_date", "hotel_url"], keep="last")
+        .sort_values(["hotel_url", "snapshot_date"])
+        .reset_index(drop=True)
+    )
+
+
+def mix_trend(history: pd.DataFrame, freq: str = "W-SUN") -> pd.DataFrame:
+    """
+    Guest mix per hotel per period (Mon-Sun weeks by default), using each
+    hotel's latest snapshot in the period, with the change in Couple % /
+    Business % vs the hotel's previous period.
+    """
+    df = history.assign(period=history["snapshot_date"].dt.to_period(freq).dt.start_time)
+    df = (
+        df.sort_values("snapshot_date")
+        .drop_duplicates(["hotel_url", "period"], keep="last")
+        .sort_values(["hotel_url", "period"])
+    )
+    df = guest_mix(df.rename(columns={"hotel_url": "Hotel URL"}))
+
+    by_hotel = df.groupby("Hotel URL")
+    df["Couple % Δ"] = by_hotel["Couple %"].diff().round(1)
+    df["Business % Δ"] = by_hotel["Business %"].diff().round(1)
+
+    return df[[
+        "Hotel URL", "period", "Total Reviews",
+        "Couple %", "Couple % Δ", "Business %", "Business % Δ", "Primary Guest Mix"
+    ]].reset_index(drop=True)
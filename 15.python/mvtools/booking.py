@@ -0,0 +1,234 @@
+"""
+Booking ID (HRxxxxxx) detection in tour-itinerary workbooks.
+
+Workbooks are opened in openpyxl's read-only streaming mode, so memory
+stays bounded by one row at a time rather than the whole workbook, and
+files are scanned in parallel across a process pool. Used by
+detect_booking_id.py.
+
+Two engines produce the same matches:
+- "cells" (default): walks every cell and runs the regex on str(value),
+  one streamed row at a time
+- "columnar": loads blocks of COLUMNAR_BLOCK_ROWS rows, puts their text
+  cells into one string column (Arrow-backed when pyarrow is installed)
+  and runs a single vectorized str.contains / str.findall over it,
+  mapping hits back to coordinates through their row / column positions.
+  Memory is bounded by the block rather than the row, and picking out the
+  text cells is still a per-cell type check, so the gain is modest
+"""
+import glob
+import itertools
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+# HR followed by one or more digits
+HR_PATTERN = re.compile(r'HR\d+', re.IGNORECASE)
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+ENGINES = ("cells", "columnar")
+DEFAULT_ENGINE = "cells"
+COLUMNAR_BLOCK_ROWS = 10_000
+
+Match = Dict[str, object]
+
+
+# ======================
+# Inputs
+# ======================
+def _is_workbook(path: Path) -> bool:
+    # "~$name.xlsx" are Excel lock files, not workbooks
+    return path.suffix.lower() in EXCEL_SUFFIXES and not path.name.startswith("~$")
+
+
+def find_workbooks(inputs: Iterable[str]) -> List[Path]:
+    """
+    Expand files, directories (searched recursively) and glob patterns into
+    a sorted, de-duplicated list of workbooks.
+    """
+    found = set()
+
+    for item in inputs:
+        paths = [Path(p) for p in glob.glob(item, recursive=True)] or [Path(item)]
+
+        for path in paths:
+            if path.is_dir():
+                found.update(p for p in path.rglob("*") if p.is_file() and _is_workbook(p))
+            elif path.is_file() and _is_workbook(path):
+                found.add(path)
+
+    return sorted(found)
+
+
+# ======================
+# Scanning
+# ======================
+def booking_ids(text: str) -> List[str]:
+    """Booking IDs in a cell value, upper-cased ("hr123" -> "HR123")."""
+    return [m.upper() for m in HR_PATTERN.findall(text)]
+
+
+def _match(file_path: Path, sheet: str, cell: str, value, ids: List[str]) -> Match:
+    return {
+        'file': file_path.name,
+        'path': str(file_path),
+        'sheet': sheet,
+        'cell': cell,
+        'value': value,
+        'booking_ids': ids,
+    }
+
+
+def scan_workbook_cells(file_path) -> List[Match]:
+    """
+    Cells containing HRxxxxxx in a workbook, one regex search per cell.
+
+    Returns:
+        List of dictionaries containing file, path, sheet, cell address,
+        cell value and the booking IDs found in it
+    """
+    file_path = Path(file_path)
+    results = []
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in wb.worksheets:
+            letters = {}
+            # The stored <dimension> can be stale (some exporters never
+            # update it) and read-only iteration would stop at it
+            sheet.reset_dimensions()
+
+            # Read-only rows are padded from column A, so positions map
+            # straight to coordinates
+            for r, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                for c, value in enumerate(row, start=1):
+                    if value is None or value == "":
+                        continue
+                    ids = booking_ids(str(value))
+                    if not ids:
+                        continue
+
+                    letter = letters.get(c)
+                    if letter is None:
+                        letter = letters[c] = get_column_letter(c)
+
+                    results.append(_match(file_path, sheet.title, f"{letter}{r}", value, ids))
+    finally:
+        wb.close()
+
+    return results
+
+
+def sheet_matches(values: pd.DataFrame):
+    """
+    Vectorized HR search over one sheet's cell values.
+
+    Args:
+        values: Sheet values, positional (row 0 = sheet row 1, column 0 = A)
+
+    Returns:
+        (rows, cols, values, ids): 1-based row / column numbers, the raw
+        cell values and the upper-cased booking IDs of each matching cell
+    """
+    grid = values.to_numpy(dtype=object)
+
+    # Only text cells can hold an ID; numbers / dates never match
+    is_text = np.fromiter(
+        (isinstance(v, str) for v in grid.ravel()), dtype=bool, count=grid.size
+    ).reshape(grid.shape)
+    rows, cols = np.nonzero(is_text)
+    raw = grid[rows, cols]
+
+    text = pd.Series(raw, dtype=STRING_DTYPE)
+    hit = text.str.contains(HR_PATTERN.pattern, case=False).to_numpy(dtype=bool)
+
+    ids = text[hit].str.upper().str.findall(HR_PATTERN.pattern)
+    return rows[hit] + 1, cols[hit] + 1, raw[hit], ids.tolist()
+
+
+def scan_workbook_columnar(file_path, block_rows: int = COLUMNAR_BLOCK_ROWS) -> List[Match]:
+    """
+    Cells containing HRxxxxxx in a workbook, one vectorized search per
+    block of block_rows rows.
+
+    Returns the same records, in the same order, as scan_workbook_cells().
+    """
+    file_path = Path(file_path)
+    results = []
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in wb.worksheets:
+            letters = {}
+            sheet.reset_dimensions()      # see scan_workbook_cells()
+            rows = sheet.iter_rows(values_only=True)
+            offset = 0
+
+            while True:
+                block = list(itertools.islice(rows, block_rows))
+                if not block:
+                    break
+                values = pd.DataFrame(block, dtype=object)
+
+                for r, c, value, ids in zip(*sheet_matches(values)):
+                    letter = letters.get(c)
+                    if letter is None:
+                        letter = letters[c] = get_column_letter(int(c))
+                    results.append(_match(file_path, sheet.title, f"{letter}{r + offset}", value, ids))
+                offset += len(block)
+    finally:
+        wb.close()
+
+    return results
+
+
+SCANNERS = {
+    "cells": scan_workbook_cells,
+    "columnar": scan_workbook_columnar,
+}
+
+
+def scan_workbook(file_path, engine: str = DEFAULT_ENGINE) -> List[Match]:
+    """Cells containing HRxxxxxx in a workbook, using the given engine."""
+    return SCANNERS[engine](file_path)
+
+
+def _scan_one(file_path, engine: str = DEFAULT_ENGINE) -> Tuple[str, Optional[List[Match]], Optional[str]]:
+    try:
+        return str(file_path), scan_workbook(file_path, engine), None
+    except Exception as e:  # one broken workbook must not stop the batch
+        return str(file_path), None, f"{type(e).__name__}: {e}"
+
+
+def scan_files(
+    paths: Iterable, workers: Optional[int] = None, engine: str = DEFAULT_ENGINE
+) -> Iterator[Tuple[str, Optional[List[Match]], Optional[str]]]:
+    """
+    Scan workbooks in parallel and yield (path, matches, error) per file as
+    soon as it finishes. error is None on success, matches None on failure.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield _scan_one(path, engine)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = [pool.submit(_scan_one, path, engine) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,250 @@
+"""
+Persistent booking ID index: HRxxxxxx -> (workbook, sheet, cell).
+
+The index is a SQLite file. `update` rescans only workbooks that are new
+or changed since the last run: a file whose size and mtime are unchanged
+is skipped outright, and one whose mtime moved but whose content hash is
+the same only has its mtime refreshed. Workbooks that disappeared are
+dropped. `lookup` is a single indexed query; the scanning stack (pandas,
+openpyxl) is only imported by `update`, so a lookup starts instantly.
+
+Usage (from 15.python/):
+    python -m mvtools.booking_index update itineraries/ "archive/**/*.xlsx"
+    python -m mvtools.booking_index lookup HR123456
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_DB = "booking_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path       TEXT PRIMARY KEY,
+    size       INTEGER NOT NULL,
+    mtime      REAL NOT NULL,
+    digest     TEXT NOT NULL,
+    matches    INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hits (
+    booking_id TEXT NOT NULL,
+    path       TEXT NOT NULL,
+    sheet      TEXT NOT NULL,
+    cell       TEXT NOT NULL,
+    value      TEXT
+);
+CREATE INDEX IF NOT EXISTS hits_booking_id ON hits (booking_id);
+CREATE INDEX IF NOT EXISTS hits_path ON hits (path);
+"""
+
+
+# (size, mtime, content digest) of a workbook
+FileState = Tuple[int, float, str]
+
+
+def _digest(path: Path) -> str:
+    # Same hash as mvtools.loader.file_digest, without importing pandas
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+class BookingIndex:
+    """Booking ID -> cell locations, persisted in a SQLite file."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ======================
+    # Update
+    # ======================
+    def _known(self) -> Dict[str, FileState]:
+        rows = self.conn.execute("SELECT path, size, mtime, digest FROM files")
+        return {path: (size, mtime, digest) for path, size, mtime, digest in rows}
+
+    def stale(self, files: Iterable[Path]) -> Tuple[Dict[Path, FileState], int]:
+        """
+        Workbooks that need a rescan with their current state, and how
+        many were skipped.
+
+        The state is taken before the rescan, so a workbook saved while it
+        is being scanned no longer matches it and is rescanned next time.
+        Files touched without a content change get their mtime refreshed
+        here and are not rescanned.
+        """
+        known = self._known()
+        todo, skipped = {}, 0
+
+        for path in files:
+            key = str(path)
+            stat = path.stat()
+            entry = known.get(key)
+            digest = None
+
+            if entry is not None:
+                size, mtime, old_digest = entry
+                if size == stat.st_size and mtime == stat.st_mtime:
+                    skipped += 1
+                    continue
+                if size == stat.st_size:
+                    digest = _digest(path)
+                    if digest == old_digest:
+                        self.conn.execute(
+                            "UPDATE files SET mtime = ? WHERE path = ?", (stat.st_mtime, key)
+                        )
+                        skipped += 1
+                        continue
+
+            todo[path] = (stat.st_size, stat.st_mtime, digest or _digest(path))
+
+        self.conn.commit()
+        return todo, skipped
+
+    def store(self, path: Path, matches: List[dict], state: Optional[FileState] = None):
+        """
+        Replace a workbook's hits with a fresh scan.
+
+        state: the workbook's (size, mtime, digest) from before the scan
+        (see stale()); read now if not given.
+        """
+        key = str(path)
+        if state is None:
+            stat = path.stat()
+            state = (stat.st_size, stat.st_mtime, _digest(path))
+        size, mtime, digest = state
+
+        with self.conn:
+            self.conn.execute("DELETE FROM hits WHERE path = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO hits (booking_id, path, sheet, cell, value) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (booking_id, key, m["sheet"], m["cell"], str(m["value"]))
+                    for m in matches
+                    for booking_id in dict.fromkeys(m["booking_ids"])
+                ],
+            )
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO files (path, size, mtime, digest, matches, scanned_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, size, mtime, digest, len(matches), time.time()),
+            )
+
+    def prune(self, files: Iterable[Path]) -> int:
+        """Drop indexed workbooks that no longer exist on disk."""
+        keep = {str(p) for p in files}
+        gone = [p for p in self._known() if p not in keep and not os.path.exists(p)]
+
+        with self.conn:
+            for path in gone:
+                self.conn.execute("DELETE FROM hits WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return len(gone)
+
+    def update(
+        self,
+        inputs: Iterable[str],
+        workers: Optional[int] = None,
+        engine: str = "cells",
+        log=print,
+    ) -> Dict[str, int]:
+        """Rescan new / changed workbooks under inputs and drop deleted ones."""
+        from mvtools.booking import find_workbooks, scan_files
+
+        files = [p.resolve() for p in find_workbooks(inputs)]
+        todo, skipped = self.stale(files)
+        stats = {"scanned": 0, "skipped": skipped, "errors": 0}
+
+        for path, matches, error in scan_files(todo, workers=workers, engine=engine):
+            if error:
+                # Not recorded, so the next update tries it again
+                stats["errors"] += 1
+                log(f"[ERROR] {path}: {error}")
+                continue
+
+            self.store(Path(path), matches, todo[Path(path)])
+            stats["scanned"] += 1
+            log(f"[OK] {path}: {len(matches)} cell(s)")
+
+        stats["removed"] = self.prune(files)
+        return stats
+
+    # ======================
+    # Lookup
+    # ======================
+    def lookup(self, booking_id: str) -> List[Tuple[str, str, str, str]]:
+        """(path, sheet, cell, value) of every cell holding booking_id."""
+        return self.conn.execute(
+            "SELECT path, sheet, cell, value FROM hits WHERE booking_id = ? ORDER BY path, sheet",
+            (booking_id.strip().upper(),),
+        ).fetchall()
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Booking ID (HRxxxxxx) index over Excel workbooks")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Index file (SQLite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index new / changed workbooks")
+    update.add_argument(
+        "inputs", nargs="+",
+        help="Workbooks, directories (searched recursively) or glob patterns"
+    )
+    update.add_argument("--workers", type=int, default=os.cpu_count())
+    update.add_argument(
+        "--engine", choices=("cells", "columnar"), default="cells",
+        help="cells: regex per cell, streamed row by row; columnar: vectorized search per block of rows"
+    )
+
+    lookup = commands.add_parser("lookup", help="Where does a booking ID appear?")
+    lookup.add_argument("booking_ids", nargs="+", metavar="HR_ID")
+
+    args = parser.parse_args(argv)
+
+    with BookingIndex(args.db) as index:
+        if args.command == "update":
+            start = time.perf_counter()
+            stats = index.update(
+                args.inputs, workers=args.workers, engine=args.engine,
+                log=lambda m: print(m, file=sys.stderr)
+            )
+            print(
+                f"Indexed {stats['scanned']} workbook(s), {stats['skipped']} unchanged, "
+                f"{stats['removed']} removed, {stats['errors']} error(s) "
+                f"in {time.perf_counter() - start:.1f} s"
+            )
+            return
+
+        for booking_id in args.booking_ids:
+            start = time.perf_counter()
+            hits = index.lookup(booking_id)
+            elapsed = (time.perf_counter() - start) * 1000
+            if not hits:
+                print(f"{booking_id.upper()}: not found")
+            for path, sheet, cell, value in hits:
+                print(f"{booking_id.upper()}\t{path}\t{sheet}!{cell}\t{value}")
+            print(f"({len(hits)} hit(s) in {elapsed:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
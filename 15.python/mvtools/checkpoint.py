@@ -0,0 +1,85 @@
+"""
+Local SQLite checkpoint for replaying rows against an API.
+
+Each input row is keyed by a hash of its content, so a rerun over the same
+(or a re-exported) fail file skips rows that already went through, however
+the rows are ordered. Every outcome is committed as soon as it is recorded;
+a crash mid-run loses at most the requests that were in flight.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from mvtools.loader import file_digest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    key        TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,          -- "ok" or "failed"
+    http       INTEGER,
+    detail     TEXT,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+
+OK = "ok"
+FAILED = "failed"
+
+
+def row_key(row: Dict[str, str]) -> str:
+    """Content hash of a CSV row (column order and whitespace ignored)."""
+    clean = {k.strip(): (v or "").strip() for k, v in row.items() if k is not None}
+    return file_digest(json.dumps(clean, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+class Checkpoint:
+    """Outcome per row key, persisted in a SQLite file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def is_done(self, key: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM rows WHERE key = ? AND status = ?", (key, OK)
+        ).fetchone()
+        return row is not None
+
+    def record(
+        self,
+        key: str,
+        status: str,
+        http: Optional[int] = None,
+        detail: str = "",
+        attempts: int = 0,
+    ):
+        self.conn.execute(
+            """
+            INSERT INTO rows (key, status, http, detail, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                status = excluded.status,
+                http = excluded.http,
+                detail = excluded.detail,
+                attempts = rows.attempts + excluded.attempts,
+                updated_at = excluded.updated_at
+            """,
+            (key, status, http, detail, attempts, time.time()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,438 @@
+"""
+CSS inliner for rendered emails: copies <style> rules into the style
+attributes of the elements they match, since many clients strip <style>.
+
+A stylesheet is parsed once into compiled rules - selector, specificity,
+declarations - indexed by the selector's rightmost id / class / tag, and
+cached by its text. Inlining a message is then a single pass over its
+tags that only tests the rules indexed under each element's id, classes
+and tag name. Rendered messages repeat the template's tags, so the result
+for a start tag is memoized on the stylesheet too, unless a rule that
+could match it depends on the tag's ancestors.
+
+Supported selectors: tag, *, .class, #id, compounds of those (td.cta),
+and descendant / child combinators (.footer p, tr > td). Rules with
+anything else (:hover, [attr], +, ~) and at-rules (@media, @import,
+@font-face) are not inlined and stay in the <style> block, which keeps
+the responsive and dark-mode rules working where <style> is supported.
+
+Inline styles win over stylesheet rules unless the rule is !important,
+as in the browser. Content of comments (including Outlook conditional
+comments), <script> and <textarea> is left alone.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+STYLE_CACHE_SIZE = 256
+# Start tags memoized per stylesheet; attributes can carry per-recipient
+# values, so the memo stops growing at this size
+TAG_MEMO_SIZE = 20_000
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+# Never given a style attribute (a `*` rule would otherwise reach them)
+UNSTYLED_TAGS = {"html", "head", "title", "meta", "link", "base"}
+
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+SIMPLE_PART = re.compile(r"([.#]?)(-?[_A-Za-z][-\w]*|\*)")
+COMBINATOR = re.compile(r"\s*(>)\s*|\s+")
+
+WALK = re.compile(
+    r"(?P<skip><!--.*?-->|<(?P<raw>script|textarea)\b.*?</(?P=raw)\s*>)"
+    r"|(?P<style>(?P<style_open><style\b[^>]*>)(?P<css>.*?)</style\s*>)"
+    r"|</\s*(?P<end>[A-Za-z][\w-]*)\s*>"
+    r"|<(?P<start>[A-Za-z][\w-]*)(?P<attrs>(?:\"[^\"]*\"|'[^']*'|[^'\">])*)>",
+    re.IGNORECASE | re.DOTALL,
+)
+# <style> contents outside comments (group 1 is None for a comment)
+STYLE_BLOCK = re.compile(r"<!--.*?-->|<style\b[^>]*>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+CLASS_ATTR = re.compile(r"(?:^|\s)class\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))", re.IGNORECASE)
+ID_ATTR = re.compile(r"(?:^|\s)id\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))", re.IGNORECASE)
+INLINE_PROPERTY = re.compile(r"(?:^|;)\s*([-\w]+)\s*:")
+STYLE_ATTR = re.compile(r"(?:^|\s)style\s*=\s*(?:\"([^\"]*)\"|'([^']*)')", re.IGNORECASE)
+
+
+class Compound(NamedTuple):
+    tag: Optional[str]                 # None = any
+    classes: FrozenSet[str]
+    id: Optional[str]
+
+
+class Rule(NamedTuple):
+    parts: Tuple[Tuple[str, Compound], ...]   # right to left: (combinator to the left, compound)
+    specificity: Tuple[int, int, int]
+    order: int
+    declarations: Tuple[Tuple[str, str, bool], ...]   # (property, value, important)
+
+
+class Stylesheet(NamedTuple):
+    by_id: Dict[str, List[Rule]]
+    by_class: Dict[str, List[Rule]]
+    by_tag: Dict[str, List[Rule]]
+    universal: List[Rule]
+    leftover: str                      # CSS that stays in <style>
+    contextual: bool                   # any rule looks at ancestors (.footer p)
+    merged: dict                       # memo for _sheet_declarations
+    tags: dict                         # memo: start tag -> styled tag, non-contextual sheets
+
+
+# ======================
+# Stylesheet parsing
+# ======================
+def _split(text: str, sep: str) -> List[str]:
+    """Split on sep outside quotes and parentheses."""
+    parts, buf, depth, quote = [], [], 0, None
+    for ch in text:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif ch == sep and depth == 0:
+            parts.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    parts.append("".join(buf))
+    return parts
+
+
+def _statements(css: str) -> List[Tuple[str, Optional[str]]]:
+    """Top-level (prelude, block) pairs; block is None for `@x ...;` statements."""
+    out = []
+    i, n = 0, len(css)
+    start = 0
+    quote = None
+    depth = 0
+    while i < n:
+        ch = css[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif ch == ";" and depth == 0:
+            prelude = css[start:i].strip()
+            if prelude:
+                out.append((prelude, None))
+            start = i + 1
+        elif ch == "{" and depth == 0:
+            prelude = css[start:i].strip()
+            level, j = 1, i + 1
+            while j < n and level:
+                if css[j] == "{":
+                    level += 1
+                elif css[j] == "}":
+                    level -= 1
+                j += 1
+            out.append((prelude, css[i + 1:j - 1]))
+            i = start = j
+            continue
+        i += 1
+    return out
+
+
+def parse_selector(selector: str) -> Optional[Tuple[Tuple[str, Compound], ...]]:
+    """Compiled selector (right to left), or None if it can't be inlined."""
+    tokens = []
+    pos = 0
+    selector = selector.strip()
+    while pos < len(selector):
+        tag, classes, ident = None, set(), None
+        start = pos
+        while pos < len(selector):
+            m = SIMPLE_PART.match(selector, pos)
+            if not m:
+                break
+            prefix, name = m.groups()
+            if prefix == ".":
+                classes.add(name)
+            elif prefix == "#":
+                ident = name
+            elif name != "*":
+                tag = name.lower()
+            pos = m.end()
+        if pos == start:
+            return None
+
+        combinator = ""
+        if pos < len(selector):
+            m = COMBINATOR.match(selector, pos)
+            if not m or m.end() == pos:
+                return None                # :pseudo, [attr], +, ~ ...
+            combinator = ">" if m.group(1) else " "
+            pos = m.end()
+        tokens.append((combinator, Compound(tag, frozenset(classes), ident)))
+
+    if not tokens or tokens[-1][0]:
+        return None
+    # Right to left, each compound with the combinator joining it to the one on its left
+    compounds = [c for _, c in tokens]
+    combinators = [""] + [comb for comb, _ in tokens[:-1]]
+    return tuple(zip(reversed(combinators), reversed(compounds)))
+
+
+def _specificity(parts) -> Tuple[int, int, int]:
+    return (
+        sum(c.id is not None for _, c in parts),
+        sum(len(c.classes) for _, c in parts),
+        sum(c.tag is not None for _, c in parts),
+    )
+
+
+def parse_declarations(body: str) -> Tuple[Tuple[str, str, bool], ...]:
+    decls = []
+    for decl in _split(body, ";"):
+        prop, sep, value = decl.partition(":")
+        prop, value = prop.strip().lower(), " ".join(value.split())
+        if not sep or not prop or not value:
+            continue
+        important = value.lower().endswith("!important")
+        if important:
+            value = value[: -len("!important")].rstrip()
+        decls.append((prop, value, important))
+    return tuple(decls)
+
+
+def parse_stylesheet(css: str) -> Stylesheet:
+    """Compile the inlinable rules of a stylesheet; the rest is kept as leftover CSS."""
+    sheet = Stylesheet({}, {}, {}, [], "", False, {}, {})
+    leftover = []
+    order = 0
+    contextual = False
+
+    for prelude, block in _statements(CSS_COMMENT.sub("", css)):
+        if block is None:
+            leftover.append(f"{prelude};")
+            continue
+        if prelude.startswith("@"):
+            leftover.append(f"{prelude}{{{block}}}")
+            continue
+
+        declarations = parse_declarations(block)
+        kept = []
+        for selector in _split(prelude, ","):
+            parts = parse_selector(selector)
+            if parts is None:
+                kept.append(selector.strip())
+                continue
+
+            rule = Rule(parts, _specificity(parts), order, declarations)
+            order += 1
+            contextual = contextual or len(parts) > 1
+            key = parts[0][1]
+            if key.id is not None:
+                sheet.by_id.setdefault(key.id, []).append(rule)
+            elif key.classes:
+                sheet.by_class.setdefault(min(key.classes), []).append(rule)
+            elif key.tag is not None:
+                sheet.by_tag.setdefault(key.tag, []).append(rule)
+            else:
+                sheet.universal.append(rule)
+
+        if kept:
+            leftover.append(f"{','.join(kept)}{{{block}}}")
+
+    return sheet._replace(leftover="\n".join(leftover), contextual=contextual)
+
+
+compile_stylesheet = lru_cache(maxsize=STYLE_CACHE_SIZE)(parse_stylesheet)
+
+
+# ======================
+# Matching
+# ======================
+class _Element(NamedTuple):
+    tag: str
+    classes: FrozenSet[str]
+    id: Optional[str]
+
+
+def _compound_matches(c: Compound, el: _Element) -> bool:
+    return (
+        (c.tag is None or c.tag == el.tag)
+        and (c.id is None or c.id == el.id)
+        and c.classes <= el.classes
+    )
+
+
+def _matches(parts, i: int, el: _Element, ancestors: List[_Element], depth: int) -> bool:
+    """Does parts[i:] match el, whose ancestors are ancestors[:depth]?"""
+    combinator, compound = parts[i]
+    if not _compound_matches(compound, el):
+        return False
+    if i + 1 == len(parts):
+        return True
+    # The combinator stored with parts[i] joins it to parts[i + 1] (its left)
+    if combinator == ">":
+        return depth > 0 and _matches(parts, i + 1, ancestors[depth - 1], ancestors, depth - 1)
+    for d in range(depth - 1, -1, -1):
+        if _matches(parts, i + 1, ancestors[d], ancestors, d):
+            return True
+    return False
+
+
+def _attr(pattern, attrs: str) -> Optional[str]:
+    m = pattern.search(attrs)
+    if not m:
+        return None
+    return next(g for g in m.groups() if g is not None)
+
+
+def _sheet_declarations(sheet: Stylesheet, rules: List[Rule]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    ({property: declaration}, [!important declarations]) of matched rules
+    in cascade order, memoized on the sheet per rule combination.
+    """
+    key = tuple(sorted(r.order for r in rules))
+    merged = sheet.merged.get(key)
+    if merged is None:
+        normal, important = {}, {}
+        for rule in sorted(rules, key=lambda r: (r.specificity, r.order)):
+            for prop, value, imp in rule.declarations:
+                target = important if imp else normal
+                target.pop(prop, None)
+                target[prop] = f"{prop}:{value} !important" if imp else f"{prop}:{value}"
+        normal = {prop: d for prop, d in normal.items() if prop not in important}
+        merged = sheet.merged[key] = (normal, list(important.values()))
+    return merged
+
+
+def _merge_style(sheet: Stylesheet, rules: List[Rule], inline: Optional[str]) -> str:
+    """Stylesheet declarations under the inline style, !important ones on top."""
+    normal, important = _sheet_declarations(sheet, rules)
+    inline = (inline or "").strip().rstrip(";").strip()
+    if not inline:
+        return ";".join([*normal.values(), *important])
+
+    overridden = {p.lower() for p in INLINE_PROPERTY.findall(inline)}
+    parts = [d for prop, d in normal.items() if prop not in overridden]
+    parts.append(inline)
+    parts.extend(important)
+    return ";".join(parts)
+
+
+def _set_style(tag: str, attrs: str, style: str, self_closing: bool) -> str:
+    quoted = style.replace('"', "&quot;")
+    if STYLE_ATTR.search(attrs):
+        attrs = STYLE_ATTR.sub(lambda m: f' style="{quoted}"', attrs, count=1)
+    else:
+        body = attrs.rstrip()
+        if self_closing:
+            body = body[:-1].rstrip()
+        attrs = f'{body} style="{quoted}"' + (" /" if self_closing else "")
+    return f"<{tag}{attrs}>"
+
+
+class _TagInfo(NamedTuple):
+    element: _Element
+    void: bool                         # void / self-closing: never an ancestor
+    styled: Optional[str]              # with non-contextual rules inlined; None = unchanged
+    contextual: bool                   # a candidate rule depends on ancestors
+
+
+def _candidates(sheet: Stylesheet, el: _Element) -> List[Rule]:
+    # Each rule sits in exactly one bucket, so there are no repeats
+    rules = list(sheet.universal)
+    rules += sheet.by_tag.get(el.tag, ())
+    if el.id is not None:
+        rules += sheet.by_id.get(el.id, ())
+    for cls in el.classes:
+        rules += sheet.by_class.get(cls, ())
+    return rules
+
+
+def _styled_tag(sheet: Stylesheet, el: _Element, tag: str, attrs: str, ancestors: List[_Element]) -> Optional[str]:
+    """The start tag with the sheet's matching rules inlined, or None if none match."""
+    if el.tag in UNSTYLED_TAGS:
+        return None
+    matched = [r for r in _candidates(sheet, el) if _matches(r.parts, 0, el, ancestors, len(ancestors))]
+    if not matched:
+        return None
+    style = _merge_style(sheet, matched, _attr(STYLE_ATTR, attrs))
+    return _set_style(tag, attrs, style, attrs.rstrip().endswith("/"))
+
+
+def _tag_info(sheet: Stylesheet, tag: str, attrs: str) -> _TagInfo:
+    name = tag.lower()
+    el = _Element(name, frozenset((_attr(CLASS_ATTR, attrs) or "").split()), _attr(ID_ATTR, attrs))
+    contextual = any(len(r.parts) > 1 for r in _candidates(sheet, el))
+    styled = None if contextual else _styled_tag(sheet, el, tag, attrs, [])
+    void = name in VOID_TAGS or attrs.rstrip().endswith("/")
+    return _TagInfo(el, void, styled, contextual)
+
+
+# ======================
+# Inlining
+# ======================
+def inline_css(html: str, cache: bool = True) -> str:
+    """
+    html with its <style> rules inlined. cache=False re-parses the
+    stylesheet (the naive approach, kept for benchmarks).
+    """
+    blocks = [m.group(1) for m in STYLE_BLOCK.finditer(html) if m.group(1) is not None]
+    if not blocks:
+        return html
+
+    parse = compile_stylesheet if cache else parse_stylesheet
+    sheet = parse("\n".join(blocks))
+
+    out = []
+    last = 0
+    stack: List[_Element] = []
+    style_written = False
+
+    for m in WALK.finditer(html):
+        if m.group("skip"):
+            continue
+
+        if m.group("style"):
+            out.append(html[last:m.start()])
+            last = m.end()
+            if sheet.leftover and not style_written:
+                out.append(f"{m.group('style_open')}{sheet.leftover}</style>")
+                style_written = True
+            continue
+
+        end = m.group("end")
+        if end:
+            if sheet.contextual:
+                end = end.lower()
+                for i in range(len(stack) - 1, -1, -1):
+                    if stack[i].tag == end:
+                        del stack[i:]
+                        break
+            continue
+
+        # Per distinct start tag, the work that doesn't depend on ancestors
+        raw = m.group(0)
+        info = sheet.tags.get(raw)
+        if info is None:
+            info = _tag_info(sheet, m.group("start"), m.group("attrs"))
+            if len(sheet.tags) < TAG_MEMO_SIZE:
+                sheet.tags[raw] = info
+
+        styled = info.styled
+        if info.contextual:
+            styled = _styled_tag(sheet, info.element, m.group("start"), m.group("attrs"), stack)
+        if sheet.contextual and not info.void:
+            stack.append(info.element)
+
+        if styled is not None:
+            out.append(html[last:m.start()])
+            out.append(styled)
+            last = m.end()
+
+    out.append(html[last:])
+    return "".join(out)
@@ -0,0 +1,381 @@
+"""
+Reservation CSV processor behind process-csv.py, also usable from the CLI.
+
+Each export is cleaned the same way as before - column AL becomes
+"reservation code", the known columns are kept in a fixed order and rows
+are sorted by "row id" - but without ever holding a whole file in memory:
+
+- The header row is fingerprinted and its resolved layout (which source
+  columns to keep, under which names) is cached on disk, so known export
+  layouts skip header resolution and are read with usecols - the ~30
+  unused columns are never parsed.
+- The CSV is read in chunks. Each chunk is sorted and spilled to a temp
+  run file, then the runs are k-way merged into the output (external sort).
+- Files are processed in parallel worker processes, written straight to
+  disk, and the zip is built from those files on disk.
+
+Usage (from 15.python/):
+    python -m mvtools.csv_processor exports/*.csv --out processed/ --zip processed_files.zip
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from mvtools.loader import CACHE_DIR, file_digest
+
+CHUNK_ROWS = 200_000
+ENCODING = "utf-8-sig"    # tolerate the BOM Excel puts in front of exports
+ROW_ID = "row id"
+RESERVATION_CODE = "reservation code"
+AL_INDEX = 37             # Column AL
+
+SCHEMA_CACHE = CACHE_DIR / "csv_schemas.json"
+SCHEMA_CACHE_SIZE = 256   # layouts kept, most recently added last
+# Bump when resolve_columns() changes so cached layouts are ignored
+SCHEMA_VERSION = 2
+
+Layout = List[Tuple[int, str]]
+
+CANON = {
+    "row id": "row id",
+    "group id": "group id",
+    "hotel": "hotel",
+    "room type": "room type",
+    "check in": "check in",
+    "check out": "check out",
+    "price": "price",
+    "reservation code": "reservation code",
+}
+
+DESIRED_ORDER = [
+    "row id",
+    "reservation code",
+    "group id",
+    "hotel",
+    "room type",
+    "check in",
+    "check out",
+    "price",
+]
+
+
+class Result(NamedTuple):
+    source: str
+    output: Optional[str]
+    rows: int
+    error: Optional[str]
+
+
+# ======================
+# Header resolution
+# ======================
+def normalize(s: str) -> str:
+    s = str(s).strip().lower()
+    s = re.sub(r"[\s_\-]+", " ", s)
+    return s
+
+
+def resolve_columns(header: Sequence[str]) -> Layout:
+    """
+    (source position, output name) of the columns to keep, in output order.
+
+    Column AL is renamed to "reservation code", headers are matched to CANON
+    after normalization, and any header mentioning both "reservation" and
+    "code" is taken as the reservation code. When several columns map to
+    the same name (a duplicated "Hotel" header), the first one is kept, as
+    pandas did by renaming the others to "Hotel.1", ...
+    """
+    names = [str(c) for c in header]
+
+    if len(names) > AL_INDEX and names[AL_INDEX].strip() != RESERVATION_CODE:
+        names[AL_INDEX] = RESERVATION_CODE
+
+    positions = {}
+    for i, c in enumerate(names):
+        key = normalize(c)
+        target = CANON.get(key)
+        if "reservation" in key and "code" in key:
+            target = RESERVATION_CODE
+        if target is not None:
+            positions.setdefault(target, i)
+
+    return [(positions[name], name) for name in DESIRED_ORDER if name in positions]
+
+
+def read_header(path) -> List[str]:
+    with open(path, newline="", encoding=ENCODING) as f:
+        return next(csv.reader(f), [])
+
+
+# ======================
+# Layout cache
+# ======================
+_layouts: Optional[Dict[str, Layout]] = None
+
+
+def header_fingerprint(header: Sequence[str]) -> str:
+    """Hash of an export's header row (names and positions)."""
+    return file_digest(
+        json.dumps([SCHEMA_VERSION, list(header)], ensure_ascii=False).encode("utf-8")
+    )
+
+
+def _load_layouts() -> Dict[str, Layout]:
+    try:
+        with open(SCHEMA_CACHE, encoding="utf-8") as f:
+            cached = json.load(f)
+        return {k: [(int(i), str(n)) for i, n in v] for k, v in cached.items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def _store_layouts(layouts: Dict[str, Layout]) -> None:
+    """Write the layout cache atomically; failures just skip caching."""
+    tmp = SCHEMA_CACHE.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        SCHEMA_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(layouts, f, ensure_ascii=False)
+        os.replace(tmp, SCHEMA_CACHE)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def column_layout(header: Sequence[str]) -> Layout:
+    """
+    resolve_columns(header), from the layout cache when the header is known.
+
+    Unknown headers are resolved and added to the cache (in memory and on
+    disk, shared by worker processes and later runs).
+    """
+    global _layouts
+    if _layouts is None:
+        _layouts = _load_layouts()
+
+    key = header_fingerprint(header)
+    layout = _layouts.get(key)
+    if layout is not None:
+        return layout
+
+    layout = resolve_columns(header)
+
+    # Merge with what other processes may have added meanwhile
+    layouts = _load_layouts()
+    layouts.pop(key, None)
+    layouts[key] = layout
+    _layouts = dict(list(layouts.items())[-SCHEMA_CACHE_SIZE:])
+    _store_layouts(_layouts)
+
+    return layout
+
+
+# ======================
+# Chunked processing
+# ======================
+def iter_chunks(path, columns: Layout, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    The layout's columns of the CSV, chunk_rows rows at a time, all as text.
+
+    Only those columns are parsed (usecols); they come back in file order
+    and are put into layout order here.
+    """
+    positions = [i for i, _ in columns]
+    if not positions:
+        return
+
+    in_file_order = sorted(positions)
+    order = [in_file_order.index(i) for i in positions]
+
+    reader = pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        encoding=ENCODING,
+        usecols=positions,
+        chunksize=chunk_rows,
+    )
+    with reader:
+        for chunk in reader:
+            chunk = chunk.iloc[:, order]
+            chunk.columns = [name for _, name in columns]
+            yield chunk
+
+
+def _all_numeric(values: pd.Series) -> bool:
+    return bool(pd.to_numeric(values, errors="coerce").notna().all())
+
+
+def _write_run(chunk: pd.DataFrame, path: Path, numeric: bool):
+    if numeric:
+        key = pd.to_numeric(chunk[ROW_ID])
+    else:
+        key = chunk[ROW_ID]
+    order = key.sort_values(kind="stable").index
+    chunk.loc[order].to_csv(path, index=False, header=False, lineterminator="\n")
+
+
+def _read_run(path: Path) -> Iterator[List[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+
+
+def process_file(
+    src,
+    dst,
+    chunk_rows: int = CHUNK_ROWS,
+    tmp_dir: Optional[str] = None,
+) -> int:
+    """
+    Clean one export into dst with bounded memory. Returns the row count.
+
+    Rows are sorted by "row id" - numerically if every id is a number,
+    as text otherwise - and the original cell text is written unchanged.
+    """
+    columns = column_layout(read_header(src))
+    names = [name for _, name in columns]
+    rows = 0
+
+    with open(dst, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(names)
+
+        if ROW_ID not in names:
+            for chunk in iter_chunks(src, columns, chunk_rows):
+                chunk.to_csv(out, index=False, header=False, lineterminator="\n")
+                rows += len(chunk)
+            return rows
+
+        with tempfile.TemporaryDirectory(dir=tmp_dir) as runs_dir:
+            runs: List[Tuple[Path, bool]] = []
+            all_numeric = True
+
+            for n, chunk in enumerate(iter_chunks(src, columns, chunk_rows)):
+                if chunk.empty:
+                    continue
+
+                numeric = _all_numeric(chunk[ROW_ID])
+                all_numeric &= numeric
+
+                run = Path(runs_dir) / f"run-{n:05d}.csv"
+                _write_run(chunk, run, numeric)
+                runs.append((run, numeric))
+                rows += len(chunk)
+
+            # A text id further down the file turns the whole sort into a
+            # text sort; re-sort the runs that were sorted as numbers
+            if not all_numeric:
+                for run, numeric in runs:
+                    if numeric:
+                        chunk = pd.read_csv(
+                            run, header=None, names=names, dtype=str, keep_default_na=False
+                        )
+                        _write_run(chunk, run, numeric=False)
+
+            key_at = names.index(ROW_ID)
+            if all_numeric:
+                def key(row):
+                    return float(row[key_at])
+            else:
+                def key(row):
+                    return row[key_at]
+
+            writer.writerows(heapq.merge(*(_read_run(run) for run, _ in runs), key=key))
+
+    return rows
+
+
+def output_name(src) -> str:
+    return f"{Path(src).stem} (processed).csv"
+
+
+def _process_one(src, out_dir, chunk_rows: int) -> Result:
+    dst = Path(out_dir) / output_name(src)
+    try:
+        rows = process_file(src, dst, chunk_rows, tmp_dir=str(out_dir))
+        return Result(str(src), str(dst), rows, None)
+    except Exception as e:  # one bad export must not stop the batch
+        if dst.exists():
+            dst.unlink()
+        return Result(str(src), None, 0, f"{type(e).__name__}: {e}")
+
+
+def process_files(
+    paths: Iterable,
+    out_dir,
+    workers: Optional[int] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[Result]:
+    """Process exports in parallel into out_dir; yield each Result as it finishes."""
+    paths = list(paths)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield _process_one(path, out_dir, chunk_rows)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        futures = [pool.submit(_process_one, path, out_dir, chunk_rows) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_zip(paths: Iterable, zip_path, names: Optional[Dict[str, str]] = None) -> Path:
+    """
+    Zip files from disk, streaming each member in (nothing held in memory).
+
+    Members are named after the files, or names[str(path)] where given.
+    """
+    zip_path = Path(zip_path)
+    names = names or {}
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in paths:
+            info = zipfile.ZipInfo.from_file(path, names.get(str(path), Path(path).name))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as src, zipf.open(info, "w", force_zip64=True) as member:
+                shutil.copyfileobj(src, member, 1024 * 1024)
+    return zip_path
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and sort reservation CSV exports")
+    parser.add_argument("files", nargs="+", help="CSV exports")
+    parser.add_argument("--out", default="processed", help="Output directory")
+    parser.add_argument("--zip", help="Also bundle the outputs into this zip file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--chunk-rows", type=int, default=CHUNK_ROWS,
+        help="Rows held in memory per worker"
+    )
+    args = parser.parse_args(argv)
+
+    written = []
+    for result in process_files(args.files, args.out, args.workers, args.chunk_rows):
+        if result.error:
+            print(f"[ERROR] {result.source}: {result.error}")
+        else:
+            print(f"[OK] {result.source} → {result.output} ({result.rows:,} rows)")
+            written.append(result.output)
+
+    if args.zip and written:
+        print(f"Zipped {len(written)} file(s) into {write_zip(sorted(written), args.zip)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Precomputed daily cube for signup / check-in metrics.
+
+Built once per upload, then any date range is answered by merging the
+per-day cells instead of re-running groupby(...).nunique() on raw rows.
+
+Layout
+- Check-ins: one entry per distinct (day, group, tenant), where a group is a
+  (hotel_key, City, brand_model) cell and tenants are factorized to int32.
+  Entries are sorted by day, group, tenant, so every day x group cell is a
+  sorted run of tenant codes, and a per-day offset table (CSR style) turns
+  any date range into one contiguous slice. Distinct tenants across days are
+  counted with a single np.unique over (group, tenant) pairs.
+- Signups: summed per day x hotel_key.
+"""
+from datetime import date
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+DateLike = Union[date, pd.Timestamp, str]
+
+
+class DailyCube:
+    """
+    Per-day aggregates of a signup + reservation upload.
+
+    Use build_cube() to construct; query() returns one row per
+    (hotel_key, city, brand_model) with "checkin" and "signup" columns.
+    """
+
+    def __init__(
+        self,
+        groups: pd.DataFrame,
+        cell_days: np.ndarray,
+        cell_offsets: np.ndarray,
+        entry_groups: np.ndarray,
+        entry_tenants: np.ndarray,
+        signups: pd.DataFrame,
+        hotel_col: str,
+    ):
+        self.groups = groups                # group id -> key columns
+        self.cell_days = cell_days          # datetime64[D], one per day, sorted
+        self.cell_offsets = cell_offsets    # entry offset per day, len(days) + 1
+        self.entry_groups = entry_groups    # int32, group id per entry
+        self.entry_tenants = entry_tenants  # int32, tenant code per entry
+        self.signups = signups              # day, hotel_col, signup
+        self.hotel_col = hotel_col
+
+    # ======================
+    # Queries
+    # ======================
+    def _cell_range(self, start: DateLike, end: DateLike):
+        start = np.datetime64(pd.Timestamp(start).date(), "D")
+        end = np.datetime64(pd.Timestamp(end).date(), "D")
+        lo = np.searchsorted(self.cell_days, start, side="left")
+        hi = np.searchsorted(self.cell_days, end, side="right")
+        return self.cell_offsets[lo], self.cell_offsets[hi]
+
+    def checkins(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """Distinct tenants per (hotel_key, city, brand_model) in [start, end]."""
+        a, b = self._cell_range(start, end)
+        g = self.entry_groups[a:b].astype(np.int64)
+        t = self.entry_tenants[a:b].astype(np.int64)
+
+        pairs = np.unique((g << 32) | t)
+        counts = np.bincount(pairs >> 32, minlength=len(self.groups))
+
+        out = self.groups.copy()
+        out["checkin"] = counts
+        return out[out["checkin"] > 0].reset_index(drop=True)
+
+    def signup_totals(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """Summed signups per hotel_key in [start, end]."""
+        days = self.signups["day"]
+        mask = (days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))
+        return (
+            self.signups[mask]
+            .groupby(self.hotel_col)["signup"]
+            .sum()
+            .reset_index()
+        )
+
+    def query(self, start: DateLike, end: DateLike) -> pd.DataFrame:
+        """Check-ins with the hotel's signups for the same range merged in."""
+        return self.checkins(start, end).merge(
+            self.signup_totals(start, end),
+            on=self.hotel_col,
+            how="left"
+        ).fillna({"signup": 0})
+
+
+# ======================
+# Builder
+# ======================
+def build_cube(
+    res: pd.DataFrame,
+    signup: pd.DataFrame,
+    *,
+    hotel_col: str,
+    city_col: str,
+    brand_col: str,
+    res_date_col: str,
+    tenant_col: str,
+    signup_date_col: str,
+    signup_count_col: str,
+) -> DailyCube:
+    """
+    Build a DailyCube from preprocessed reservation and signup frames.
+
+    Both frames must already carry the normalized hotel key in hotel_col and
+    parsed datetimes in their date columns. Rows with a missing key or tenant
+    are skipped, matching groupby(...).nunique().
+    """
+    keys = [hotel_col, city_col, brand_col]
+
+    res = res[keys + [res_date_col, tenant_col]].dropna()
+
+    group_ids, groups = pd.MultiIndex.from_frame(res[keys]).factorize()
+    tenant_ids, _ = pd.factorize(res[tenant_col])
+    days = res[res_date_col].to_numpy(dtype="datetime64[D]")
+
+    # One entry per (day, group, tenant), sorted by day then group then tenant
+    entries = pd.DataFrame({
+        "day": days,
+        "group": group_ids.astype(np.int32),
+        "tenant": tenant_ids.astype(np.int32),
+    }).drop_duplicates()
+    order = np.lexsort((entries["tenant"], entries["group"], entries["day"]))
+    entries = entries.iloc[order]
+
+    entry_days = entries["day"].to_numpy(dtype="datetime64[D]")
+    # First entry of each day (none when no reservation survived the filters)
+    starts = np.flatnonzero(
+        np.r_[True, entry_days[1:] != entry_days[:-1]]
+    ) if len(entry_days) else np.empty(0, dtype=np.intp)
+
+    groups_df = groups.to_frame(index=False)
+    groups_df.columns = keys
+
+    signups = (
+        signup.assign(day=signup[signup_date_col].dt.normalize())
+        .groupby(["day", hotel_col])[signup_count_col]
+        .sum()
+        .reset_index(name="signup")
+    )
+
+    return DailyCube(
+        groups=groups_df,
+        cell_days=entry_days[starts],
+        cell_offsets=np.r_[starts, len(entries)],
+        entry_groups=entries["group"].to_numpy(),
+        entry_tenants=entries["tenant"].to_numpy(),
+        signups=signups,
+        hotel_col=hotel_col,
+    )
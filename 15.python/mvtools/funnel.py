@@ -0,0 +1,121 @@
+"""
+Daily recruit funnel helpers for mv-tool-3 (signup file only).
+"""
+import pandas as pd
+
+from mvtools.ranking import city_sort_key
+
+# Only daily dates like "May 19, 2025"; pivot headers / totals don't match
+DAILY_DATE_PATTERN = r"^[A-Za-z]+ \d{1,2}, \d{4}$"
+# "Sept" is common in exports but not a %b abbreviation
+MONTH_ALIASES = {r"^Sept\b": "Sep"}
+
+
+def daily_labels(values: pd.Series) -> pd.Series:
+    """True where a check-in label looks like a daily date."""
+    return values.astype("string").str.strip().str.match(DAILY_DATE_PATTERN, na=False)
+
+
+def parse_daily_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse daily check-in labels ("May 19, 2025") in one vectorized pass.
+
+    Full and abbreviated month names are parsed vectorized; the few labels
+    left over (other spellings) go through the general parser one by one,
+    as before.
+
+    Args:
+        values: Raw 'checkin' column of the signup export
+
+    Returns:
+        datetime64 Series, NaT for non-daily rows (pivot headers / totals)
+        and for daily-looking labels that aren't dates
+    """
+    text = values.astype("string").str.strip()
+    daily = text.str.match(DAILY_DATE_PATTERN, na=False)
+
+    parsed = pd.to_datetime(text.where(daily), format="%B %d, %Y", errors="coerce")
+
+    # Abbreviated month names ("Sep 5, 2025") need their own format
+    retry = daily & parsed.isna()
+    if retry.any():
+        short = text[retry]
+        for pattern, repl in MONTH_ALIASES.items():
+            short = short.str.replace(pattern, repl, regex=True, case=False)
+        parsed[retry] = pd.to_datetime(short, format="%b %d, %Y", errors="coerce")
+
+    retry = daily & parsed.isna()
+    if retry.any():
+        parsed[retry] = [pd.to_datetime(v, errors="coerce") for v in text[retry]]
+
+    return parsed
+
+
+# ======================
+# Funnel stages
+# ======================
+STATUS_CHUA_SIGNUP = ["Chưa Sign-up"]
+STATUS_MEMBER = ["Đã Sign-up từ trước"]
+STATUS_NEW_RECRUIT = [
+    "Sign-up sau C/I",
+    "Sign up trước 1 ngày check in",
+    "Sign up trước 2 ngày check in"
+]
+
+CHUA_SIGNUP = "Chua_Signup"
+MEMBER = "Member"
+NEW_RECRUIT = "New_recruit"
+STAGE_ORDER = [CHUA_SIGNUP, MEMBER, NEW_RECRUIT]
+
+STATUS_TO_STAGE = {
+    **{s: CHUA_SIGNUP for s in STATUS_CHUA_SIGNUP},
+    **{s: MEMBER for s in STATUS_MEMBER},
+    **{s: NEW_RECRUIT for s in STATUS_NEW_RECRUIT},
+}
+
+
+def funnel_stage(status: pd.Series) -> pd.Series:
+    """Map 'Sign up status v2' to a categorical funnel stage (NaN if none)."""
+    return pd.Series(
+        pd.Categorical(status.map(STATUS_TO_STAGE), categories=STAGE_ORDER),
+        index=status.index
+    )
+
+
+def daily_funnel(
+    daily_df: pd.DataFrame,
+    city_col: str,
+    status_col: str,
+    count_col: str = "signup_count",
+) -> pd.DataFrame:
+    """
+    Signups per date x city x funnel stage, from a single pivot_table.
+
+    Cities are taken from the data (HCM / HN / DN first). Columns are
+    "<city>_<stage>" plus "Total New Recruit"; one row per date in daily_df.
+    """
+    table = pd.pivot_table(
+        daily_df.assign(stage=funnel_stage(daily_df[status_col])),
+        index="date",
+        columns=[city_col, "stage"],
+        values=count_col,
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+
+    cities = daily_df[city_col].dropna().unique()
+    cities = pd.Series(cities).sort_values(key=city_sort_key).tolist()
+    columns = pd.MultiIndex.from_product([cities, STAGE_ORDER])
+
+    table = table.reindex(
+        index=sorted(daily_df["date"].unique()),
+        columns=columns,
+        fill_value=0
+    )
+    table.columns = [f"{city}_{stage}" for city, stage in columns]
+    table["Total New Recruit"] = table[[f"{c}_{NEW_RECRUIT}" for c in cities]].sum(axis=1)
+
+    table = table.astype(int).rename_axis("Date").reset_index()
+    table["Date"] = pd.to_datetime(table["Date"]).dt.date
+    return table
@@ -0,0 +1,231 @@
+"""
+Bulk JSON POST helpers for the backend scripts (send-b2b-lead, retry).
+
+Requests go through a small thread pool. Each worker keeps its own
+keep-alive requests.Session, a shared token bucket caps the request rate,
+and failed attempts are retried with exponential backoff (honouring
+Retry-After).
+
+POSTs are not assumed to be idempotent - a lead email must not go out
+twice. By default only attempts the server certainly didn't act on are
+retried: 429 / 503 responses and connection errors raised before the
+request was sent. Read timeouts and 500 / 502 / 504 are reported as
+failures. Callers whose endpoint is safe to repeat (a read behind a POST)
+pass idempotent=True to also retry those.
+
+Payloads are consumed lazily, so a CSV can be streamed straight into
+post_all() without reading it first.
+
+DEFAULT_RATE keeps the scripts' old pace (one request every 0.5 s), since
+the backends' limits are unknown; the pool only speeds a run up once the
+caller raises `rate` (--rate on the command line).
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+
+# Rejected before processing: always safe to retry
+RETRY_STATUS = frozenset({429, 503})
+# May have been processed: retried only for idempotent requests
+IDEMPOTENT_RETRY_STATUS = RETRY_STATUS | {500, 502, 504}
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 2.0        # requests / second, all workers together (the old pace)
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.5     # seconds, doubled per attempt
+MAX_BACKOFF = 30.0
+DEFAULT_TIMEOUT = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_for)
+
+
+class Result(NamedTuple):
+    item: Any
+    status: Optional[int]     # None when no response came back at all
+    text: str
+    attempts: int
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+
+def make_session(headers: Optional[Dict[str, str]] = None, pool_size: int = 1) -> requests.Session:
+    """Session that keeps up to pool_size connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True if the request failed before it reached the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        # "Connection aborted" is raised after the request went out
+        cause = error.args[0] if error.args else None
+        return not isinstance(cause, ProtocolError)
+    return False
+
+
+def post_with_backoff(
+    session: requests.Session,
+    url: str,
+    payload: Any,
+    *,
+    bucket: Optional[TokenBucket] = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    timeout: float = DEFAULT_TIMEOUT,
+    idempotent: bool = False,
+) -> Result:
+    """
+    POST payload as JSON, retrying attempts that failed before the server
+    acted on them (429 / 503, connection not made). With idempotent=True,
+    500 / 502 / 504 and any network error are retried too.
+
+    Returns the last attempt's outcome; never raises for HTTP or network
+    errors.
+    """
+    retry_status = IDEMPOTENT_RETRY_STATUS if idempotent else RETRY_STATUS
+    attempt = 0
+    while True:
+        attempt += 1
+        if bucket is not None:
+            bucket.acquire()
+
+        try:
+            response = session.post(url, json=payload, timeout=timeout)
+        except requests.RequestException as e:
+            status, text, delay = None, str(e), None
+            if not (idempotent or _not_sent(e)):
+                return Result(payload, status, text, attempt)
+        else:
+            status, text = response.status_code, response.text
+            if status not in retry_status:
+                return Result(payload, status, text, attempt)
+            delay = _retry_after(response)
+
+        if attempt > retries:
+            return Result(payload, status, text, attempt)
+
+        if delay is None:
+            delay = backoff * 2 ** (attempt - 1)
+        time.sleep(min(delay, MAX_BACKOFF))
+
+
+def post_all(
+    url: str,
+    payloads: Iterable[Any],
+    *,
+    payload_of: Optional[Callable[[Any], Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = DEFAULT_RATE,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    timeout: float = DEFAULT_TIMEOUT,
+    idempotent: bool = False,
+) -> Iterator[Result]:
+    """
+    POST every payload to url and yield a Result for each as it completes.
+
+    At most 2 x concurrency payloads are pulled from the iterable ahead of
+    the workers, so memory stays flat however long the input is. Results
+    come back in completion order; Result.item is the original item.
+
+    If payload_of is given, payloads may be any objects (e.g. CSV rows) and
+    payload_of(item) is what gets posted. See post_with_backoff for which
+    failures are retried.
+    """
+    bucket = TokenBucket(rate) if rate else None
+    local = threading.local()
+    sessions = []
+
+    def send(item):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = make_session(headers)
+            sessions.append(session)
+        result = post_with_backoff(
+            session, url, payload_of(item) if payload_of else item,
+            bucket=bucket, retries=retries, backoff=backoff, timeout=timeout,
+            idempotent=idempotent,
+        )
+        return result._replace(item=item)
+
+    payloads = iter(payloads)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            yield from _drain(pool, send, payloads, 2 * concurrency)
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def _drain(pool, send, payloads, window):
+    """Keep up to `window` sends in flight; yield results as they finish."""
+    pending = set()
+    exhausted = False
+
+    while pending or not exhausted:
+        while not exhausted and len(pending) < window:
+            try:
+                payload = next(payloads)
+            except StopIteration:
+                exhausted = True
+                break
+            pending.add(pool.submit(send, payload))
+
+        if not pending:
+            break
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
@@ -0,0 +1,158 @@
+"""
+Shared upload loader for the mv-tool dashboards.
+
+Every upload is parsed once and stored as Parquet on local disk, keyed by a
+hash of the file content and the read options. Streamlit reruns (and the
+other dashboards, when the same export is uploaded there) read the cached
+Parquet file back with a memory-mapped read instead of re-parsing the
+CSV / XLSX. The cache directory is bounded in size; the least recently used
+entries are evicted first.
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# ======================
+# Config
+# ======================
+CACHE_DIR = Path(
+    os.environ.get("MVTOOLS_CACHE_DIR", Path.home() / ".cache" / "mvtools")
+)
+CACHE_MAX_BYTES = int(os.environ.get("MVTOOLS_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# Bump when the parsing logic changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+# Explicit dtypes for the columns the dashboards rely on. Keeping identifiers
+# as strings avoids float coercion when a column has blanks.
+SIGNUP_DTYPES = {
+    "hotel_short_name": str,
+    "city": str,
+}
+
+RESERVATION_DTYPES = {
+    "Hotel Name": str,
+    "City": str,
+    "tenant_id": str,
+}
+
+
+# ======================
+# Hashing
+# ======================
+def file_digest(data: bytes) -> str:
+    """Content hash of an uploaded file."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _options_key(name: str, dtype: Optional[Dict]) -> str:
+    options = {
+        "version": CACHE_VERSION,
+        "format": _file_format(name),
+        "dtype": {k: getattr(v, "__name__", str(v)) for k, v in (dtype or {}).items()},
+    }
+    return json.dumps(options, sort_keys=True)
+
+
+def cache_key(data: bytes, name: str, dtype: Optional[Dict] = None) -> str:
+    """Cache key for a file: content hash + read options."""
+    options = file_digest(_options_key(name, dtype).encode("utf-8"))
+    return f"{file_digest(data)}-{options[:8]}"
+
+
+# ======================
+# Parsing
+# ======================
+def _file_format(name: str) -> str:
+    return "csv" if name.lower().endswith(".csv") else "excel"
+
+
+def _read_source(file) -> Tuple[str, bytes]:
+    """Return (file name, raw bytes) for a Streamlit upload or a local path."""
+    if isinstance(file, (str, Path)):
+        path = Path(file)
+        return path.name, path.read_bytes()
+    return file.name, file.getvalue()
+
+
+def _parse(name: str, data: bytes, dtype: Optional[Dict]) -> pd.DataFrame:
+    buffer = io.BytesIO(data)
+    if _file_format(name) == "csv":
+        return pd.read_csv(buffer, dtype=dtype, low_memory=False)
+    return pd.read_excel(buffer, dtype=dtype)
+
+
+# ======================
+# Parquet cache
+# ======================
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{key}.parquet"
+
+
+def _store(df: pd.DataFrame, path: Path) -> None:
+    """Write df to the cache atomically, then enforce the size budget."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    try:
+        df.to_parquet(tmp, engine="pyarrow", index=False)
+    except (ImportError, ValueError, TypeError, NotImplementedError, OSError):
+        # No pyarrow, mixed-type object columns or non-string headers:
+        # such files simply aren't cached.
+        tmp.unlink(missing_ok=True)
+        return
+    os.replace(tmp, path)
+    evict(CACHE_MAX_BYTES)
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """Delete least recently used cache entries until under max_bytes."""
+    if not CACHE_DIR.exists():
+        return
+
+    entries = []
+    for p in CACHE_DIR.glob("*.parquet"):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def load_file(file, dtype: Optional[Dict] = None) -> pd.DataFrame:
+    """
+    Load an uploaded CSV / XLSX (or a local path) through the Parquet cache.
+
+    Args:
+        file: Streamlit UploadedFile or a path to a CSV / XLSX file
+        dtype: Optional {column: dtype} passed to the CSV / Excel reader;
+            columns missing from the file are ignored
+
+    Returns:
+        The parsed DataFrame
+    """
+    name, data = _read_source(file)
+    path = _cache_path(cache_key(data, name, dtype))
+
+    if path.exists():
+        try:
+            # Touch so eviction treats the entry as recently used
+            os.utime(path)
+            return pd.read_parquet(path, engine="pyarrow", memory_map=True)
+        except (ImportError, OSError, ValueError):
+            path.unlink(missing_ok=True)
+
+    df = _parse(name, data, dtype)
+    _store(df, path)
+    return df
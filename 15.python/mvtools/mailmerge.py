@@ -0,0 +1,453 @@
+"""
+Bulk mail merge: recipient rows (CSV / Parquet) -> rendered emails.
+
+Rows are streamed from the input in batches; each batch is rendered in a
+worker process and written straight to its own output shard, so memory
+stays flat however long the list is and the parent only sees counts.
+
+The template of each row is picked by formatting a path pattern with the
+row's columns, e.g. with columns lang=en and tier=platinum
+
+    ../28.wrapped2025/{tier}-{lang}.html  ->  ../28.wrapped2025/platinum-en.html
+
+Outputs:
+    jsonl  out/shard-00000.jsonl, one {"to", "subject", "template", "html"} per row
+    eml    out/shard-00000/000000001.eml, ready-to-send MIME messages
+    smtp   sent to an SMTP server, e.g. a local stand-in
+           (python -m aiosmtpd -n -l localhost:1025)
+
+Usage (from 15.python/):
+    python -m mvtools.mailmerge members.parquet "../28.wrapped2025/{tier}-{lang}.html" \\
+        --out wrapped2025/ --format eml --subject "Your 2025 with M Village"
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import smtplib
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from mvtools.css_inline import inline_css
+from mvtools.template_manifest import build_manifest, validate
+from mvtools.templates import MissingField, compile_template, load_template
+
+BATCH_ROWS = 1000
+FORMATS = ("jsonl", "eml", "smtp")
+DEFAULT_SENDER = "M Village <noreply@mvillage.vn>"
+TO_COLUMN = "Email"
+ENCODING = "utf-8"
+SHARD_GLOB = "shard-*"
+
+TITLE = re.compile(r"<title>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+class Options(NamedTuple):
+    pattern: str
+    out_dir: str
+    format: str = "jsonl"
+    to_column: str = TO_COLUMN
+    subject: Optional[str] = None      # template string; default: the template's <title>
+    sender: str = DEFAULT_SENDER
+    smtp: Optional[str] = None         # host:port, for format="smtp"
+    inline_css: bool = False           # copy <style> rules into style attributes
+
+
+class MalformedRow(ValueError):
+    """A CSV row with more fields than the header."""
+
+
+class BatchResult(NamedTuple):
+    batch: int
+    rendered: int
+    errors: List[Tuple[int, str]]      # (row number, error)
+    output: Optional[str]
+
+
+# ======================
+# Input
+# ======================
+def read_batches(path, batch_rows: int = BATCH_ROWS) -> Iterator[List[Dict[str, str]]]:
+    """Rows of a CSV or Parquet file as dicts of text, batch_rows at a time."""
+    if Path(path).suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+            yield [
+                {k: "" if v is None else str(v) for k, v in row.items()}
+                for row in batch.to_pylist()
+            ]
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) == batch_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# ======================
+# Rendering (worker side)
+# ======================
+_subjects: Dict[str, object] = {}
+
+
+def template_path(pattern: str, row: Dict[str, str]) -> str:
+    """The row's template variant: pattern formatted with its columns."""
+    try:
+        return pattern.format_map({k: (v or "").strip() for k, v in row.items()})
+    except KeyError as e:
+        raise MissingField(f"{e.args[0]} (template pattern)") from None
+
+
+def _subject_template(path: str, subject: Optional[str]):
+    key = subject if subject is not None else path
+    compiled = _subjects.get(key)
+    if compiled is None:
+        if subject is None:
+            with open(path, encoding=ENCODING) as f:
+                m = TITLE.search(f.read())
+            subject = " ".join(m.group(1).split()) if m else ""
+        compiled = _subjects[key] = compile_template(subject)
+    return compiled
+
+
+def check_shape(row: Dict[str, str]) -> None:
+    """
+    Reject a CSV row whose fields don't line up with the header.
+
+    Raises:
+        MalformedRow: the row has more fields than the header
+    """
+    # csv.DictReader keeps surplus fields in a list under None; the
+    # columns are likely shifted (an unquoted comma), so don't guess
+    extra = row.get(None)
+    if extra is not None:
+        raise MalformedRow(f"{len(extra)} field(s) more than the header")
+
+
+def render_row(row: Dict[str, str], options: Options) -> Tuple[str, str, str, str]:
+    """(to, subject, template path, html) of one recipient row."""
+    check_shape(row)
+    path = template_path(options.pattern, row)
+    html = load_template(path).render(row)
+    if options.inline_css:
+        html = inline_css(html)
+    subject = _subject_template(path, options.subject).render(row, escape=False)
+    return row.get(options.to_column, "").strip(), subject, path, html
+
+
+def build_message(to: str, subject: str, html: str, sender: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content(html, subtype="html", cte="quoted-printable")
+    return msg
+
+
+class _Sink:
+    """Where one batch's rendered emails go."""
+
+    def __init__(self, batch: int, options: Options):
+        self.options = options
+        self.output = None
+        self._file = None
+        self._smtp = None
+
+        out_dir = Path(options.out_dir)
+        if options.format == "jsonl":
+            out_dir.mkdir(parents=True, exist_ok=True)
+            self.output = str(out_dir / f"shard-{batch:05d}.jsonl")
+            self._file = open(self.output, "w", encoding=ENCODING, buffering=1024 * 1024)
+        elif options.format == "eml":
+            self.output = str(out_dir / f"shard-{batch:05d}")
+            Path(self.output).mkdir(parents=True, exist_ok=True)
+        else:
+            host, _, port = (options.smtp or "localhost:1025").partition(":")
+            self._smtp = smtplib.SMTP(host, int(port or 25))
+            self.output = options.smtp
+
+    def write(self, row_no: int, to: str, subject: str, path: str, html: str):
+        if self._file is not None:
+            self._file.write(json.dumps(
+                {"row": row_no, "to": to, "subject": subject, "template": path, "html": html},
+                ensure_ascii=False,
+            ))
+            self._file.write("\n")
+            return
+
+        msg = build_message(to, subject, html, self.options.sender)
+        if self._smtp is not None:
+            self._smtp.send_message(msg)
+        else:
+            with open(Path(self.output) / f"{row_no:09d}.eml", "wb") as f:
+                f.write(msg.as_bytes())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._smtp is not None:
+            self._smtp.quit()
+
+
+def render_batch(batch: int, rows: List[Tuple[int, Dict[str, str]]], options: Options) -> BatchResult:
+    """
+    Render (row number, row) pairs into the batch's shard. Rows that fail
+    to render or to send are reported, not raised.
+    """
+    errors = []
+    rendered = 0
+    sink = _Sink(batch, options)
+    try:
+        for row_no, row in rows:
+            try:
+                to, subject, path, html = render_row(row, options)
+                if not to:
+                    raise MissingField(options.to_column)
+            except (MissingField, MalformedRow, OSError) as e:
+                errors.append((row_no, f"{type(e).__name__}: {e}"))
+                continue
+            # A refused recipient or a failed write costs that row only
+            try:
+                sink.write(row_no, to, subject, path, html)
+            except (smtplib.SMTPException, OSError) as e:
+                errors.append((row_no, f"{type(e).__name__}: {e}"))
+                continue
+            rendered += 1
+    finally:
+        sink.close()
+    return BatchResult(batch, rendered, errors, sink.output)
+
+
+# ======================
+# Pipeline
+# ======================
+def prepare_out_dir(options: Options, overwrite: bool = False) -> None:
+    """
+    Make sure out_dir holds no shards from an earlier run, which would be
+    sent again alongside this run's. They are removed with overwrite,
+    refused otherwise.
+
+    Raises:
+        FileExistsError: out_dir has shards and overwrite is False
+    """
+    if options.format == "smtp":
+        return
+    out_dir = Path(options.out_dir)
+    old = sorted(out_dir.glob(SHARD_GLOB)) if out_dir.is_dir() else []
+    if old and not overwrite:
+        raise FileExistsError(
+            f"{out_dir} already holds {len(old)} shard(s) from an earlier run; "
+            "pick another output directory or overwrite them"
+        )
+    for path in old:
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+
+def _screen(rows: List[Dict[str, str]], first_row: int, options: Options, manifest):
+    """
+    Split a batch into the (row number, row) pairs to render and the
+    rejected (row number, error) pairs, with one vectorized check.
+    """
+    numbered = list(enumerate(rows, start=first_row))
+    if manifest is None:
+        return numbered, []
+
+    # Rows with surplus fields would add a None column to the frame
+    rejected = []
+    if any(None in row for row in rows):
+        shaped = []
+        for row_no, row in numbered:
+            try:
+                check_shape(row)
+            except MalformedRow as e:
+                rejected.append((row_no, f"{type(e).__name__}: {e}"))
+                continue
+            shaped.append((row_no, row))
+        numbered = shaped
+
+    required = [options.to_column]
+    if options.subject:
+        required += compile_template(options.subject).fields
+
+    errors = validate(
+        pd.DataFrame.from_records([row for _, row in numbered]), options.pattern, manifest, required=required
+    )
+    bad = errors.to_numpy() != ""
+    if not bad.any():
+        return numbered, rejected
+
+    keep = [pair for pair, b in zip(numbered, bad) if not b]
+    rejected += [(row_no, f"Invalid: {error}") for (row_no, _), error, b in zip(numbered, errors, bad) if b]
+    return keep, rejected
+
+
+def merge(
+    source,
+    options: Options,
+    workers: Optional[int] = None,
+    batch_rows: int = BATCH_ROWS,
+    validate_rows: bool = True,
+    overwrite: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Render every row of source; yield each batch's result as it finishes.
+
+    With validate_rows, each batch is checked against the template manifest
+    (mvtools.template_manifest) first and rows that can't render are
+    rejected without being sent to a worker. At most 2 batches per worker
+    are read ahead of the renderers. Shards of an earlier run in the output
+    directory are refused, or removed with overwrite (prepare_out_dir).
+    """
+    prepare_out_dir(options, overwrite)
+    workers = workers or os.cpu_count() or 1
+    options = options._replace(pattern=os.path.abspath(options.pattern))
+    manifest = build_manifest() if validate_rows else None
+
+    def screened():
+        first_row = 1
+        for batch, rows in enumerate(read_batches(source, batch_rows)):
+            keep, rejected = _screen(rows, first_row, options, manifest)
+            first_row += len(rows)
+            yield batch, keep, rejected
+
+    def with_rejected(result: BatchResult, rejected) -> BatchResult:
+        return result._replace(errors=sorted(rejected + result.errors))
+
+    if workers == 1:
+        for batch, keep, rejected in screened():
+            if keep:
+                yield with_rejected(render_batch(batch, keep, options), rejected)
+            else:
+                yield BatchResult(batch, 0, rejected, None)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        batches = screened()
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 2 * workers:
+                try:
+                    batch, keep, rejected = next(batches)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if not keep:
+                    yield BatchResult(batch, 0, rejected, None)
+                    continue
+                pending[pool.submit(render_batch, batch, keep, options)] = rejected
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield with_rejected(future.result(), pending.pop(future))
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render an email template for every recipient row")
+    parser.add_argument("source", help="Recipients (CSV or Parquet)")
+    parser.add_argument(
+        "pattern",
+        help='Template path; {column} picks the variant per row, e.g. "../28.wrapped2025/{tier}-{lang}.html"'
+    )
+    parser.add_argument("--out", default="mailmerge", help="Output directory (jsonl / eml)")
+    parser.add_argument(
+        "--overwrite", action="store_true",
+        help="Delete shards left in --out by an earlier run (refused otherwise)"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--smtp", default="localhost:1025", help="host:port for --format smtp")
+    parser.add_argument("--to-column", default=TO_COLUMN)
+    parser.add_argument("--subject", help="Subject (may use {{.Field}}); default: the template's <title>")
+    parser.add_argument("--sender", default=DEFAULT_SENDER)
+    parser.add_argument(
+        "--inline-css", action="store_true",
+        help="Inline <style> rules into style attributes (mvtools.css_inline)"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--errors", help="Write rejected rows (row number, error) to this CSV")
+    parser.add_argument(
+        "--no-validate", action="store_true",
+        help="Skip the pre-render check against the template manifest"
+    )
+    args = parser.parse_args(argv)
+
+    options = Options(
+        pattern=args.pattern,
+        out_dir=args.out,
+        format=args.format,
+        to_column=args.to_column,
+        subject=args.subject,
+        sender=args.sender,
+        smtp=args.smtp,
+        inline_css=args.inline_css,
+    )
+
+    try:
+        prepare_out_dir(options, args.overwrite)
+    except FileExistsError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    rendered = failed = 0
+    error_file = open(args.errors, "w", newline="", encoding=ENCODING) if args.errors else None
+    error_writer = csv.writer(error_file) if error_file else None
+    if error_writer:
+        error_writer.writerow(["row", "error"])
+
+    try:
+        for result in merge(
+            args.source, options, args.workers, args.batch_rows, validate_rows=not args.no_validate,
+            overwrite=args.overwrite,
+        ):
+            rendered += result.rendered
+            for row_no, error in result.errors:
+                failed += 1
+                if error_writer:
+                    error_writer.writerow([row_no, error])
+                elif failed <= 20:
+                    print(f"[ERROR] row {row_no}: {error}", file=sys.stderr)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"batch {result.batch}: {rendered:,} rendered, {failed:,} rejected, "
+                f"{rendered / elapsed:,.0f} emails/s",
+                file=sys.stderr,
+            )
+    finally:
+        if error_file:
+            error_file.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Done: {rendered:,} rendered, {failed:,} rejected in {elapsed:.1f} s "
+        f"({rendered / elapsed if elapsed else 0:,.0f} emails/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Metric engine shared by the ranking dashboards (mv-tool-1, mv-tool-2,
+mv-tool-2-1).
+
+Everything here is a single vectorized pass over a DataFrame: conversion
+rate, dense ranks at any grouping level, last-vs-current period comparison
+and TOTAL rows. Period columns follow the "<metric>_last" /
+"<metric>_current" naming used by the dashboards.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PERIODS = ("last", "current")
+COUNT_METRICS = ("checkin", "signup")
+COMPARE_METRICS = ("checkin", "signup", "cr")
+
+
+# ======================
+# Rates
+# ======================
+def conversion_rate(signup, checkin, *, empty=0.0, decimals: Optional[int] = 2):
+    """
+    Signups per check-in, in percent.
+
+    Args:
+        signup: Signup counts (array-like or scalar)
+        checkin: Check-in counts, same shape as signup
+        empty: Value used where there are no check-ins
+        decimals: Round to this many decimals; None to keep full precision
+
+    Returns:
+        ndarray of CR % values
+    """
+    signup = np.asarray(signup, dtype=float)
+    checkin = np.asarray(checkin, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cr = np.where(checkin > 0, signup / checkin * 100, empty)
+
+    return cr.round(decimals) if decimals is not None else cr
+
+
+def change_ratio(current, last):
+    """current / last - 1, or 0 where last is 0."""
+    current = np.asarray(current, dtype=float)
+    last = np.asarray(last, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(last == 0, 0, current / last - 1)
+
+
+# ======================
+# Ranks
+# ======================
+def rank_levels(city_col: str, brand_col: str) -> Dict[str, List[str]]:
+    """Grouping columns for the global / city / city x brand rankings."""
+    return {
+        "global": [],
+        "city": [city_col],
+        "city_brand": [city_col, brand_col],
+    }
+
+
+def add_rank(
+    df: pd.DataFrame,
+    value_col: str,
+    by: Optional[Sequence[str]] = None,
+    *,
+    method: str = "dense",
+    ascending: bool = False,
+    rank_col: str = "rank",
+) -> pd.DataFrame:
+    """
+    Rank value_col within each `by` group (globally if by is empty).
+
+    Returns a copy of df with rank_col added.
+    """
+    df = df.copy()
+    values = df.groupby(list(by))[value_col] if by else df[value_col]
+    df[rank_col] = values.rank(method=method, ascending=ascending)
+    return df
+
+
+def movement_labels(rank_change) -> np.ndarray:
+    """Readable rank movement ("↑ Up 2", "🆕 New Entry", ...) per value."""
+    change = np.asarray(rank_change, dtype=float)
+    steps = pd.Series(np.abs(change)).round().astype("Int64").astype(str)
+
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [np.isnan(change), change > 0, change < 0],
+            [
+                "🆕 New Entry",
+                ("↑ Up " + steps).to_numpy(dtype=object),
+                ("↓ Down " + steps).to_numpy(dtype=object),
+            ],
+            "→ No Change"
+        )
+
+
+# ======================
+# Period comparison
+# ======================
+def add_changes(
+    df: pd.DataFrame, metrics: Sequence[str] = COMPARE_METRICS
+) -> pd.DataFrame:
+    """Add rank_change and "<metric>_change_%" columns from _last/_current."""
+    if "rank_last" in df.columns and "rank_current" in df.columns:
+        df["rank_change"] = df["rank_last"] - df["rank_current"]
+
+    for m in metrics:
+        df[f"{m}_change_%"] = change_ratio(df[f"{m}_current"], df[f"{m}_last"])
+
+    return df
+
+
+def compare_periods(
+    last: pd.DataFrame,
+    current: pd.DataFrame,
+    keys: Sequence[str],
+    metrics: Sequence[str] = COMPARE_METRICS,
+) -> pd.DataFrame:
+    """Outer-join two period frames on keys and add the change columns."""
+    df = last.merge(
+        current,
+        on=list(keys),
+        suffixes=("_last", "_current"),
+        how="outer"
+    ).fillna(0)
+    return add_changes(df, metrics)
+
+
+def period_totals(
+    df: pd.DataFrame,
+    by: Sequence[str],
+    period: str,
+    *,
+    counts: Sequence[str] = COUNT_METRICS,
+    decimals: Optional[int] = None,
+) -> pd.DataFrame:
+    """Sum the count columns by `by` and recompute CR, suffixed with period."""
+    out = (
+        df.groupby(list(by))
+        .agg(**{f"{c}_{period}": (c, "sum") for c in counts})
+        .reset_index()
+    )
+    out[f"cr_{period}"] = conversion_rate(
+        out[f"signup_{period}"], out[f"checkin_{period}"], decimals=decimals
+    )
+    return out
+
+
+def compare_totals(
+    last: pd.DataFrame,
+    current: pd.DataFrame,
+    by: Sequence[str],
+    *,
+    decimals: Optional[int] = None,
+) -> pd.DataFrame:
+    """Last vs current totals per `by` group (e.g. the city overview)."""
+    df = period_totals(last, by, "last", decimals=decimals).merge(
+        period_totals(current, by, "current", decimals=decimals),
+        on=list(by),
+        how="outer"
+    ).fillna(0)
+    return add_changes(df)
+
+
+def add_total_row(
+    df: pd.DataFrame,
+    label_col: str,
+    label: str = "TOTAL",
+    *,
+    counts: Sequence[str] = COUNT_METRICS,
+    decimals: Optional[int] = None,
+) -> pd.DataFrame:
+    """Append a TOTAL row: summed counts, recomputed CR and changes."""
+    sum_cols = [f"{c}_{p}" for c in counts for p in PERIODS]
+
+    total = df[sum_cols].sum().to_frame().T
+    total.insert(0, label_col, label)
+    for p in PERIODS:
+        total[f"cr_{p}"] = conversion_rate(
+            total[f"signup_{p}"], total[f"checkin_{p}"], decimals=decimals
+        )
+    total = add_changes(total)
+
+    total = total[[c for c in df.columns if c in total.columns]]
+    return pd.concat([df, total], ignore_index=True)
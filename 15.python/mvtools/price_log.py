@@ -0,0 +1,70 @@
+"""
+Append-only log of crawled room prices, in a local SQLite file.
+
+Every price lookup - (hotel URL, room type, check-in date) and the price
+shown, or "NA" - is appended and committed as soon as its job finishes,
+so a crashed or interrupted crawl resumes exactly where it stopped and
+nothing is rewritten as results grow. The latest entry per key wins.
+"""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    hotel      TEXT NOT NULL,          -- hotel page URL; names aren't unique
+    room       TEXT NOT NULL,
+    checkin    TEXT NOT NULL,          -- YYYY-MM-DD
+    price      TEXT NOT NULL,          -- as shown, "NA" if the room had no price
+    crawled_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prices_key ON prices (hotel, room, checkin, crawled_at);
+"""
+
+NA = "NA"
+
+PriceKey = Tuple[str, str, str]     # (hotel URL, room type, check-in date)
+
+
+class PriceLog:
+    """Crawled prices per (hotel URL, room type, check-in date), persisted in a SQLite file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def append(self, entries: Iterable[Tuple[str, str, str, str]]):
+        """Append (hotel, room, checkin, price) entries in one transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO prices (hotel, room, checkin, price, crawled_at) VALUES (?, ?, ?, ?, ?)",
+                [(hotel, room, checkin, price, now) for hotel, room, checkin, price in entries],
+            )
+
+    def latest(self, since: Optional[float] = None) -> Dict[PriceKey, str]:
+        """Latest price per key, ignoring entries crawled before `since` (epoch seconds)."""
+        # SQLite returns the other columns from the row holding MAX()
+        rows = self.conn.execute(
+            """
+            SELECT hotel, room, checkin, price, MAX(crawled_at)
+            FROM prices
+            WHERE crawled_at >= ?
+            GROUP BY hotel, room, checkin
+            """,
+            (since or 0,),
+        )
+        return {(hotel, room, checkin): price for hotel, room, checkin, price, _ in rows}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
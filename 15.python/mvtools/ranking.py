@@ -0,0 +1,199 @@
+"""
+Weekly ranking report: signup + reservation exports -> last vs current
+period rankings (global, city, city x brand model) and the city overview.
+
+Shared by the mv-tool-2-1 dashboard and the headless report CLI
+(mvtools/report.py), so neither depends on the other's UI.
+"""
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from mvtools.cube import DailyCube, build_cube
+from mvtools.metrics import (
+    add_rank,
+    add_total_row,
+    compare_periods,
+    compare_totals,
+    conversion_rate,
+    rank_levels,
+)
+
+# ======================
+# Column mapping
+# ======================
+SIGNUP_HOTEL = "hotel_short_name"
+SIGNUP_DATE_INDEX = 4     # Column E
+SIGNUP_COUNT_INDEX = 5    # Column F
+
+RES_HOTEL = "Hotel Name"
+RES_CITY = "City"
+RES_DATE = "Checkin"
+RES_TENANT = "tenant_id"
+BRAND_MODEL_INDEX = 1     # Column B
+
+HOTEL_KEY = "hotel_key"
+CITY_ORDER = ["HCM", "HN", "DN"]
+
+Period = Tuple[object, object]
+
+
+# ======================
+# Preprocessing
+# ======================
+def preprocess(
+    signup_df: pd.DataFrame, res_df: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, str]]:
+    """
+    Normalize hotel keys, parse dates / counts and drop undated rows.
+
+    Returns:
+        (signup_df, res_df, cols) where cols maps "signup_date",
+        "signup_count" and "brand_model" to the positional column names
+    """
+    cols = {
+        "signup_date": signup_df.columns[SIGNUP_DATE_INDEX],
+        "signup_count": signup_df.columns[SIGNUP_COUNT_INDEX],
+        "brand_model": res_df.columns[BRAND_MODEL_INDEX],
+    }
+
+    signup_df = signup_df.copy()
+    res_df = res_df.copy()
+
+    signup_df[HOTEL_KEY] = signup_df[SIGNUP_HOTEL].str.lower().str.strip()
+    res_df[HOTEL_KEY] = res_df[RES_HOTEL].str.lower().str.strip()
+
+    signup_df[cols["signup_date"]] = pd.to_datetime(signup_df[cols["signup_date"]], errors="coerce")
+    res_df[RES_DATE] = pd.to_datetime(res_df[RES_DATE], errors="coerce")
+
+    signup_df[cols["signup_count"]] = pd.to_numeric(
+        signup_df[cols["signup_count"]], errors="coerce"
+    ).fillna(0)
+
+    signup_df = signup_df.dropna(subset=[cols["signup_date"]])
+    res_df = res_df.dropna(subset=[RES_DATE])
+
+    return signup_df, res_df, cols
+
+
+def ranking_cube(
+    signup_df: pd.DataFrame, res_df: pd.DataFrame, cols: Dict[str, str]
+) -> DailyCube:
+    """Daily cube over preprocessed signup / reservation frames."""
+    return build_cube(
+        res_df, signup_df,
+        hotel_col=HOTEL_KEY,
+        city_col=RES_CITY,
+        brand_col=cols["brand_model"],
+        res_date_col=RES_DATE,
+        tenant_col=RES_TENANT,
+        signup_date_col=cols["signup_date"],
+        signup_count_col=cols["signup_count"],
+    )
+
+
+# ======================
+# Period metrics
+# ======================
+def period_metrics(
+    cube: DailyCube, start, end, city: Optional[str] = None
+) -> pd.DataFrame:
+    """Check-ins, signups and CR per hotel for [start, end]."""
+    df = cube.query(start, end)
+    if city is not None:
+        df = df[df[RES_CITY] == city].reset_index(drop=True)
+    df["cr"] = conversion_rate(df["signup"], df["checkin"])
+    return df
+
+
+def ranked_compare(
+    last_df: pd.DataFrame, current_df: pd.DataFrame, brand_col: str, level: str
+) -> pd.DataFrame:
+    """Rank both periods by CR at the given level and compare them."""
+    by = rank_levels(RES_CITY, brand_col)[level]
+    return compare_periods(
+        add_rank(last_df, "cr", by),
+        add_rank(current_df, "cr", by),
+        [HOTEL_KEY, RES_CITY, brand_col]
+    )
+
+
+def city_sort_key(cities: pd.Series) -> pd.Series:
+    """Sort key: CITY_ORDER first, other cities by name, TOTAL last."""
+    order = {c: i for i, c in enumerate(CITY_ORDER)}
+    return cities.map(
+        lambda c: (0, order[c], "") if c in order
+        else (2, 0, "") if c == "TOTAL"
+        else (1, 0, str(c))
+    )
+
+
+def city_overview(last_df: pd.DataFrame, current_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-city last vs current totals with a TOTAL row at the bottom."""
+    df = compare_totals(last_df, current_df, [RES_CITY])[[
+        RES_CITY,
+        "checkin_last", "checkin_current", "checkin_change_%",
+        "signup_last", "signup_current", "signup_change_%",
+        "cr_last", "cr_current", "cr_change_%"
+    ]]
+    df = add_total_row(df, RES_CITY)
+    return df.sort_values(RES_CITY, key=city_sort_key).reset_index(drop=True)
+
+
+def report_columns(df: pd.DataFrame, brand_col: str) -> pd.DataFrame:
+    """Upper-case hotel keys and order columns dimension / rank / metrics."""
+    df = df.copy()
+
+    if HOTEL_KEY in df.columns:
+        df[HOTEL_KEY] = df[HOTEL_KEY].str.upper()
+
+    cols = [
+        # Dimensions
+        HOTEL_KEY, RES_CITY, brand_col,
+
+        # Rank
+        "rank_last", "rank_current", "rank_change",
+
+        # Checkin
+        "checkin_last", "checkin_current", "checkin_change_%",
+
+        # Signup
+        "signup_last", "signup_current", "signup_change_%",
+
+        # CR
+        "cr_last", "cr_current", "cr_change_%"
+    ]
+
+    return df[[c for c in cols if c in df.columns]]
+
+
+def build_report(
+    cube: DailyCube,
+    last: Period,
+    current: Period,
+    brand_col: str,
+    city: Optional[str] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    All ranking tables for one last / current period pair.
+
+    Returns:
+        {"global", "city_overview", "city", "city_brand"} -> DataFrame
+    """
+    last_df = period_metrics(cube, *last, city=city)
+    current_df = period_metrics(cube, *current, city=city)
+
+    tables = {
+        "global": ranked_compare(last_df, current_df, brand_col, "global")
+        .sort_values("rank_current"),
+        "city_overview": city_overview(last_df, current_df),
+        "city": ranked_compare(last_df, current_df, brand_col, "city")
+        .sort_values([RES_CITY, "rank_current"]),
+        "city_brand": ranked_compare(last_df, current_df, brand_col, "city_brand")
+        .sort_values([RES_CITY, brand_col, "rank_current"]),
+    }
+
+    return {
+        name: df if name == "city_overview" else report_columns(df, brand_col)
+        for name, df in tables.items()
+    }
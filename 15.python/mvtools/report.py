@@ -0,0 +1,193 @@
+"""
+Headless weekly ranking report (no Streamlit).
+
+Computes the same tables as the mv-tool-2-1 dashboard - global, city and
+city x brand model rankings plus the city overview - and the weekly signup
+ranking from mv-tool-4, then writes them as CSV / Parquet / XLSX.
+
+Usage (from 15.python/):
+    # One comparison
+    python -m mvtools.report --signup signup.csv --reservations res.csv \\
+        --last 2025-05-05 2025-05-11 --current 2025-05-12 2025-05-18
+
+    # The last 8 full Mon-Sun weeks, each vs the week before, for all
+    # cities and for HCM / HN separately, spread over all CPU cores
+    python -m mvtools.report --signup signup.csv --reservations res.csv \\
+        --weeks 8 --city HCM --city HN --format xlsx --out reports/
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from mvtools.loader import RESERVATION_DTYPES, SIGNUP_DTYPES, load_file
+from mvtools.ranking import RES_DATE, build_report, preprocess, ranking_cube
+from mvtools.weekly import build_weekly, preprocess_signup, wow_metrics
+
+FORMATS = ("csv", "parquet", "xlsx")
+ALL_CITIES = "ALL"
+
+Period = Tuple[date, date]
+Job = Tuple[str, Period, Period]
+
+
+# ======================
+# Output
+# ======================
+def write_tables(
+    tables: Dict[str, pd.DataFrame], out_dir: Path, fmt: str, workbook: str = "report"
+) -> List[Path]:
+    """Write each table to out_dir (one workbook with a sheet each for xlsx)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "xlsx":
+        path = out_dir / f"{workbook}.xlsx"
+        with pd.ExcelWriter(path) as writer:
+            for name, df in tables.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+        return [path]
+
+    paths = []
+    for name, df in tables.items():
+        path = out_dir / f"{name}.{fmt}"
+        if fmt == "csv":
+            df.to_csv(path, index=False, encoding="utf-8-sig")
+        else:
+            df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# ======================
+# Periods
+# ======================
+def parse_date(value: str) -> date:
+    return pd.Timestamp(value).date()
+
+
+def week_jobs(weeks: int, until: date) -> List[Tuple[Period, Period]]:
+    """(last, current) pairs for the `weeks` full Mon-Sun weeks up to until."""
+    end = until - timedelta(days=(until.weekday() + 1) % 7)
+    pairs = []
+    for k in range(weeks):
+        current_end = end - timedelta(days=7 * k)
+        current = (current_end - timedelta(days=6), current_end)
+        last = (current[0] - timedelta(days=7), current[0] - timedelta(days=1))
+        pairs.append((last, current))
+    return pairs
+
+
+# ======================
+# Workers
+# ======================
+_CUBE = None
+_BRAND_COL = None
+
+
+def _init_worker(cube, brand_col):
+    global _CUBE, _BRAND_COL
+    _CUBE, _BRAND_COL = cube, brand_col
+
+
+def _run_job(job: Job, out: Path, fmt: str) -> List[Path]:
+    region, last, current = job
+    city = None if region == ALL_CITIES else region
+
+    tables = build_report(_CUBE, last, current, _BRAND_COL, city=city)
+    out_dir = out / region / f"{current[0]:%Y-%m-%d}_{current[1]:%Y-%m-%d}"
+    return write_tables(tables, out_dir, fmt)
+
+
+def run(
+    signup_path: str,
+    reservation_path: str,
+    pairs: List[Tuple[Period, Period]],
+    regions: List[str],
+    out: Path,
+    fmt: str,
+    workers: Optional[int] = None,
+) -> List[Path]:
+    """Build the cube once, then fan the (region, period) jobs out."""
+    signup_raw = load_file(signup_path, dtype=SIGNUP_DTYPES)
+    res_raw = load_file(reservation_path, dtype=RESERVATION_DTYPES)
+
+    signup_df, res_df, cols = preprocess(signup_raw, res_raw)
+    cube = ranking_cube(signup_df, res_df, cols)
+
+    jobs = [(region, last, current) for region in regions for last, current in pairs]
+    paths = []
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(cube, cols["brand_model"]),
+    ) as pool:
+        futures = [pool.submit(_run_job, job, out, fmt) for job in jobs]
+        for job, future in zip(jobs, futures):
+            written = future.result()
+            print(f"[OK] {job[0]} {job[2][0]} → {job[2][1]}: {len(written)} file(s)")
+            paths.extend(written)
+
+    # Weekly signup ranking (mv-tool-4)
+    weekly_df, city_col, count_col = preprocess_signup(signup_raw)
+    weekly = wow_metrics(build_weekly(weekly_df, city_col, count_col)).drop(columns="prev_week")
+    paths.extend(write_tables(
+        {"weekly_signups": weekly}, out, fmt, workbook="weekly_signups"
+    ))
+
+    return paths
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weekly hotel signup ranking report")
+    parser.add_argument("--signup", required=True, help="Signup export (CSV / XLSX)")
+    parser.add_argument("--reservations", required=True, help="Reservation export (CSV / XLSX)")
+    parser.add_argument("--last", nargs=2, metavar=("FROM", "TO"), help="Last period")
+    parser.add_argument("--current", nargs=2, metavar=("FROM", "TO"), help="Current period")
+    parser.add_argument("--weeks", type=int, help="Report the last N full Mon-Sun weeks instead")
+    parser.add_argument("--until", help="Last day for --weeks (default: latest check-in)")
+    parser.add_argument(
+        "--city", action="append", default=[],
+        help="Also report this city on its own (repeatable)"
+    )
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    if args.weeks:
+        if args.until:
+            until = parse_date(args.until)
+        else:
+            res = load_file(args.reservations, dtype=RESERVATION_DTYPES)
+            until = pd.to_datetime(res[RES_DATE], errors="coerce").max().date()
+        pairs = week_jobs(args.weeks, until)
+    elif args.last and args.current:
+        pairs = [(
+            tuple(parse_date(d) for d in args.last),
+            tuple(parse_date(d) for d in args.current),
+        )]
+    else:
+        parser.error("pass either --weeks N or both --last FROM TO and --current FROM TO")
+
+    paths = run(
+        args.signup,
+        args.reservations,
+        pairs,
+        [ALL_CITIES] + args.city,
+        Path(args.out),
+        args.format,
+        workers=args.workers,
+    )
+    print(f"Wrote {len(paths)} file(s) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
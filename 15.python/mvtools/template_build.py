@@ -0,0 +1,262 @@
+"""
+Build step for the email templates: minified copies in dist/ with a size
+report and a size budget.
+
+Minification only does what is safe across email clients:
+
+- whitespace is collapsed, and dropped around block-level tags (table
+  layouts, head elements); inline text spacing is kept
+- comments are removed, except Outlook conditional comments, whose
+  content is minified like the rest
+- <style> blocks lose comments and redundant whitespace
+- inline style attributes are normalized ("a: b; c: d;" -> "a:b;c:d",
+  no spaces after commas in values such as font-family lists) and exact
+  duplicate declarations are dropped, keeping the last one. Declarations
+  are never moved into <style> (many clients strip it) and differing
+  repeats of a property are kept, as they are usually client fallbacks
+- <pre>, <textarea> and <script> are copied verbatim
+
+{{...}} placeholders are shielded before any rewriting and checked to be
+byte-identical in the output.
+
+Usage (from 15.python/):
+    python -m mvtools.template_build                     # -> ../dist/
+    python -m mvtools.template_build --budget-kb 30
+"""
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import List, NamedTuple, Union
+
+from mvtools.templates import ENCODING, TEMPLATE_ROOT, find_templates
+
+DIST_DIR = TEMPLATE_ROOT / "dist"
+REPORT_NAME = "size-report.json"
+# Gmail clips messages above ~102 KB; leave room for rendered values and
+# the tracking markup the mail service adds
+BUDGET_KB = 90
+
+RAW_PLACEHOLDER = re.compile(r"\{\{.*?\}\}", re.DOTALL)
+SHIELD = re.compile(r"\x00(\d+)\x00")
+
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "style", "base",
+    "table", "thead", "tbody", "tfoot", "tr", "td", "th", "caption", "colgroup", "col",
+    "div", "p", "center", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li",
+    "blockquote", "hr", "br", "section", "header", "footer", "article", "nav", "main",
+    "form", "!doctype",
+}
+
+TOKEN = re.compile(
+    r"(?P<reveal><!--\[if[^\]]*\]><!-->|<!--<!\[endif\]-->)"
+    r"|(?P<cond><!--\[if[^\]]*\]>)(?P<cond_body>.*?)(?P<cond_end><!\[endif\]-->)"
+    r"|(?P<comment><!--.*?-->)"
+    r"|(?P<verbatim><(?P<vtag>pre|textarea|script)\b.*?</(?P=vtag)\s*>)"
+    r"|(?P<style_open><style\b[^>]*>)(?P<style_body>.*?)(?P<style_close></style\s*>)"
+    r"|(?P<tag><[^>]+>)"
+    r"|(?P<text>[^<]+|<)",
+    re.IGNORECASE | re.DOTALL,
+)
+# HTML / CSS whitespace only: \s would also match U+00A0, which is content
+SPACE = " \t\r\n\f"
+WHITESPACE = re.compile(f"[{SPACE}]+")
+
+TAG_NAME = re.compile(r"</?\s*(!?[A-Za-z0-9]+)")
+STYLE_ATTR = re.compile(r"(\sstyle\s*=\s*)([\"'])(.*?)\2", re.IGNORECASE | re.DOTALL)
+# A declaration: up to the next ; outside quotes, parentheses and entities (&quot;)
+DECLARATION = re.compile(r"""(?:"[^"]*"|'[^']*'|\([^)]*\)|&#?\w+;|[^;"'(&]|[&"'(])+""")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_PUNCT = re.compile(f"[{SPACE}]*([{{}};,>])[{SPACE}]*")
+CSS_COLON = re.compile(f":[{SPACE}]+")
+VALUE_COMMA = re.compile(f"[{SPACE}]*,[{SPACE}]*")
+
+
+class SizeRow(NamedTuple):
+    template: str
+    source_bytes: int
+    dist_bytes: int
+    over_budget: bool
+
+    @property
+    def saved(self) -> float:
+        return 1 - self.dist_bytes / self.source_bytes if self.source_bytes else 0.0
+
+
+# ======================
+# Minification
+# ======================
+def minify_declarations(css: str) -> str:
+    """'a: b;  c: d;' -> 'a:b;c:d', dropping exact duplicate declarations (last one kept)."""
+    decls = []
+    for decl in DECLARATION.findall(css):
+        decl = WHITESPACE.sub(" ", decl).strip(SPACE)
+        if not decl:
+            continue
+        prop, sep, value = decl.partition(":")
+        if sep:
+            decl = f"{prop.strip(SPACE)}:{VALUE_COMMA.sub(',', value.strip(SPACE))}"
+        decls.append(decl)
+
+    # Only whole prop:value pairs are deduplicated
+    last = {}
+    for i, decl in enumerate(decls):
+        if ":" in decl:
+            last[decl.lower()] = i
+    return ";".join(d for i, d in enumerate(decls) if last.get(d.lower(), i) == i)
+
+
+def minify_css(css: str) -> str:
+    css = CSS_COMMENT.sub("", css)
+    css = WHITESPACE.sub(" ", css)
+    css = CSS_PUNCT.sub(r"\1", css)
+    css = CSS_COLON.sub(":", css)
+    return css.replace(";}", "}").strip(SPACE)
+
+
+def _minify_tag(tag: str) -> str:
+    tag = STYLE_ATTR.sub(lambda m: f"{m.group(1)}{m.group(2)}{minify_declarations(m.group(3))}{m.group(2)}", tag)
+    tag = WHITESPACE.sub(" ", tag)
+    return re.sub(f"[{SPACE}]*(/?>)$", r"\1", tag).replace("< ", "<")
+
+
+def _is_block(tag: str) -> bool:
+    m = TAG_NAME.match(tag)
+    return bool(m) and m.group(1).lower() in BLOCK_TAGS
+
+
+def _minify_html(html: str) -> str:
+    # (text, breaks_whitespace) - whitespace next to a block boundary is dropped
+    parts = []
+    for m in TOKEN.finditer(html):
+        kind = m.lastgroup
+        if m.group("reveal"):
+            parts.append((m.group("reveal"), True))
+        elif m.group("cond"):
+            body = _minify_html(m.group("cond_body"))
+            parts.append((m.group("cond") + body + m.group("cond_end"), True))
+        elif m.group("comment"):
+            continue
+        elif m.group("verbatim"):
+            parts.append((m.group("verbatim"), False))
+        elif m.group("style_open"):
+            parts.append((
+                _minify_tag(m.group("style_open")) + minify_css(m.group("style_body"))
+                + m.group("style_close"),
+                True,
+            ))
+        elif m.group("tag"):
+            tag = m.group("tag")
+            parts.append((_minify_tag(tag), _is_block(tag)))
+        else:
+            parts.append((WHITESPACE.sub(" ", m.group(kind)), None))
+
+    out = []
+    for i, (text, block) in enumerate(parts):
+        if block is None:  # text
+            if i == 0 or parts[i - 1][1]:
+                text = text.lstrip(SPACE)
+            if i == len(parts) - 1 or parts[i + 1][1]:
+                text = text.rstrip(SPACE)
+        out.append(text)
+    return "".join(out)
+
+
+def minify(html: str) -> str:
+    """Minified template; {{...}} placeholders come out byte-identical."""
+    shielded = []
+
+    def shield(m):
+        shielded.append(m.group(0))
+        return f"\x00{len(shielded) - 1}\x00"
+
+    result = _minify_html(RAW_PLACEHOLDER.sub(shield, html))
+    result = SHIELD.sub(lambda m: shielded[int(m.group(1))], result)
+
+    if Counter(RAW_PLACEHOLDER.findall(result)) != Counter(shielded):
+        raise ValueError("minification changed the template's placeholders")
+    return result
+
+
+# ======================
+# Build
+# ======================
+def build(
+    root: Union[str, Path] = TEMPLATE_ROOT,
+    out_dir: Union[str, Path] = DIST_DIR,
+    budget_kb: float = BUDGET_KB,
+) -> List[SizeRow]:
+    """Write minified copies of every template under root to out_dir."""
+    root, out_dir = Path(root).resolve(), Path(out_dir).resolve()
+    budget = budget_kb * 1024
+    rows = []
+
+    for path in find_templates(root):
+        if out_dir in path.resolve().parents:
+            continue
+        rel = path.relative_to(root)
+        source = path.read_text(encoding=ENCODING)
+        minified = minify(source).encode(ENCODING)
+
+        dst = out_dir / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.write_bytes(minified)
+
+        rows.append(SizeRow(
+            rel.as_posix(), len(source.encode(ENCODING)), len(minified), len(minified) > budget
+        ))
+
+    with open(out_dir / REPORT_NAME, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "budget_bytes": int(budget),
+                "templates": [dict(r._asdict(), saved=round(r.saved, 4)) for r in rows],
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    return rows
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minify the email templates into dist/ and check their size")
+    parser.add_argument("--root", default=str(TEMPLATE_ROOT), help="Where to look for *.html")
+    parser.add_argument("--out", default=str(DIST_DIR), help="Output directory")
+    parser.add_argument(
+        "--budget-kb", type=float, default=BUDGET_KB,
+        help="Fail if a minified template is larger than this"
+    )
+    args = parser.parse_args(argv)
+
+    rows = build(args.root, args.out, args.budget_kb)
+    width = max((len(r.template) for r in rows), default=10)
+
+    print(f"{'template':<{width}}  {'source':>9}  {'dist':>9}  {'saved':>6}")
+    for r in sorted(rows, key=lambda r: -r.dist_bytes):
+        flag = "  ✗ over budget" if r.over_budget else ""
+        print(
+            f"{r.template:<{width}}  {r.source_bytes / 1024:8.1f}K  {r.dist_bytes / 1024:8.1f}K  "
+            f"{r.saved:6.1%}{flag}"
+        )
+
+    source = sum(r.source_bytes for r in rows)
+    dist = sum(r.dist_bytes for r in rows)
+    print(
+        f"{len(rows)} template(s): {source / 1024:.1f}K → {dist / 1024:.1f}K "
+        f"({1 - dist / source if source else 0:.1%} smaller), budget {args.budget_kb:g}K"
+    )
+
+    over = [r.template for r in rows if r.over_budget]
+    if over:
+        print(f"✗ {len(over)} template(s) over the {args.budget_kb:g}K budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
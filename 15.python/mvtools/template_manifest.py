@@ -0,0 +1,242 @@
+"""
+Manifest of template -> required fields, and pre-send validation.
+
+Every *.html template in the repo is scanned once for its placeholders;
+the manifest is cached on disk and only templates whose mtime / size
+changed are rescanned. Recipient lists are then checked against it in a
+vectorized pass - one group per template variant, one column operation
+per field - so rows that would fail to render are rejected before any
+rendering starts.
+
+Usage (from 15.python/):
+    python -m mvtools.template_manifest                       # template -> fields
+    python -m mvtools.template_manifest --field CodeVAT       # templates using a field
+"""
+import argparse
+import json
+import os
+import string
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from mvtools.loader import CACHE_DIR
+from mvtools.templates import ENCODING, PLACEHOLDER, TEMPLATE_ROOT, find_templates
+
+MANIFEST_CACHE = CACHE_DIR / "template_manifest.json"
+# Bump when the placeholder syntax changes so cached manifests are ignored
+MANIFEST_VERSION = 1
+
+# Fields that may legitimately be empty (still required as columns)
+OPTIONAL_FIELDS = {"Note", "SpecialRequirements"}
+
+Manifest = Dict[str, List[str]]
+
+
+# ======================
+# Manifest
+# ======================
+def template_fields(path: Union[str, Path]) -> List[str]:
+    """Field names of a template, in order of first use."""
+    with open(path, encoding=ENCODING) as f:
+        return list(dict.fromkeys(PLACEHOLDER.findall(f.read())))
+
+
+def _load_cache(cache: Path) -> dict:
+    try:
+        with open(cache, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data["templates"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+
+def _store_cache(cache: Path, templates: dict) -> None:
+    """Write the manifest cache atomically; failures just skip caching."""
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "templates": templates}, f, ensure_ascii=False)
+        os.replace(tmp, cache)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def build_manifest(
+    root: Union[str, Path] = TEMPLATE_ROOT,
+    cache: Optional[Union[str, Path]] = MANIFEST_CACHE,
+) -> Manifest:
+    """
+    {resolved template path: required fields} for every *.html under root.
+
+    With a cache file, only new or changed templates are read.
+    """
+    cached = _load_cache(Path(cache)) if cache else {}
+    templates = {}
+    changed = False
+
+    for path in find_templates(root):
+        key = str(path.resolve())
+        stat = path.stat()
+        entry = cached.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            templates[key] = entry
+            continue
+
+        templates[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "fields": template_fields(path),
+        }
+        changed = True
+
+    if cache and (changed or templates.keys() != cached.keys()):
+        _store_cache(Path(cache), templates)
+
+    return {key: entry["fields"] for key, entry in templates.items()}
+
+
+def required_fields(path: Union[str, Path], manifest: Optional[Manifest] = None) -> List[str]:
+    """Fields of one template, from the manifest when it has the file."""
+    key = str(Path(path).resolve())
+    if manifest is not None and key in manifest:
+        return manifest[key]
+    return template_fields(key)
+
+
+# ======================
+# Validation
+# ======================
+def pattern_fields(pattern: str) -> List[str]:
+    """Column names used by a template path pattern ("{tier}-{lang}.html")."""
+    return list(dict.fromkeys(
+        name for _, name, _, _ in string.Formatter().parse(pattern) if name
+    ))
+
+
+def _blank(values: pd.DataFrame) -> pd.DataFrame:
+    """True where a value is missing or whitespace only."""
+    text = values.astype("string")
+    return text.apply(lambda col: col.str.strip().eq("")).fillna(True).astype(bool)
+
+
+def _flagged(flags: pd.DataFrame, label: str) -> pd.Series:
+    """Per row, "label: a, b" for the flagged columns a, b ("" if none)."""
+    result = pd.Series("", index=flags.index, dtype=object)
+    if flags.empty or not flags.to_numpy().any():
+        return result
+    joined = flags.dot(pd.Index([f"{c}, " for c in flags.columns], dtype=object))
+    hit = joined.ne("")
+    result[hit] = label + ": " + joined[hit].str[:-2]
+    return result
+
+
+def _add(errors: pd.Series, rows: pd.Index, messages) -> None:
+    """Append messages (a string or a Series over rows) to errors[rows]."""
+    messages = pd.Series(messages, index=rows, dtype=object)
+    current = errors[rows]
+    errors[rows] = current.where(messages.eq(""), (current + "; ").where(current.ne(""), "") + messages)
+
+
+def validate(
+    df: pd.DataFrame,
+    pattern: str,
+    manifest: Optional[Manifest] = None,
+    required: Iterable[str] = (),
+    optional: Iterable[str] = OPTIONAL_FIELDS,
+) -> pd.Series:
+    """
+    Why each row of df can't be rendered with pattern's template ("" = ok).
+
+    A row is rejected when its template variant doesn't exist, a field of
+    that template has no column, or a field value is blank (fields in
+    `optional` only need the column). `required` adds columns that must
+    be filled for every row, e.g. the recipient email.
+    """
+    errors = pd.Series("", index=df.index, dtype=object)
+    if df.empty:
+        return errors
+
+    required = list(dict.fromkeys(required))
+    optional = set(optional)
+    names = pattern_fields(pattern)
+
+    absent = [c for c in dict.fromkeys([*names, *required]) if c not in df.columns]
+    if absent:
+        errors[:] = f"missing columns: {', '.join(absent)}"
+        return errors
+
+    # One group per template variant
+    if names:
+        keys = df[names].astype("string").fillna("").apply(lambda col: col.str.strip())
+        groups = keys.groupby(names, sort=False).indices
+    else:
+        groups = {(): np.arange(len(df))}
+
+    checks = []
+    for key, positions in groups.items():
+        key = key if isinstance(key, tuple) else (key,)
+        path = pattern.format_map(dict(zip(names, key)))
+        rows = df.index[positions]
+
+        if not os.path.isfile(path):
+            _add(errors, rows, f"template not found: {path}")
+            continue
+
+        fields = [f for f in required_fields(path, manifest) if f not in required]
+        absent = [f for f in fields if f not in df.columns]
+        if absent:
+            _add(errors, rows, f"missing columns: {', '.join(absent)} ({Path(path).name})")
+            continue
+
+        checks.append((positions, [f for f in fields if f not in optional]))
+
+    # Blank test once per column, then sliced per variant
+    columns = list(dict.fromkeys(required + [c for _, cols in checks for c in cols]))
+    if columns:
+        blank = _blank(df[columns])
+        if required:
+            _add(errors, df.index, _flagged(blank[required], "blank"))
+        for positions, cols in checks:
+            if cols:
+                _add(errors, df.index[positions], _flagged(blank.iloc[positions][cols], "blank"))
+
+    return errors
+
+
+# ======================
+# CLI
+# ======================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Required fields of every email template")
+    parser.add_argument("--root", default=str(TEMPLATE_ROOT), help="Where to look for *.html")
+    parser.add_argument("--field", help="Only list templates that use this field")
+    parser.add_argument("--json", action="store_true", help="Print the manifest as JSON")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root).resolve()
+    manifest = build_manifest(root)
+    if args.field:
+        manifest = {k: v for k, v in manifest.items() if args.field.lstrip(".") in v}
+
+    def name(path):
+        try:
+            return str(Path(path).relative_to(root))
+        except ValueError:
+            return path
+
+    if args.json:
+        print(json.dumps({name(k): v for k, v in manifest.items()}, ensure_ascii=False, indent=2))
+        return
+
+    for path, fields in manifest.items():
+        print(f"{name(path)}: {', '.join(fields) if fields else '-'}")
+
+
+if __name__ == "__main__":
+    main()
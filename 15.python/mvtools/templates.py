@@ -0,0 +1,204 @@
+"""
+Local renderer for the repo's HTML email templates.
+
+The templates use Go-style placeholders - `{{.Name}}`,
+`{{.ReservationNumber}}`, ... - and `21.b2b-send-pass` uses bare
+`{{email}}` / `{{password}}`; both resolve to the field name without the
+dot. There is no control flow, so a template is compiled once into its
+literal chunks and slots, and rendering is a single join over a buffer.
+
+Compiled templates are cached per path and reused until the file's
+mtime / size change. Values are HTML-escaped, as the production Go
+html/template renderer does.
+
+Usage (from 15.python/):
+    python -m mvtools.templates "../1.bk-loyalty/bk-conf-EN.html" --set Name=An --out preview.html
+    python -m mvtools.templates "../21.b2b-send-pass/b2b-send-pass-en.html" --json row.json
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+PLACEHOLDER = re.compile(r"\{\{\s*\.?([A-Za-z0-9_]+)\s*\}\}")
+ENCODING = "utf-8"
+
+TEMPLATE_ROOT = Path(__file__).resolve().parents[2]
+SKIP_DIRS = {".git", "node_modules", "dist", "__pycache__", ".venv", "venv"}
+
+
+class MissingField(KeyError):
+    """A template slot has no value in the render context."""
+
+    def __str__(self):
+        return str(self.args[0]) if self.args else ""
+
+
+class Template:
+    """A compiled template: literal chunks with the slots between them."""
+
+    __slots__ = ("source", "_buffer", "_slots", "_raw")
+
+    def __init__(self, text: str, source: Optional[str] = None):
+        self.source = source
+        buffer: List[Optional[str]] = []
+        slots: List[Tuple[int, str]] = []
+        raw: List[str] = []
+
+        pos = 0
+        for m in PLACEHOLDER.finditer(text):
+            buffer.append(text[pos:m.start()])
+            slots.append((len(buffer), m.group(1)))
+            raw.append(m.group(0))
+            buffer.append(None)
+            pos = m.end()
+        buffer.append(text[pos:])
+
+        self._buffer = buffer
+        self._slots = tuple(slots)
+        self._raw = tuple(raw)
+
+    @property
+    def fields(self) -> List[str]:
+        """Field names used by the template, in order of first use."""
+        return list(dict.fromkeys(name for _, name in self._slots))
+
+    def render(
+        self,
+        values: Mapping[str, Any],
+        *,
+        escape: bool = True,
+        strict: bool = True,
+    ) -> str:
+        """
+        Fill the slots from values. None renders as "".
+
+        strict=False leaves the placeholder of a missing field as is
+        (handy for previews) instead of raising MissingField.
+        """
+        out = self._buffer.copy()
+        for (i, name), raw in zip(self._slots, self._raw):
+            try:
+                value = values[name]
+            except KeyError:
+                if strict:
+                    where = f" in {self.source}" if self.source else ""
+                    raise MissingField(f"{name}{where}") from None
+                out[i] = raw
+                continue
+
+            value = "" if value is None else str(value)
+            out[i] = html.escape(value) if escape else value
+        return "".join(out)
+
+
+def compile_template(text: str, source: Optional[str] = None) -> Template:
+    return Template(text, source)
+
+
+def find_templates(root: Union[str, Path] = TEMPLATE_ROOT) -> List[Path]:
+    """Every *.html under root (the repo by default), in a stable order."""
+    root = Path(root)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        found.extend(Path(dirpath) / f for f in sorted(filenames) if f.lower().endswith(".html"))
+    return found
+
+
+# ======================
+# Cache
+# ======================
+_cache: Dict[str, Tuple[int, int, Template]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_template(path: Union[str, Path]) -> Template:
+    """Compiled template for path, recompiled only when the file changed."""
+    key = os.fspath(path)
+    stat = os.stat(key)
+
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+        return entry[2]
+
+    with open(key, encoding=ENCODING) as f:
+        template = compile_template(f.read(), key)
+    with _cache_lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
+
+
+def render_file(path: Union[str, Path], values: Mapping[str, Any], **options) -> str:
+    return load_template(path).render(values, **options)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# ======================
+# CLI
+# ======================
+def _parse_set(items: List[str]) -> Dict[str, str]:
+    values = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"--set expects Field=value, got {item!r}")
+        values[name.strip().lstrip(".")] = value
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render an email template locally")
+    parser.add_argument("template", help="Template .html file")
+    parser.add_argument("--json", help="JSON object with the field values")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="FIELD=VALUE",
+        help="Field value (repeatable, overrides --json)"
+    )
+    parser.add_argument("--out", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--strict", action="store_true",
+        help="Fail on missing fields instead of leaving their placeholders"
+    )
+    parser.add_argument("--fields", action="store_true", help="Only list the template's fields")
+    args = parser.parse_args(argv)
+
+    template = load_template(args.template)
+    if args.fields:
+        print("\n".join(template.fields))
+        return
+
+    values = {}
+    if args.json:
+        with open(args.json, encoding=ENCODING) as f:
+            values.update(json.load(f))
+    try:
+        values.update(_parse_set(args.set))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    try:
+        rendered = template.render(values, strict=args.strict)
+    except MissingField as e:
+        parser.exit(1, f"Missing field: {e.args[0]}\n")
+
+    if args.out:
+        Path(args.out).write_text(rendered, encoding=ENCODING)
+        missing = [f for f in template.fields if f not in values]
+        print(f"Wrote {args.out}" + (f" (unfilled: {', '.join(missing)})" if missing else ""),
+              file=sys.stderr)
+    else:
+        sys.stdout.write(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,629 @@
+"""
+Trip.com competitor price crawler, the script form of the crawler in
+"Updated_Trip - VAT.ipynb" (run it through tripcom_crawl_6weeks.py).
+
+For every hotel x room type in the tracking sheet it looks up the price of
+a one-night stay in each of the next 6 weeks (trying up to 7 check-in days
+per week until the room shows a price).
+
+Work is split into (hotel URL, week) jobs - room types of the same hotel
+share one page load - and spread over a pool of headless Chrome workers
+that all use the cookies saved by save_cookies(). Pages are driven with
+explicit waits instead of fixed sleeps.
+
+Dates are set through the hotel URL's checkIn / checkOut query parameters
+by default (one page load per date, no calendar clicks); the notebook's
+calendar + Search flow is kept as navigation="calendar". Either way the
+room cards are read in a single script call.
+
+Each lookup is appended to a price log (mvtools.price_log) as its job
+finishes; a rerun skips (hotel URL, room type, date) lookups already logged
+in the last RESULT_MAX_AGE seconds, and the XLSX is written once, at the
+end, from the log.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import pandas as pd
+from openpyxl import load_workbook
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from mvtools.price_log import NA, PriceKey, PriceLog
+
+# -------------------- CONFIG --------------------
+COOKIES_FILE = "cookies.json"                    # file cookies bạn đã lưu bằng script login riêng
+INPUT_FILE = "Competitor Tracking.xlsx"         # file input, sheet "Hotel Link"
+SHEET_NAME = "Hotel Link"
+RESULTS_LOG = "tripcom_prices_log.sqlite"       # log giá đã crawl, dùng để resume
+FINAL_PREFIX = "tripcom_prices_"
+TIMEOUT = 20
+CALENDAR_TIMEOUT = 5
+WORKERS = 4
+# ------------------------------------------------
+
+HOME_URL = "https://vn.trip.com/"
+WEEK_OFFSETS = [0, 7, 14, 21, 28, 35]
+RETRY_DAYS = 7            # check-in days tried per week before giving up
+RESULT_MAX_AGE = 24 * 3600  # logged prices older than this are crawled again
+
+NAVIGATION = ("url", "calendar")
+DATE_PARAMS = ("checkIn", "checkOut")
+# Date parameters of other spellings that would conflict with ours
+STALE_DATE_PARAMS = {"checkin", "checkout", "checkindate", "checkoutdate"}
+
+ROOM_CARD = "div.commonRoomCard__BpNjl"
+ROOM_TITLE = "span.commonRoomCard-title__iYBn2"
+PRICE_SELECTORS = [
+    # Giá Total (incl. taxes & fees)
+    "div[class*='saleRoomItemBox-priceBox-priceExplain']",
+    # Giá hiển thị chính
+    "div[class*='saleRoomItemBox-priceBox-displayPrice'] span",
+    "span[class*='displayPrice']",
+]
+
+# (title, price) of every room card, read in one round trip instead of a
+# WebDriver call per card / selector
+READ_ROOM_CARDS_JS = """
+const [cardSel, titleSel, priceSels] = arguments;
+return Array.from(document.querySelectorAll(cardSel), card => {
+    const title = card.querySelector(titleSel);
+    let price = "NA";
+    for (const sel of priceSels) {
+        const el = card.querySelector(sel);
+        const txt = el ? el.innerText.trim() : "";
+        if (txt) { price = txt; break; }
+    }
+    return [title ? title.innerText : null, price];
+});
+"""
+
+# (hotel URL, room type): display names aren't unique (branches, renames)
+Key = Tuple[str, str]
+
+
+# ---------------- input ----------------
+def extract_hyperlinks_from_xlsx(file_path, sheet_name):
+    wb = load_workbook(filename=file_path, data_only=True)
+    ws = wb[sheet_name]
+
+    urls, hotel_names, room_types = [], [], []
+    for row in ws.iter_rows(min_row=2, max_col=2):
+        hotel_cell = row[0]
+        room_cell = row[1]
+        hotel_names.append(hotel_cell.value)
+        if hotel_cell.hyperlink:
+            urls.append(hotel_cell.hyperlink.target)
+        else:
+            urls.append(hotel_cell.value if hotel_cell.value else "")
+        room_types.append(room_cell.value if room_cell else "")
+    df = pd.DataFrame({"Hotel": urls, "Hotel_name": hotel_names, "Room_type": room_types})
+    return df
+
+
+def _hotel_url(value) -> Optional[str]:
+    url = str(value or "").replace("vn.trip.com", "trip.com")
+    return url if url.startswith("http") else None
+
+
+def hotel_rooms(df_urls: pd.DataFrame) -> "OrderedDict[str, List[Key]]":
+    """(hotel URL, room type) keys of the tracking sheet grouped by URL, in sheet order."""
+    hotels = OrderedDict()
+    for row in df_urls.itertuples(index=False):
+        url = _hotel_url(row.Hotel)
+        if url is None:
+            continue
+        key = (url, str(row.Room_type or ""))
+        hotels.setdefault(url, [])
+        if key not in hotels[url]:
+            hotels[url].append(key)
+    return hotels
+
+
+def hotel_names(df_urls: pd.DataFrame) -> Dict[str, str]:
+    """{hotel URL: display name}, the first name given for each URL."""
+    names = {}
+    for row in df_urls.itertuples(index=False):
+        url = _hotel_url(row.Hotel)
+        if url is not None:
+            names.setdefault(url, str(row.Hotel_name or url))
+    return names
+
+
+# ---------------- browser ----------------
+def start_driver(headless=True, driver_path=None):
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+    service = ChromeService(driver_path or ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    return driver
+
+
+def wait_page_ready(driver, timeout=TIMEOUT):
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+
+def save_cookies(cookies_file=COOKIES_FILE, login_seconds=60):
+    """Open a visible browser, let the user log in, then save the cookies."""
+    driver = webdriver.Chrome()
+    driver.get(HOME_URL)  # mở Trip.com trang chủ
+
+    print("➡️ Hãy đăng nhập thủ công (Email/Google/Apple).")
+    print(f"⏳ Bạn có {login_seconds} giây để login...")
+
+    time.sleep(login_seconds)  # cho bạn login bằng tay
+
+    # Sau khi login xong -> lưu cookies ra file
+    with open(cookies_file, "w", encoding="utf-8") as f:
+        json.dump(driver.get_cookies(), f)
+
+    print("✅ Cookies đã được lưu vào", cookies_file)
+    driver.quit()
+
+
+def read_cookies(cookies_file=COOKIES_FILE):
+    if not os.path.exists(cookies_file):
+        raise FileNotFoundError(f"Cookies file not found: {cookies_file}")
+    with open(cookies_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_cookies_into_driver(driver, cookies, home_url=HOME_URL):
+    driver.get(home_url)  # load base domain
+    wait_page_ready(driver)
+    for c in cookies:
+        cookie = {}
+        for k in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry"):
+            if k in c:
+                cookie[k] = c[k]
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            try:
+                cookie2 = cookie.copy()
+                cookie2.pop("domain", None)
+                driver.add_cookie(cookie2)
+            except Exception:
+                continue
+    driver.refresh()
+    wait_page_ready(driver)
+
+
+class BrowserPool:
+    """
+    Up to `size` logged-in Chrome drivers, created on first use and handed
+    out one per job. A driver that crashes is dropped and replaced.
+
+    driver_path: chromedriver to use; downloaded by webdriver_manager if None.
+    """
+
+    def __init__(
+        self, size=WORKERS, cookies_file=COOKIES_FILE, headless=True, home_url=HOME_URL,
+        driver_path=None,
+    ):
+        self.size = size
+        self.cookies = read_cookies(cookies_file)
+        self.headless = headless
+        self.home_url = home_url
+        self._idle = queue.Queue()
+        self._created = 0
+        self._all = []
+        self._lock = threading.Lock()
+        # Resolved once for the whole pool, not once per driver
+        self._driver_path = driver_path or ChromeDriverManager().install()
+
+    def _new_driver(self):
+        driver = start_driver(self.headless, self._driver_path)
+        load_cookies_into_driver(driver, self.cookies, self.home_url)
+        return driver
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+
+        try:
+            driver = self._new_driver()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    @contextmanager
+    def driver(self):
+        driver = self._acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self._discard(driver)
+            raise
+        except BaseException:
+            self._idle.put(driver)
+            raise
+        self._idle.put(driver)
+
+    def close(self):
+        with self._lock:
+            drivers, self._all = self._all, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+
+# ---------------- date selection helpers ----------------
+def dated_url(hotel_url, checkin_date, checkout_date):
+    """
+    hotel_url with checkIn / checkOut set to the given 'YYYY-MM-DD' dates,
+    other query parameters kept.
+    """
+    parts = urlsplit(hotel_url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in STALE_DATE_PARAMS
+    ]
+    query += list(zip(DATE_PARAMS, (checkin_date, checkout_date)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def open_dates(driver, hotel_url, checkin_date, checkout_date):
+    driver.get(dated_url(hotel_url, checkin_date, checkout_date))
+    wait_page_ready(driver)
+
+
+def _month_title(driver):
+    titles = driver.find_elements(By.CSS_SELECTOR, ".c-calendar-month-title")
+    return titles[0].text if titles else ""
+
+
+def _close_extra_tabs(driver):
+    while len(driver.window_handles) > 1:
+        driver.switch_to.window(driver.window_handles[-1])
+        driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+
+
+def select_dates_and_search(driver, checkin_date, checkout_date):
+    """
+    checkin_date, checkout_date dạng 'YYYY-MM-DD'
+    """
+    wait = WebDriverWait(driver, TIMEOUT)
+
+    # Click input check-in để mở calendar
+    checkin_input = wait.until(EC.element_to_be_clickable((By.ID, "checkInInput")))
+    driver.execute_script("arguments[0].click();", checkin_input)
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".c-calendar-month-title")))
+
+    # Parse datetime
+    checkin_obj = datetime.strptime(checkin_date, "%Y-%m-%d")
+    checkout_obj = datetime.strptime(checkout_date, "%Y-%m-%d")
+
+    ensure_date_visible_and_click(driver, checkin_obj)
+    ensure_date_visible_and_click(driver, checkout_obj)
+
+    # Click Search
+    try:
+        search_btn = wait.until(EC.element_to_be_clickable(
+            (By.CSS_SELECTOR, "button.tripui-online-btn-block")
+        ))
+    except TimeoutException:
+        print("⚠️ Không tìm thấy nút Search.")
+        return
+
+    old_cards = driver.find_elements(By.CSS_SELECTOR, ROOM_CARD)
+    handles = len(driver.window_handles)
+    driver.execute_script("arguments[0].click();", search_btn)
+
+    # Search either opens a result tab or refreshes the room list in place
+    try:
+        wait.until(lambda d: len(d.window_handles) > handles or (
+            old_cards and EC.staleness_of(old_cards[0])(d)
+        ))
+    except TimeoutException:
+        pass
+
+    _close_extra_tabs(driver)
+
+
+def ensure_date_visible_and_click(driver, target_date):
+    """
+    Navigate Trip.com calendar until target_date is visible, then click it.
+    Works both forward and backward.
+    """
+    label = target_date.strftime("%A, %B %d, %Y").replace(" 0", " ")
+    xpath = f"//div[@class='tipWrapper' and contains(@aria-label, '{label}')]"
+    target_dt = datetime(target_date.year, target_date.month, 1)
+
+    for _ in range(12):  # limit attempts
+        found = driver.find_elements(By.XPATH, xpath)
+        if found:
+            driver.execute_script("arguments[0].click();", found[0])
+            return True
+
+        # read current month text
+        current_month = _month_title(driver)
+        try:
+            current_dt = datetime.strptime(current_month, "%B %Y")
+        except ValueError:
+            current_dt = datetime.today()
+
+        # navigate calendar
+        selector = (
+            "span.c-calendar-icon-next-mon" if target_dt > current_dt
+            else "span.c-calendar-icon-prev-mon"
+        )
+        nav_btn = driver.find_element(By.CSS_SELECTOR, selector)
+        driver.execute_script("arguments[0].click();", nav_btn)
+
+        # Wait for the month to actually change instead of sleeping
+        try:
+            WebDriverWait(driver, CALENDAR_TIMEOUT).until(
+                lambda d: d.find_elements(By.XPATH, xpath) or _month_title(d) != current_month
+            )
+        except TimeoutException:
+            pass
+
+    print(f"❌ Could not find {label} after 12 tries")
+    return False
+
+
+# ---------------- price extraction ----------------
+def wait_for_room_cards(driver, timeout=TIMEOUT):
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, ROOM_CARD))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def read_room_cards(driver):
+    """[(title, price)] of the room cards on the page; price is "NA" if none shown."""
+    cards = driver.execute_script(READ_ROOM_CARDS_JS, ROOM_CARD, ROOM_TITLE, PRICE_SELECTORS)
+    return [(title, price) for title, price in cards or [] if title is not None]
+
+
+def find_room_prices(driver, room_types):
+    """{room type: (card title, price)} for the room types shown on the page."""
+    wanted = {r: (r or "").strip().lower() for r in room_types}
+    found = {}
+
+    # Ưu tiên giá Total (incl. taxes & fees), fallback về giá hiển thị chính
+    for title, price in read_room_cards(driver):
+        if price == "NA":
+            continue
+
+        for room_type, target_lower in wanted.items():
+            if room_type not in found and target_lower in title.strip().lower():
+                found[room_type] = (title, price)
+
+        if len(found) == len(wanted):
+            break
+
+    return found
+
+
+def find_room_block_and_price(driver, room_type):
+    title, price = find_room_prices(driver, [room_type]).get(room_type, (None, "NA"))
+    return title, price
+
+
+# ---------------- jobs ----------------
+def week_dates(base_checkin, offset):
+    """(checkin, checkout) pairs tried for one week, in order."""
+    return [
+        (
+            (base_checkin + timedelta(days=offset + d)).strftime("%Y-%m-%d"),
+            (base_checkin + timedelta(days=offset + d + 1)).strftime("%Y-%m-%d"),
+        )
+        for d in range(RETRY_DAYS)
+    ]
+
+
+def crawl_week(pool, hotel_url, rooms, dates, logged, navigation="url"):
+    """
+    Look up the prices of `rooms` (hotel URL, room type keys) of one hotel for
+    one week, trying the (checkin, checkout) `dates` in order until each
+    room shows a price. Lookups already in `logged` are not repeated.
+
+    navigation: "url" loads the hotel page with the dates in the URL,
+    "calendar" picks them in the page's date picker and clicks Search.
+
+    Returns the new (hotel URL, room, checkin, price) log entries; a date whose
+    room cards never loaded is left out so that it is retried next run.
+    """
+    priced = set()
+    entries = []
+
+    with pool.driver() as driver:
+        if navigation == "calendar":
+            driver.get(hotel_url)
+            wait_page_ready(driver)
+
+        for checkin, checkout in dates:
+            pending = [
+                key for key in rooms
+                if key not in priced and (*key, checkin) not in logged
+            ]
+            if not pending:
+                continue
+
+            try:
+                if navigation == "calendar":
+                    select_dates_and_search(driver, checkin, checkout)
+                else:
+                    open_dates(driver, hotel_url, checkin, checkout)
+            except TimeoutException as e:
+                print(f"Error select dates {checkin} -> {checkout}: {e}")
+            except WebDriverException as e:
+                if navigation != "calendar":
+                    raise
+                print(f"Error select dates {checkin} -> {checkout}: {e}")
+
+            if not wait_for_room_cards(driver):
+                continue
+
+            found = find_room_prices(driver, [room for _, room in pending])
+            for key in pending:
+                price = found.get(key[1], (None, NA))[1]
+                entries.append((*key, checkin, price))
+                if price != NA:
+                    priced.add(key)
+                    print(f"✅ {hotel_url} | {key[1]} | {checkin} → {price}")
+
+    return entries
+
+
+# ---------------- results ----------------
+def price_columns():
+    return [f"Price W{i}" for i in range(1, len(WEEK_OFFSETS) + 1)]
+
+
+def week_price(logged: Dict[PriceKey, str], key: Key, dates) -> Optional[str]:
+    """
+    First logged price of the week's dates, NA if every date was tried
+    without one, None if the week still has dates to try.
+    """
+    tried = 0
+    for checkin, _ in dates:
+        price = logged.get((*key, checkin))
+        if price is None:
+            continue
+        if price != NA:
+            return price
+        tried += 1
+    return NA if tried == len(dates) else None
+
+
+def results_frame(
+    keys: Iterable[Key], logged: Dict[PriceKey, str], base_checkin, names: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """
+    Hotel / Room / Price W1..W6 table from the price log; Hotel is the
+    display name from `names`, or the URL.
+    """
+    names = names or {}
+    weeks = [week_dates(base_checkin, offset) for offset in WEEK_OFFSETS]
+    rows = [
+        {
+            "Hotel": names.get(h, h),
+            "Room": r,
+            **{
+                column: week_price(logged, (h, r), dates) or NA
+                for column, dates in zip(price_columns(), weeks)
+            },
+        }
+        for h, r in keys
+    ]
+    return pd.DataFrame(rows, columns=["Hotel", "Room"] + price_columns())
+
+
+# ---------------- main crawl logic ----------------
+def crawl(
+    input_file=INPUT_FILE,
+    sheet_name=SHEET_NAME,
+    cookies_file=COOKIES_FILE,
+    workers=WORKERS,
+    headless=True,
+    results_log=RESULTS_LOG,
+    final_prefix=FINAL_PREFIX,
+    home_url=HOME_URL,
+    navigation="url",
+    max_age=RESULT_MAX_AGE,
+    driver_path=None,
+):
+    df_urls = extract_hyperlinks_from_xlsx(input_file, sheet_name)
+    hotels = hotel_rooms(df_urls)
+    names = hotel_names(df_urls)
+    keys = [key for rooms in hotels.values() for key in rooms]
+    base_checkin = datetime.today() + timedelta(days=1)
+
+    with PriceLog(results_log) as log:
+        logged = log.latest(since=time.time() - max_age)
+        if logged:
+            print(f"📂 Resume from {results_log} ({len(logged)} lookup(s) logged)")
+
+        jobs = []
+        for hotel_url, rooms in hotels.items():
+            for week_num, offset in enumerate(WEEK_OFFSETS, start=1):
+                dates = week_dates(base_checkin, offset)
+                todo = [key for key in rooms if week_price(logged, key, dates) is None]
+                if todo:
+                    jobs.append((hotel_url, todo, dates, f"Price W{week_num}"))
+
+        print(f"🏨 {len(hotels)} hotel(s), {len(jobs)} hotel x week job(s), {workers} browser(s)")
+
+        if jobs:
+            pool = BrowserPool(
+                workers, cookies_file, headless=headless, home_url=home_url,
+                driver_path=driver_path,
+            )
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(crawl_week, pool, url, todo, dates, logged, navigation): (url, column)
+                        for url, todo, dates, column in jobs
+                    }
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        url, column = futures[future]
+                        try:
+                            entries = future.result()
+                        except Exception as e:
+                            print(f"⚠️ {url} {column}: {e}")
+                            continue
+
+                        log.append(entries)
+                        print(f"[{done}/{len(jobs)}] {url} {column}")
+            finally:
+                pool.close()
+
+        logged = log.latest(since=time.time() - max_age)
+
+    # Export final
+    final_filename = f"{final_prefix}{datetime.today().strftime('%Y%m%d')}.xlsx"
+    results_frame(keys, logged, base_checkin, names).to_excel(final_filename, index=False)
+    print(f"\n✅ Done. Saved: {final_filename}")
+    return final_filename
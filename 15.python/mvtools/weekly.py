@@ -0,0 +1,91 @@
+"""
+Weekly signup aggregates behind the executive dashboard (mv-tool-4) and
+the weekly report CLI.
+
+The weekly table (ranks + WoW) is built once per upload; date-range
+changes only re-slice it with slice_weeks().
+"""
+import numpy as np
+import pandas as pd
+
+
+def week_start(dates: pd.Series) -> pd.Series:
+    """
+    Start of the W-MON week (Tuesday) containing each date.
+
+    Same result as .dt.to_period("W-MON").start_time, without a Python call
+    per row.
+    """
+    days = dates.dt.normalize()
+    return days - pd.to_timedelta((days.dt.dayofweek - 1) % 7, unit="D")
+
+
+def preprocess_signup(df):
+    HOTEL_COL = "hotel_short_name"
+    CITY_COL = "city"
+    DATE_COL = df.columns[4]
+    COUNT_COL = df.columns[5]
+
+    df = df.copy()
+
+    df["hotel_display"] = df[HOTEL_COL].astype(str).str.strip()
+    df["hotel_normalized"] = df["hotel_display"].str.lower()
+    df[CITY_COL] = df[CITY_COL].astype(str).str.strip()
+
+    if "brand_model" not in df.columns:
+        df["brand_model"] = "All"
+
+    df[DATE_COL] = pd.to_datetime(df[DATE_COL], errors="coerce")
+    df[COUNT_COL] = pd.to_numeric(df[COUNT_COL], errors="coerce").fillna(0)
+
+    df = df.dropna(subset=[DATE_COL])
+
+    df["week"] = week_start(df[DATE_COL])
+
+    return df, CITY_COL, COUNT_COL
+
+
+def build_weekly(df, city_col, count_col):
+    weekly = (
+        df
+        .groupby(
+            ["week", "hotel_display", city_col, "brand_model"]
+        )[count_col]
+        .sum()
+        .reset_index(name="signup_count")
+    )
+
+    weekly["Rank"] = (
+        weekly
+        .groupby("week")["signup_count"]
+        .rank(method="dense", ascending=False)
+        .astype(int)
+    )
+
+    return weekly
+
+
+def wow_metrics(weekly):
+    weekly = weekly.sort_values(["hotel_display", "week"])
+    by_hotel = weekly.groupby("hotel_display")
+    weekly["signup_wow"] = by_hotel["signup_count"].pct_change() * 100
+    weekly["rank_wow"] = by_hotel["Rank"].diff() * -1
+    # Week each WoW value is measured against, so slices can drop it
+    weekly["prev_week"] = by_hotel["week"].shift()
+    return weekly
+
+
+def slice_weeks(weekly, from_date, to_date):
+    """
+    Rows of a wow_metrics() table with week in [from_date, to_date].
+
+    WoW values measured against a week before from_date are cleared, so the
+    slice matches what building the table from only that range would give.
+    """
+    start, end = pd.Timestamp(from_date), pd.Timestamp(to_date)
+    weekly = weekly[(weekly["week"] >= start) & (weekly["week"] <= end)].copy()
+
+    outside = weekly["prev_week"] < start
+    weekly.loc[outside, ["signup_wow", "rank_wow"]] = np.nan
+
+    return weekly.drop(columns="prev_week")
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import io
 import os
-import zipfile
-import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from mvtools.csv_processor import output_name, process_files, write_zip
 
 st.set_page_config(page_title="CSV Reservation Processor", page_icon="🧹")
 st.title("🧹 CSV Reservation Processor Tool")
@@ -15,109 +17,70 @@ uploaded_files = st.file_uploader(
     type=["csv"]
 )
 
-def normalize(s: str) -> str:
-    s = str(s).strip().lower()
-    s = re.sub(r"[\s_\-]+", " ", s)
-    return s
-
-CANON = {
-    "row id": "row id",
-    "group id": "group id",
-    "hotel": "hotel",
-    "room type": "room type",
-    "check in": "check in",
-    "check out": "check out",
-    "price": "price",
-    "reservation code": "reservation code",
-}
-
-DESIRED_ORDER = [
-    "row id",
-    "reservation code",
-    "group id",
-    "hotel",
-    "room type",
-    "check in",
-    "check out",
-    "price",
-]
-
-def fix_headers_and_select(df: pd.DataFrame) -> pd.DataFrame:
-    # 1️⃣ Đổi tên cột AL (vị trí 38 → index 37) thành reservation code nếu có
-    if len(df.columns) >= 38:
-        al_name_old = df.columns[37]
-        if str(al_name_old).strip() != "reservation code":
-            df = df.rename(columns={al_name_old: "reservation code"})
-
-    # 2️⃣ Chuẩn hoá tên cột
-    col_map = {}
-    for c in df.columns:
-        key = normalize(c)
-        if key in CANON:
-            col_map[c] = CANON[key]
-        if "reservation" in key and "code" in key:
-            col_map[c] = "reservation code"
-    df = df.rename(columns=col_map)
-
-    # 3️⃣ Giữ lại các cột cần thiết
-    keep_cols = [c for c in CANON.values() if c in df.columns]
-    df = df[keep_cols]
-
-    # 4️⃣ Sắp xếp lại thứ tự
-    ordered = [c for c in DESIRED_ORDER if c in df.columns]
-    df = df[ordered]
-
-    # 5️⃣ Sort theo row id (tự phát hiện kiểu dữ liệu)
-    if "row id" in df.columns:
-        try:
-            df["row id"] = pd.to_numeric(df["row id"], errors="ignore")
-            df = df.sort_values(by="row id", ascending=True)
-        except Exception:
-            pass
-
-    return df
-
 if uploaded_files:
     processed_files = []
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for file in uploaded_files:
-            try:
-                df = pd.read_csv(file, dtype=str, keep_default_na=False, encoding="utf-8")
-                cleaned = fix_headers_and_select(df)
-
-                base_name, _ = os.path.splitext(file.name)
-                new_filename = f"{base_name} (processed).csv"
 
-                csv_buffer = io.StringIO()
-                cleaned.to_csv(csv_buffer, index=False)
-                zipf.writestr(new_filename, csv_buffer.getvalue())
-
-                st.success(f"✅ Đã xử lý & sort: {file.name}")
+    # Uploads are spooled to disk and processed there in worker processes,
+    # so processing memory stays bounded per file. The download buttons
+    # still hand each output (and the zip) to Streamlit, which keeps them
+    # in memory for the session - use `python -m mvtools.csv_processor`
+    # for very large batches.
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = Path(tmp) / "in"
+        out_dir = Path(tmp) / "out"
+        src_dir.mkdir()
+
+        # Uploads may share a name; the index keeps each one's file apart
+        sources = {}
+        for i, file in enumerate(uploaded_files):
+            path = src_dir / f"{i:03d}-{file.name}"
+            with open(path, "wb") as f:
+                file.seek(0)
+                shutil.copyfileobj(file, f, 1024 * 1024)
+            sources[str(path)] = file.name
+
+        results = {
+            r.source: r
+            for r in process_files(sources, out_dir, workers=min(len(sources), os.cpu_count() or 1))
+        }
+
+        download_names = {}
+        for i, (source, name) in enumerate(sources.items()):
+            result = results[source]
+
+            if result.error:
+                st.error(f"❌ Lỗi khi xử lý file {name}: {result.error}")
+                continue
+
+            new_filename = output_name(name)
+            if new_filename in download_names.values():
+                new_filename = f"{Path(new_filename).stem} ({i + 1}).csv"
+            download_names[result.output] = new_filename
+
+            st.success(f"✅ Đã xử lý & sort: {name}")
+            with open(result.output, "rb") as f:
                 st.download_button(
                     label=f"⬇️ Tải {new_filename}",
-                    data=csv_buffer.getvalue(),
+                    data=f,
                     file_name=new_filename,
                     mime="text/csv",
-                    key=f"dl_{new_filename}"
+                    key=f"dl_{i}_{new_filename}"
                 )
 
-                with st.expander(f"👀 Preview {new_filename}"):
-                    st.dataframe(cleaned.head(5))
+            with st.expander(f"👀 Preview {new_filename}"):
+                st.dataframe(pd.read_csv(result.output, dtype=str, keep_default_na=False, nrows=5))
 
-                processed_files.append(new_filename)
-            except Exception as e:
-                st.error(f"❌ Lỗi khi xử lý file {file.name}: {e}")
+            processed_files.append(result.output)
 
-    if processed_files:
-        zip_buffer.seek(0)
-        st.info(f"🎉 Hoàn tất! Đã xử lý & sort {len(processed_files)} file CSV.")
-        st.download_button(
-            label="📦 Tải tất cả (processed).zip",
-            data=zip_buffer,
-            file_name="processed_files.zip",
-            mime="application/zip"
-        )
+        if processed_files:
+            zip_path = write_zip(processed_files, Path(tmp) / "processed_files.zip", download_names)
+            st.info(f"🎉 Hoàn tất! Đã xử lý & sort {len(processed_files)} file CSV.")
+            with open(zip_path, "rb") as f:
+                st.download_button(
+                    label="📦 Tải tất cả (processed).zip",
+                    data=f,
+                    file_name="processed_files.zip",
+                    mime="application/zip"
+                )
 else:
     st.caption("📂 Hãy chọn ít nhất 1 file CSV để bắt đầu.")
\ No newline at end of file
@@ -1,20 +1,164 @@
+"""
+Replay failed landlord submissions to add-landlord-info.
+
+Safe to rerun: every row's outcome is checkpointed in a local SQLite file
+keyed by the row's content, and rows that already succeeded are skipped.
+Rows that fail validation or sending are written to a new fail file that
+can be fed straight back in. A send is only retried when the server
+certainly didn't receive it (429 / 503, no connection); a timeout or 5xx
+is recorded as failed rather than risking a duplicate landlord entry.
+
+Usage:
+    python retry.py "Landlord Landing Page - Production - fail.csv"
+"""
+import argparse
 import csv
-import requests
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from mvtools.checkpoint import FAILED, OK, Checkpoint, row_key
+from mvtools.http import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, post_all
 
 API_URL = "https://longstay.mvillage.vn/add-landlord-info"
+CSV_FILE = "/Users/hchinhtrung/Documents/GitHub/mvillage-email-template/15.python/Landlord Landing Page - Production - fail.csv"
+
+TEXT_FIELDS = ["name", "email", "phone", "area", "address"]
+INT_FIELDS = ["size", "room"]
+ERROR_COL = "error"
+CHECKPOINT_FILE = "retry.checkpoint.sqlite"
+
+
+def to_payload(row):
+    """
+    Validate a CSV row and build the API payload.
+
+    Raises:
+        ValueError: Missing field or a size / room that isn't a whole number
+    """
+    data = {}
+
+    for field in TEXT_FIELDS:
+        value = (row.get(field) or "").strip()
+        if not value:
+            raise ValueError(f"missing {field}")
+        data[field] = value
+
+    if "@" not in data["email"]:
+        raise ValueError(f"invalid email {data['email']!r}")
+
+    for field in INT_FIELDS:
+        value = (row.get(field) or "").strip()
+        try:
+            number = Decimal(value)
+            # "1200.0" from a spreadsheet is fine, "1200.7" is not
+            if number != number.to_integral_value():
+                raise ValueError
+            data[field] = int(number)
+        except (ValueError, InvalidOperation, OverflowError):
+            raise ValueError(f"{field} is not a whole number: {value!r}") from None
+
+    return data
+
+
+def read_jobs(path, checkpoint, invalid):
+    """
+    Yield (key, row, payload) for each row still to send.
+
+    Rows already sent and repeats of a row seen earlier in this run are
+    skipped; invalid rows go to invalid(row, error).
+    """
+    # The checkpoint only knows a key once its send finishes, and sends
+    # run concurrently, so a duplicate row could otherwise go out twice
+    seen = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # Rows from an earlier retry fail file carry the last error
+            row.pop(ERROR_COL, None)
+            key = row_key(row)
+            if key in seen or checkpoint.is_done(key):
+                continue
+            seen.add(key)
+
+            try:
+                payload = to_payload(row)
+            except ValueError as e:
+                checkpoint.record(key, FAILED, detail=str(e))
+                invalid(row, str(e))
+                continue
+
+            yield key, row, payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay failed landlord submissions")
+    parser.add_argument("csv", nargs="?", default=CSV_FILE, help="Fail file to replay (CSV)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument(
+        "--checkpoint",
+        help=f"SQLite checkpoint (default: {CHECKPOINT_FILE} next to the input)"
+    )
+    parser.add_argument("--fail-out", help="Where to write rows that still fail")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE,
+        help=f"Max requests per second, all workers together (default {DEFAULT_RATE:g}, the old "
+             "sequential pace; raise it to send faster, 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=DEFAULT_RETRIES,
+        help="Retries per row on 429 / 503 and failed connections"
+    )
+    args = parser.parse_args(argv)
+
+    src = Path(args.csv)
+    checkpoint_path = args.checkpoint or src.with_name(CHECKPOINT_FILE)
+    fail_path = Path(args.fail_out or src.with_name(
+        f"{src.stem} - retry {datetime.now():%Y%m%d-%H%M%S}.csv"
+    ))
+
+    with open(src, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    fieldnames = [c for c in header if c != ERROR_COL] + [ERROR_COL]
+
+    sent = failed = 0
+
+    with Checkpoint(checkpoint_path) as checkpoint, \
+            open(fail_path, "w", newline="", encoding="utf-8") as fail_file:
+
+        writer = csv.DictWriter(fail_file, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+
+        def write_failure(row, error):
+            nonlocal failed
+            failed += 1
+            writer.writerow({**row, ERROR_COL: error})
+            print(f"[FAILED] {row.get('email', '')} - {error}")
+
+        for result in post_all(
+            args.url,
+            read_jobs(src, checkpoint, write_failure),
+            payload_of=lambda job: job[2],
+            concurrency=args.concurrency,
+            rate=args.rate or None,
+            retries=args.retries,
+        ):
+            key, row, payload = result.item
+
+            if result.ok:
+                sent += 1
+                checkpoint.record(key, OK, result.status, result.text[:500], result.attempts)
+                print(f"[SUCCESS] {payload['email']} - {result.status}")
+            else:
+                checkpoint.record(key, FAILED, result.status, result.text[:500], result.attempts)
+                write_failure(row, f"{result.status} - {result.text[:200]}")
+
+    print(f"Done: {sent} sent, {failed} failed")
+    if failed:
+        print(f"Failed rows: {fail_path}")
+    else:
+        fail_path.unlink()
+
 
-with open("/Users/hchinhtrung/Documents/GitHub/mvillage-email-template/15.python/Landlord Landing Page - Production - fail.csv", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        data = {
-            "name": row["name"],
-            "email": row["email"],
-            "phone": row["phone"],
-            "area": row["area"],
-            "address": row["address"],
-            "size": int(row["size"]),
-            "room": int(row["room"])
-        }
-        print("Sending:", data)
-        response = requests.post(API_URL, json=data)
-        print(response.status_code, response.text)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,76 @@
+import argparse
 import csv
-import requests
-import time
+
+from mvtools.http import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    DEFAULT_RETRIES,
+    post_all,
+)
 
 API_URL = "https://api-user.mvillage.vn/api/me/notification/send-b2b-email"
 HEADERS = {"Content-Type": "application/json"}
 CSV_FILE = "/Users/chinhtrung/Documents/GitHub/mvillage-email-template/15.python/multi.csv"
 
-# Đọc file CSV
-with open(CSV_FILE, newline='', encoding='utf-8') as csvfile:
-    reader = csv.DictReader(csvfile)
-
-    for row in reader:
-        payload = {
-            "work_email": row.get("Work Email", "").strip(),
-            "contact_person": row.get("Contact Person", "").strip(),
-            "company_name": row.get("Company Name", "").strip(),
-            "phone_number": row.get("Phone Number", "").strip(),
-            "hotel_city": row.get("Hotel City", "").strip(),
-            "budget_per_night": row.get("Budget per Night", "").strip(),
-            "message": row.get("Message", "").strip(),
-            "created_at": row.get("Created Date", "").strip() or "test"
-        }
-
-        print(f"Sending to {payload['work_email']} ...")
-        response = requests.post(API_URL, headers=HEADERS, json=payload)
-
-        if response.status_code == 200:
-            print(f"[SUCCESS] {payload['work_email']}")
+
+def read_payloads(path):
+    """Yield one API payload per CSV row, without loading the whole file."""
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+
+        for row in reader:
+            yield {
+                "work_email": row.get("Work Email", "").strip(),
+                "contact_person": row.get("Contact Person", "").strip(),
+                "company_name": row.get("Company Name", "").strip(),
+                "phone_number": row.get("Phone Number", "").strip(),
+                "hotel_city": row.get("Hotel City", "").strip(),
+                "budget_per_night": row.get("Budget per Night", "").strip(),
+                "message": row.get("Message", "").strip(),
+                "created_at": row.get("Created Date", "").strip() or "test"
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send B2B lead notification emails")
+    parser.add_argument("csv", nargs="?", default=CSV_FILE, help="Lead export (CSV)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help="Requests in flight at once"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=DEFAULT_RATE,
+        help=f"Max requests per second, all workers together (default {DEFAULT_RATE:g}, the old "
+             "sequential pace; raise it to send faster, 0 = unlimited)"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=DEFAULT_RETRIES,
+        help="Retries per lead on 429 / 503 and failed connections (never after the lead may have been sent)"
+    )
+    args = parser.parse_args(argv)
+
+    sent = failed = 0
+
+    for result in post_all(
+        args.url,
+        read_payloads(args.csv),
+        headers=HEADERS,
+        concurrency=args.concurrency,
+        rate=args.rate or None,
+        retries=args.retries,
+    ):
+        email = result.item["work_email"]
+
+        if result.status == 200:
+            sent += 1
+            print(f"[SUCCESS] {email}")
         else:
-            print(f"[FAILED] {payload['work_email']} - {response.status_code} - {response.text}")
+            failed += 1
+            print(f"[FAILED] {email} - {result.status} - {result.text}")
+
+    print(f"Done: {sent} sent, {failed} failed")
+
 
-        time.sleep(0.5)  # tránh spam API
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Shared fixtures: a local HTTP stub server whose responses are scripted
+per test, and which serves fixture pages over GET.
+
+Run from 15.python/:
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubServer:
+    """
+    Answers every POST with the next scripted reply, then with `default`,
+    and every GET with the HTML in `pages` for its path (query ignored).
+
+    A reply is (status, body) or (status, body, headers, delay). Requests
+    are recorded as (path, JSON payload, monotonic time); a GET's payload
+    is None and its path keeps the query string.
+    """
+
+    def __init__(self):
+        self.replies = []
+        self.default = (200, "ok")
+        self.pages = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with stub._lock:
+                    stub.requests.append((self.path, json.loads(body or b"null"), time.monotonic()))
+                    reply = stub.replies.pop(0) if stub.replies else stub.default
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+
+                status, text, headers, delay = (tuple(reply) + ({}, 0))[:4]
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    data = text.encode("utf-8")
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests.append((self.path, None, time.monotonic()))
+                page = stub.pages.get(urlsplit(self.path).path)
+                data = (page if page is not None else "not found").encode("utf-8")
+                try:
+                    self.send_response(200 if page is not None else 404)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.root = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.url = f"{self.root}/api"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from mvtools import agoda
+
+HOTEL = "https://www.agoda.com/hotel-a/hotel/ho-chi-minh-city-vn.html"
+OVERVIEW = {"travellerTypeCounts": [{"travellerType": 2, "count": 7}, {"travellerType": 6, "count": 3}]}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(agoda, "RESPONSE_CACHE_DIR", tmp_path / "agoda")
+    return tmp_path / "agoda"
+
+
+def fetch(stub, urls=(HOTEL,), **options):
+    return agoda.fetch_overviews(list(urls), api_url=stub.url, rate=None, **options)
+
+
+def test_fetch_posts_the_overview_payload(stub):
+    stub.default = (200, json.dumps(OVERVIEW))
+
+    data, error = fetch(stub)[HOTEL]
+
+    assert error is None and data == OVERVIEW
+    assert [payload for _, payload, _ in stub.requests] == [agoda.overview_payload(HOTEL)]
+    assert agoda.guest_types(data) == {"Couple": 7, "Business traveler": 3}
+
+
+def test_fresh_cache_is_served_without_a_request(stub):
+    stub.default = (200, json.dumps(OVERVIEW))
+    fetch(stub)
+
+    stub.default = (500, "must not be called")
+    data, error = fetch(stub)[HOTEL]
+
+    assert error is None and data == OVERVIEW
+    assert len(stub.requests) == 1
+
+
+def test_expired_cache_is_refetched(stub):
+    stub.default = (200, json.dumps(OVERVIEW))
+    fetch(stub)
+
+    path = agoda._cache_path(HOTEL, agoda.LANGUAGE_ID)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+
+    newer = {"travellerTypeCounts": [{"travellerType": 1, "count": 1}]}
+    stub.default = (200, json.dumps(newer))
+    data, _ = fetch(stub, ttl=60)[HOTEL]
+
+    assert data == newer
+    assert len(stub.requests) == 2
+
+
+def test_refresh_bypasses_the_cache(stub):
+    stub.default = (200, json.dumps(OVERVIEW))
+    fetch(stub)
+    fetch(stub, ttl=0)                  # what the "refresh" checkbox passes
+
+    assert len(stub.requests) == 2
+
+
+def test_server_errors_are_retried(stub):
+    stub.replies = [(503, "busy"), (500, "oops", {"Retry-After": "0"})]
+    stub.default = (200, json.dumps(OVERVIEW))
+
+    data, error = fetch(stub)[HOTEL]
+
+    assert error is None and data == OVERVIEW
+    assert len(stub.requests) == 3
+
+
+def test_failures_are_reported_and_not_cached(stub):
+    stub.default = (404, "not found")
+
+    data, error = fetch(stub)[HOTEL]
+
+    assert data is None and error == "HTTP 404"
+    assert agoda.cached_overview(HOTEL) is None
+
+
+def test_duplicate_urls_are_fetched_once(stub):
+    stub.default = (200, json.dumps(OVERVIEW))
+
+    results = fetch(stub, urls=[HOTEL, HOTEL])
+
+    assert list(results) == [HOTEL]
+    assert len(stub.requests) == 1
+
+
+def test_failed_hotels_are_left_out_of_the_history(stub, tmp_path):
+    other = "https://www.agoda.com/hotel-b/hotel/hanoi-vn.html"
+    agoda.store_overview(HOTEL, OVERVIEW)          # cached, so only `other` is fetched
+    stub.default = (404, "not found")
+
+    df = agoda.analyze_urls([HOTEL, other], api_url=stub.url, rate=None)
+
+    assert df["Error"].isna().tolist() == [True, False]
+    assert df.loc[1, "Error"] == "HTTP 404"
+    assert df.loc[1, "Couple"] == 0 and df.loc[0, "Couple"] == 7
+
+    path = agoda.append_snapshot(df, history_dir=tmp_path / "history")
+
+    snapshot = pd.read_parquet(path)
+    assert snapshot["hotel_url"].tolist() == [HOTEL]
+    assert snapshot[["Couple", "Business traveler"]].values.tolist() == [[7, 3]]
+
+
+def test_history_skips_a_run_where_every_fetch_failed(stub, tmp_path):
+    stub.default = (404, "not found")
+
+    df = agoda.analyze_urls([HOTEL], api_url=stub.url, rate=None)
+
+    assert agoda.append_snapshot(df, history_dir=tmp_path / "history") is None
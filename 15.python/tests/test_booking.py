@@ -0,0 +1,39 @@
+import re
+import zipfile
+
+import openpyxl
+import pytest
+
+from mvtools import booking
+
+
+def stale_dimension_workbook(path):
+    """A workbook whose <dimension> claims A1 although cells go to D30."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"] = "Tour HR100"
+    ws["D30"] = "pickup for hr200, HR201"
+    ws["B12"] = 42
+    wb.save(path)
+
+    with zipfile.ZipFile(path) as src:
+        parts = {name: src.read(name) for name in src.namelist()}
+    sheet = "xl/worksheets/sheet1.xml"
+    parts[sheet] = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', parts[sheet])
+    assert b'<dimension ref="A1"' in parts[sheet]
+    with zipfile.ZipFile(path, "w") as dst:
+        for name, data in parts.items():
+            dst.writestr(name, data)
+    return path
+
+
+@pytest.mark.parametrize("engine", booking.ENGINES)
+def test_stale_dimension_does_not_hide_cells(tmp_path, engine):
+    path = stale_dimension_workbook(tmp_path / "tour.xlsx")
+
+    matches = booking.scan_workbook(path, engine)
+
+    assert [(m["cell"], m["booking_ids"]) for m in matches] == [
+        ("A1", ["HR100"]),
+        ("D30", ["HR200", "HR201"]),
+    ]
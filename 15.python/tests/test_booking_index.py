@@ -0,0 +1,101 @@
+import os
+
+import openpyxl
+import pytest
+
+from mvtools import booking
+from mvtools.booking_index import BookingIndex
+
+
+def workbook(path, cells):
+    wb = openpyxl.Workbook()
+    for address, value in cells.items():
+        wb.active[address] = value
+    wb.save(path)
+    return path
+
+
+def touch(path, seconds=10):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def index(tmp_path):
+    with BookingIndex(tmp_path / "index.sqlite") as index:
+        yield index
+
+
+def update(index, root):
+    return index.update([str(root)], workers=1, log=lambda m: None)
+
+
+def test_update_and_lookup(tmp_path, index):
+    root = tmp_path / "tours"
+    root.mkdir()
+    a = workbook(root / "a.xlsx", {"A1": "Tour HR100", "C5": "hr100 / HR200"})
+    b = workbook(root / "b.xlsx", {"B2": "HR200"})
+
+    stats = update(index, root)
+
+    assert stats == {"scanned": 2, "skipped": 0, "errors": 0, "removed": 0}
+    assert index.lookup(" hr100 ") == [
+        (str(a.resolve()), "Sheet", "A1", "Tour HR100"),
+        (str(a.resolve()), "Sheet", "C5", "hr100 / HR200"),
+    ]
+    assert [path for path, *_ in index.lookup("HR200")] == [str(a.resolve()), str(b.resolve())]
+    assert index.lookup("HR999") == []
+
+
+def test_stale_skips_unchanged_and_touched_files(tmp_path, index):
+    root = tmp_path / "tours"
+    root.mkdir()
+    same = workbook(root / "same.xlsx", {"A1": "HR1"})
+    touched = workbook(root / "touched.xlsx", {"A1": "HR2"})
+    edited = workbook(root / "edited.xlsx", {"A1": "HR3"})
+    gone = workbook(root / "gone.xlsx", {"A1": "HR4"})
+    update(index, root)
+
+    touch(touched)
+    workbook(edited, {"A1": "HR3", "A2": "HR5 added"})
+    touch(edited)
+    gone.unlink()
+    files = [p.resolve() for p in (same, touched, edited)]
+
+    todo, skipped = index.stale(files)
+
+    assert list(todo) == [edited.resolve()]
+    assert skipped == 2
+    stat = edited.stat()
+    assert todo[edited.resolve()][:2] == (stat.st_size, stat.st_mtime)
+    # The touched file's new mtime was recorded, so it is skipped outright now
+    assert index.stale([touched.resolve()]) == ({}, 1)
+
+    stats = update(index, root)
+
+    assert stats == {"scanned": 1, "skipped": 2, "errors": 0, "removed": 1}
+    assert [cell for _, _, cell, _ in index.lookup("HR5")] == ["A2"]
+    assert index.lookup("HR4") == []
+
+
+def test_workbook_saved_during_scan_is_rescanned(tmp_path, index, monkeypatch):
+    root = tmp_path / "tours"
+    root.mkdir()
+    path = workbook(root / "a.xlsx", {"A1": "HR1"})
+    scan_files = booking.scan_files
+
+    def scan_then_save(paths, **options):
+        for result in scan_files(paths, **options):
+            # Saved after the scan read it: the index must not take the
+            # new state for the scanned content
+            workbook(path, {"A1": "HR1", "B1": "HR2"})
+            touch(path)
+            yield result
+
+    monkeypatch.setattr(booking, "scan_files", scan_then_save)
+    update(index, root)
+    monkeypatch.setattr(booking, "scan_files", scan_files)
+
+    assert index.lookup("HR2") == []
+    assert update(index, root)["scanned"] == 1
+    assert [cell for _, _, cell, _ in index.lookup("HR2")] == ["B1"]
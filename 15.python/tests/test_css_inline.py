@@ -0,0 +1,116 @@
+import re
+
+from mvtools.css_inline import compile_stylesheet, inline_css
+
+
+def page(css, body):
+    return f"<html><head><style>{css}</style></head><body>{body}</body></html>"
+
+
+def styles(html):
+    """style attributes in document order."""
+    return re.findall(r'style="([^"]*)"', html)
+
+
+def test_specificity_then_source_order():
+    css = ".a {color:red} p {color:blue; margin:0} p {margin:1px} #x {color:green}"
+
+    html = inline_css(page(css, '<p class="a">1</p><p>2</p><p class="a" id="x">3</p>'))
+
+    assert styles(html) == ["margin:1px;color:red", "color:blue;margin:1px", "margin:1px;color:green"]
+
+
+def test_inline_style_wins_unless_important():
+    css = "td {color:red; padding:1px} td {border:0 !important}"
+
+    html = inline_css(page(css, '<td style="color: green; border: 2px">x</td>'))
+
+    assert styles(html) == ["padding:1px;color: green; border: 2px;border:0 !important"]
+
+
+def test_descendant_and_child_combinators():
+    css = ".footer p {font-size:12px} div > span {color:red}"
+    body = (
+        '<p>a</p><div class="footer"><table><tr><td><p>b</p></td></tr></table></div>'
+        "<div><span>c</span><p><span>d</span></p></div>"
+    )
+
+    html = inline_css(page(css, body))
+
+    assert "<p>a</p>" in html
+    assert '<p style="font-size:12px">b</p>' in html
+    assert '<span style="color:red">c</span>' in html
+    assert "<span>d</span>" in html
+
+
+def test_closed_ancestors_no_longer_match():
+    css = ".footer p {font-size:12px}"
+
+    html = inline_css(page(css, '<div class="footer"><br/><img src="x"></div><p>after</p>'))
+
+    assert "<p>after</p>" in html
+
+
+def test_uninlinable_rules_stay_in_style():
+    css = (
+        "@import url(fonts.css); a:hover {color:blue} a, td[align] {color:red}"
+        " @media (max-width: 600px) { .col {width:100% !important} }"
+    )
+
+    html = inline_css(page(css, '<a href="#">x</a><td class="col">y</td>'))
+
+    style = re.search(r"<style>(.*?)</style>", html, re.DOTALL).group(1)
+    assert "@import url(fonts.css);" in style
+    assert "a:hover{color:blue}" in style
+    assert "td[align]{color:red}" in style
+    assert "@media (max-width: 600px){ .col {width:100% !important} }" in style
+    assert '<a href="#" style="color:red">' in html
+    assert '<td class="col">' in html
+
+
+def test_fully_inlined_style_block_is_removed():
+    html = inline_css(page("p {margin:0}", "<p>x</p>"))
+
+    assert "<style" not in html
+    assert '<p style="margin:0">' in html
+
+
+def test_comments_and_conditional_comments_are_left_alone():
+    body = (
+        '<!--[if mso]><table><tr><td class="a">mso</td></tr></table><![endif]-->'
+        '<!-- <p class="a">old</p> --><td class="a">x</td>'
+    )
+
+    html = inline_css(page(".a {color:red}", body))
+
+    assert '<!--[if mso]><table><tr><td class="a">mso</td></tr></table><![endif]-->' in html
+    assert '<!-- <p class="a">old</p> -->' in html
+    assert '<td class="a" style="color:red">x</td>' in html
+
+
+def test_style_inside_a_comment_is_not_applied():
+    html = '<!--[if !mso]><style>p {color:red}</style><!--<![endif]--><p>x</p>'
+
+    assert inline_css(html) == html
+
+
+def test_memo_matches_a_fresh_parse():
+    css = ".footer p {font-size:12px} p {margin:0} .cta {color:#fff !important}"
+    body = (
+        '<p>{n}</p><div class="footer"><p>{n}</p></div>'
+        '<p class="cta" style="color:red">{n}</p><div class="footer"><p class="cta">{n}</p></div><p>{n}</p>'
+    )
+    compile_stylesheet.cache_clear()
+
+    for n in range(3):
+        html = page(css, body.replace("{n}", str(n)))
+        assert inline_css(html) == inline_css(html, cache=False)
+
+    assert styles(inline_css(html)) == [
+        "margin:0",
+        "margin:0;font-size:12px",
+        "margin:0;color:red;color:#fff !important",
+        "margin:0;font-size:12px;color:#fff !important",
+        "margin:0",
+    ]
+    assert compile_stylesheet.cache_info().misses == 1
@@ -0,0 +1,15 @@
+from mvtools.csv_processor import resolve_columns
+
+
+def test_duplicate_headers_keep_the_first_column():
+    header = ["Row ID", "Hotel", "Price", "Hotel", "hotel", "Reservation Code", "reservation_code"]
+
+    assert resolve_columns(header) == [
+        (0, "row id"), (5, "reservation code"), (1, "hotel"), (2, "price"),
+    ]
+
+
+def test_column_al_is_the_reservation_code():
+    header = ["Row ID"] + [f"x{i}" for i in range(36)] + ["Booking ref", "Hotel"]
+
+    assert resolve_columns(header) == [(0, "row id"), (37, "reservation code"), (38, "hotel")]
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from mvtools.cube import build_cube
+
+COLUMNS = dict(
+    hotel_col="hotel", city_col="city", brand_col="brand", res_date_col="day",
+    tenant_col="tenant", signup_date_col="day", signup_count_col="n",
+)
+SIGNUP = pd.DataFrame({"hotel": ["a"], "day": pd.to_datetime(["2025-01-01"]), "n": [3]})
+
+
+def reservations(rows):
+    df = pd.DataFrame(rows, columns=["hotel", "city", "brand", "day", "tenant"])
+    return df.assign(day=pd.to_datetime(df["day"]))
+
+
+def test_counts_match_groupby_nunique():
+    res = reservations([
+        ("a", "HCM", "x", "2025-01-01", "t1"),
+        ("a", "HCM", "x", "2025-01-02", "t1"),
+        ("a", "HCM", "x", "2025-01-02", "t2"),
+        ("b", "HN", "y", "2025-01-03", "t3"),
+    ])
+    cube = build_cube(res, SIGNUP, **COLUMNS)
+
+    result = cube.query("2025-01-01", "2025-01-02")
+
+    assert result.to_dict("records") == [
+        {"hotel": "a", "city": "HCM", "brand": "x", "checkin": 2, "signup": 3},
+    ]
+
+
+def test_no_reservations_gives_an_empty_cube():
+    res = reservations([("a", "HCM", "x", "2025-01-01", None)])   # dropped: no tenant
+    for frame in (res, res.iloc[:0]):
+        cube = build_cube(frame, SIGNUP, **COLUMNS)
+
+        result = cube.query("2025-01-01", "2025-12-31")
+
+        assert result.empty
+        assert list(result.columns) == ["hotel", "city", "brand", "checkin", "signup"]
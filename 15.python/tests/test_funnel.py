@@ -0,0 +1,23 @@
+import pandas as pd
+
+from mvtools.funnel import daily_labels, parse_daily_dates
+
+
+def test_full_and_abbreviated_month_names():
+    values = pd.Series(["May 19, 2025", "Sep 5, 2025", "Sept 5, 2025", "SEPT 30, 2025", "June 1, 2025"])
+
+    parsed = parse_daily_dates(values)
+
+    assert parsed.dt.strftime("%Y-%m-%d").tolist() == [
+        "2025-05-19", "2025-09-05", "2025-09-05", "2025-09-30", "2025-06-01",
+    ]
+
+
+def test_non_daily_and_invalid_labels_are_nat():
+    values = pd.Series(["Total", "2025", None, "", "Foo 5, 2025", "Sept 31, 2025"])
+
+    parsed = parse_daily_dates(values)
+
+    assert parsed.isna().all()
+    # The last two look like dates, so mv-tool-3 reports them separately
+    assert daily_labels(values).tolist() == [False, False, False, False, True, True]
@@ -0,0 +1,115 @@
+import socket
+import time
+
+from mvtools.http import TokenBucket, make_session, post_all, post_with_backoff
+
+
+def post(stub, payload=None, **options):
+    options.setdefault("backoff", 0.01)
+    with make_session() as session:
+        return post_with_backoff(session, stub.url, payload or {"n": 1}, **options)
+
+
+def test_429_waits_for_retry_after(stub):
+    stub.replies = [(429, "slow down", {"Retry-After": "0.3"})]
+
+    start = time.monotonic()
+    result = post(stub)
+
+    assert result.ok and result.attempts == 2
+    assert stub.requests[1][2] - stub.requests[0][2] >= 0.3
+    assert time.monotonic() - start >= 0.3
+
+
+def test_503_backs_off_exponentially(stub):
+    stub.replies = [(503, "busy"), (503, "busy")]
+
+    result = post(stub, backoff=0.1)
+
+    assert result.ok and result.attempts == 3
+    times = [t for _, _, t in stub.requests]
+    assert times[1] - times[0] >= 0.1
+    assert times[2] - times[1] >= 0.2
+
+
+def test_retries_are_bounded(stub):
+    stub.default = (429, "slow down")
+
+    result = post(stub, retries=2)
+
+    assert result.status == 429 and result.attempts == 3
+    assert len(stub.requests) == 3
+
+
+def test_5xx_that_may_have_been_processed_is_not_resent(stub):
+    for status in (500, 502, 504):
+        stub.requests.clear()
+        stub.replies = [(status, "oops")]
+
+        result = post(stub)
+
+        assert result.status == status and result.attempts == 1
+        assert len(stub.requests) == 1
+
+
+def test_5xx_is_retried_when_idempotent(stub):
+    stub.replies = [(500, "oops"), (502, "oops")]
+
+    result = post(stub, idempotent=True)
+
+    assert result.ok and result.attempts == 3
+
+
+def test_read_timeout_is_not_resent(stub):
+    stub.replies = [(200, "late", {}, 1.0)]
+
+    result = post(stub, timeout=0.2)
+
+    assert result.status is None and result.attempts == 1
+    assert len(stub.requests) == 1
+
+
+def test_refused_connection_is_retried():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]     # closed again before the POST
+
+    with make_session() as session:
+        result = post_with_backoff(
+            session, f"http://127.0.0.1:{port}/api", {"n": 1}, retries=2, backoff=0.01
+        )
+
+    assert result.status is None and result.attempts == 3
+
+
+def test_post_all_caps_concurrency(stub):
+    stub.default = (200, "ok", {}, 0.1)
+    payloads = [{"n": i} for i in range(12)]
+
+    results = list(post_all(stub.url, payloads, concurrency=3, rate=None))
+
+    assert sorted(r.item["n"] for r in results) == list(range(12))
+    assert all(r.ok for r in results)
+    assert stub.max_in_flight == 3
+
+
+def test_post_all_keeps_to_rate(stub):
+    # The bucket starts full (burst = rate), so the 10 requests beyond the
+    # first 20 take at least 10 / rate seconds
+    rate = 20.0
+    start = time.monotonic()
+    results = list(post_all(stub.url, ({"n": i} for i in range(30)), concurrency=4, rate=rate))
+
+    assert len(results) == 30
+    assert time.monotonic() - start >= 10 / rate * 0.95
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50.0, burst=1)
+
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+
+    elapsed = time.monotonic() - start
+    assert 10 / 50 * 0.95 <= elapsed < 1.0
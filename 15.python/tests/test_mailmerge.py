@@ -0,0 +1,67 @@
+import smtplib
+
+import pytest
+
+from mvtools import mailmerge
+from mvtools.template_manifest import build_manifest
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "welcome-en.html"
+    path.write_text("<title>Hi {{Name}}</title><p>Welcome {{Name}}</p>", encoding="utf-8")
+    return path
+
+
+def options(template, **changes):
+    pattern = str(template.parent / "welcome-{lang}.html")
+    return mailmerge.Options(pattern, str(template.parent / "out"), **changes)
+
+
+def test_rows_with_surplus_fields_are_rejected_before_validation(template):
+    rows = [
+        {"Email": "a@example.com", "Name": "An", "lang": "en"},
+        {"Email": "b@example.com", "Name": "Binh", "lang": "en", None: ["x", "y"]},
+        {"Email": "c@example.com", "Name": "", "lang": "en"},
+    ]
+
+    keep, rejected = mailmerge._screen(rows, 10, options(template), build_manifest(template.parent, cache=None))
+
+    assert keep == [(10, rows[0])]
+    assert rejected == [
+        (11, "MalformedRow: 2 field(s) more than the header"),
+        (12, "Invalid: blank: Name"),
+    ]
+
+
+class FlakySMTP:
+    """smtplib.SMTP stand-in that refuses one recipient."""
+
+    sent = []
+
+    def __init__(self, host, port):
+        pass
+
+    def send_message(self, msg):
+        if msg["To"] == "refused@example.com":
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"no such user")})
+        self.sent.append(msg["To"])
+
+    def quit(self):
+        pass
+
+
+def test_a_refused_recipient_does_not_stop_the_batch(template, monkeypatch):
+    monkeypatch.setattr(mailmerge.smtplib, "SMTP", FlakySMTP)
+    FlakySMTP.sent = []
+    rows = [
+        (1, {"Email": "a@example.com", "Name": "An", "lang": "en"}),
+        (2, {"Email": "refused@example.com", "Name": "Binh", "lang": "en"}),
+        (3, {"Email": "c@example.com", "Name": "Chi", "lang": "en"}),
+    ]
+
+    result = mailmerge.render_batch(0, rows, options(template, format="smtp", smtp="localhost:1025"))
+
+    assert result.rendered == 2
+    assert FlakySMTP.sent == ["a@example.com", "c@example.com"]
+    assert [(row_no, error.split(":")[0]) for row_no, error in result.errors] == [(2, "SMTPRecipientsRefused")]
@@ -0,0 +1,59 @@
+import pytest
+
+from mvtools import price_log
+from mvtools.price_log import NA, PriceLog
+
+HOTEL_A = "https://trip.com/hotels/detail/?hotelId=1"
+HOTEL_B = "https://trip.com/hotels/detail/?hotelId=2"
+
+
+@pytest.fixture
+def log(tmp_path):
+    with PriceLog(tmp_path / "prices.sqlite") as log:
+        yield log
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(price_log.time, "time", lambda: now[0])
+    return now
+
+
+def test_latest_entry_per_key_wins(log, clock):
+    log.append([(HOTEL_A, "Deluxe", "2026-01-05", NA), (HOTEL_A, "Suite", "2026-01-05", "2,000,000 ₫")])
+    clock[0] = 2000.0
+    log.append([(HOTEL_A, "Deluxe", "2026-01-05", "1,800,000 ₫")])
+
+    assert log.latest() == {
+        (HOTEL_A, "Deluxe", "2026-01-05"): "1,800,000 ₫",
+        (HOTEL_A, "Suite", "2026-01-05"): "2,000,000 ₫",
+    }
+
+
+def test_latest_since_ignores_older_entries(log, clock):
+    log.append([(HOTEL_A, "Deluxe", "2026-01-05", "1,800,000 ₫")])
+    clock[0] = 2000.0
+    log.append([(HOTEL_B, "Deluxe", "2026-01-05", NA)])
+
+    assert log.latest(since=1500.0) == {(HOTEL_B, "Deluxe", "2026-01-05"): NA}
+    assert log.latest(since=2000.0) == {(HOTEL_B, "Deluxe", "2026-01-05"): NA}
+    assert log.latest(since=2000.1) == {}
+
+
+def test_same_room_at_two_hotels_stays_apart(log, clock):
+    log.append([(HOTEL_A, "Deluxe", "2026-01-05", "1"), (HOTEL_B, "Deluxe", "2026-01-05", "2")])
+
+    assert log.latest() == {
+        (HOTEL_A, "Deluxe", "2026-01-05"): "1",
+        (HOTEL_B, "Deluxe", "2026-01-05"): "2",
+    }
+
+
+def test_entries_survive_reopening(tmp_path, clock):
+    path = tmp_path / "prices.sqlite"
+    with PriceLog(path) as log:
+        log.append([(HOTEL_A, "Deluxe", "2026-01-05", "1")])
+
+    with PriceLog(path) as log:
+        assert log.latest(since=999.0) == {(HOTEL_A, "Deluxe", "2026-01-05"): "1"}
@@ -0,0 +1,45 @@
+import csv
+
+import pytest
+
+from mvtools.checkpoint import OK, Checkpoint, row_key
+from retry import read_jobs, to_payload
+
+ROW = {"name": "An", "email": "an@example.com", "phone": "+84", "area": "HCM", "address": "1 Le Loi",
+       "size": "1200", "room": "30"}
+
+
+@pytest.mark.parametrize("value, expected", [("1200", 1200), (" 1200 ", 1200), ("1200.0", 1200)])
+def test_whole_numbers_are_accepted(value, expected):
+    assert to_payload({**ROW, "size": value})["size"] == expected
+
+
+@pytest.mark.parametrize("value", ["1200.7", "", "abc", "nan", "inf"])
+def test_other_numbers_are_rejected(value):
+    with pytest.raises(ValueError, match="size"):
+        to_payload({**ROW, "size": value})
+
+
+def test_read_jobs_skips_sent_and_repeated_rows(tmp_path):
+    rows = [
+        {**ROW, "error": "HTTP 503"},
+        {**ROW, "name": "Binh"},
+        {**ROW, "name": " An ", "error": "timeout"},   # same row, other error / spacing
+        {**ROW, "name": "Chi"},
+        {**ROW, "name": "Dung", "size": "big"},
+        {**ROW, "name": "Dung", "size": "big"},
+    ]
+    path = tmp_path / "fail.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=[*ROW, "error"])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    invalid = []
+
+    with Checkpoint(tmp_path / "checkpoint.sqlite") as checkpoint:
+        checkpoint.record(row_key({**ROW, "name": "Chi"}), OK)
+        jobs = list(read_jobs(path, checkpoint, lambda row, error: invalid.append((row["name"], error))))
+
+    assert [payload["name"] for _, _, payload in jobs] == ["An", "Binh"]
+    assert invalid == [("Dung", "size is not a whole number: 'big'")]
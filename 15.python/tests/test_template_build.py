@@ -0,0 +1,21 @@
+from mvtools.template_build import minify, minify_declarations
+
+
+def test_entities_and_quotes_are_not_split():
+    css = "font-family: &quot;A&quot;, &quot;B&quot;, &quot;C&quot;; background: url('a;b.png')"
+    assert minify_declarations(css) == (
+        "font-family:&quot;A&quot;,&quot;B&quot;,&quot;C&quot;;background:url('a;b.png')"
+    )
+
+
+def test_only_whole_duplicate_declarations_are_dropped():
+    assert minify_declarations("color: red; color: blue; color: red;") == "color:blue;color:red"
+
+
+def test_non_breaking_spaces_are_content():
+    assert minify("<td>\u00a0</td>\n<p> \u00a0a\u00a0 </p>") == "<td>\u00a0</td><p>\u00a0a\u00a0</p>"
+
+
+def test_placeholders_are_untouched():
+    html = '<p style="color: red;">  {{ .Name }}  </p>'
+    assert minify(html) == '<p style="color:red">{{ .Name }}</p>'
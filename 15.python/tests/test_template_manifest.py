@@ -0,0 +1,79 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from mvtools import template_manifest
+from mvtools.template_manifest import build_manifest, validate
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "templates"
+    root.mkdir()
+    (root / "welcome-en.html").write_text("<p>Hi {{.Name}}, room {{ Room }} {{.Note}}</p>", encoding="utf-8")
+    (root / "welcome-vi.html").write_text("<p>Chào {{.Name}}, mã {{.CodeVAT}}</p>", encoding="utf-8")
+    return root
+
+
+def test_validate_mixed_variants(root):
+    df = pd.DataFrame({
+        "Email": ["a@x.vn", "b@x.vn", "", "d@x.vn", "e@x.vn"],
+        "lang": ["en", "en", "en", "vi", "fr"],
+        "Name": ["An", "  ", "Chi", "Dung", "Em"],
+        "Room": ["101", None, "103", "104", "105"],
+        "Note": [None, "", "", "", ""],
+    })
+    pattern = str(root / "welcome-{lang}.html")
+
+    errors = validate(df, pattern, build_manifest(root, cache=None), required=["Email"])
+
+    assert errors.tolist() == [
+        "",
+        "blank: Name, Room",
+        "blank: Email",
+        "missing columns: CodeVAT (welcome-vi.html)",
+        f"template not found: {root / 'welcome-fr.html'}",
+    ]
+
+
+def test_validate_missing_pattern_column(root):
+    df = pd.DataFrame({"Email": ["a@x.vn"], "Name": ["An"]})
+
+    errors = validate(df, str(root / "welcome-{lang}.html"), required=["Email", "Phone"])
+
+    assert errors.tolist() == ["missing columns: lang, Phone"]
+
+
+def test_manifest_cache_is_reused(root, tmp_path, monkeypatch):
+    cache = tmp_path / "manifest.json"
+    first = build_manifest(root, cache)
+
+    def no_rescan(path):
+        raise AssertionError(f"{path} rescanned")
+
+    monkeypatch.setattr(template_manifest, "template_fields", no_rescan)
+    mtime = cache.stat().st_mtime_ns
+
+    assert build_manifest(root, cache) == first
+    assert cache.stat().st_mtime_ns == mtime
+    assert sorted(first.values()) == [["Name", "CodeVAT"], ["Name", "Room", "Note"]]
+
+
+def test_manifest_rescans_changed_templates(root, tmp_path):
+    cache = tmp_path / "manifest.json"
+    build_manifest(root, cache)
+
+    path = root / "welcome-vi.html"
+    stat = path.stat()
+    path.write_text("<p>Chào {{.Name}}, mã {{.CodeVAT}}, {{.Phone}}</p>", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (root / "welcome-en.html").unlink()
+
+    manifest = build_manifest(root, cache)
+
+    assert manifest == {str(path.resolve()): ["Name", "CodeVAT", "Phone"]}
+    stored = json.loads(cache.read_text(encoding="utf-8"))
+    assert stored["version"] == template_manifest.MANIFEST_VERSION
+    assert stored["templates"][str(path.resolve())]["fields"] == ["Name", "CodeVAT", "Phone"]
@@ -0,0 +1,210 @@
+import json
+import os
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+
+from mvtools import tripcom  # noqa: E402
+from mvtools.price_log import NA  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "tripcom_hotel.html"
+CARDS = [
+    ("Superior Double Room", "Total 1,250,000 ₫"),
+    ("Deluxe Twin Room", "1,800,000 ₫"),
+    ("Family Suite", "NA"),
+]
+
+
+@pytest.fixture
+def hotel(stub):
+    """URL of the fixture hotel page served by the stub."""
+    stub.pages["/hotel"] = FIXTURE.read_text(encoding="utf-8")
+    return f"{stub.root}/hotel"
+
+
+@pytest.fixture(scope="module")
+def driver():
+    # CHROMEDRIVER points at a local chromedriver where there is no network
+    try:
+        driver = tripcom.start_driver(headless=True, driver_path=os.environ.get("CHROMEDRIVER"))
+    except Exception as e:      # no Chrome / chromedriver download failed
+        pytest.skip(f"no headless Chrome: {e}")
+    yield driver
+    driver.quit()
+
+
+class OnePool:
+    """BrowserPool stand-in handing out a single driver."""
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    @contextmanager
+    def driver(self):
+        yield self._driver
+
+
+def query(url):
+    return parse_qsl(urlsplit(url).query)
+
+
+# ---------------- dated_url ----------------
+def test_dated_url_adds_dates_and_keeps_other_params():
+    url = tripcom.dated_url("https://trip.com/hotels/detail/?hotelId=42&curr=VND", "2026-01-05", "2026-01-06")
+
+    assert url.startswith("https://trip.com/hotels/detail/?")
+    assert query(url) == [
+        ("hotelId", "42"), ("curr", "VND"), ("checkIn", "2026-01-05"), ("checkOut", "2026-01-06"),
+    ]
+
+
+def test_dated_url_replaces_existing_dates():
+    url = tripcom.dated_url(
+        "https://trip.com/h/?hotelId=42&checkIn=2025-12-01&checkOut=2025-12-02", "2026-01-05", "2026-01-06"
+    )
+
+    assert query(url) == [("hotelId", "42"), ("checkIn", "2026-01-05"), ("checkOut", "2026-01-06")]
+
+
+def test_dated_url_drops_stale_date_spellings():
+    url = tripcom.dated_url(
+        "https://trip.com/h/?checkin=2025-12-01&CheckOutDate=2025-12-02&hotelId=42", "2026-01-05", "2026-01-06"
+    )
+
+    assert query(url) == [("hotelId", "42"), ("checkIn", "2026-01-05"), ("checkOut", "2026-01-06")]
+
+
+# ---------------- week_price ----------------
+DATES = [("2026-01-05", "2026-01-06"), ("2026-01-06", "2026-01-07"), ("2026-01-07", "2026-01-08")]
+HOTEL = "https://trip.com/hotels/detail/?hotelId=1"
+KEY = (HOTEL, "Deluxe")
+
+
+def test_week_price_is_the_first_logged_price():
+    logged = {
+        (*KEY, "2026-01-05"): NA,
+        (*KEY, "2026-01-06"): "1,800,000 ₫",
+        (*KEY, "2026-01-07"): "1,900,000 ₫",
+    }
+
+    assert tripcom.week_price(logged, KEY, DATES) == "1,800,000 ₫"
+
+
+def test_week_price_is_na_once_every_date_was_tried():
+    logged = {(*KEY, checkin): NA for checkin, _ in DATES}
+
+    assert tripcom.week_price(logged, KEY, DATES) == NA
+
+
+def test_week_price_is_pending_while_dates_are_left():
+    logged = {(*KEY, "2026-01-05"): NA, (f"{HOTEL}2", "Deluxe", "2026-01-06"): "1"}
+
+    assert tripcom.week_price(logged, KEY, DATES) is None
+    assert tripcom.week_price({}, KEY, DATES) is None
+
+
+# ---------------- input / results ----------------
+def test_rooms_are_keyed_on_the_hotel_url():
+    df = pd.DataFrame({
+        "Hotel": ["https://vn.trip.com/h?id=1", "https://vn.trip.com/h?id=2", "https://vn.trip.com/h?id=1", "", None],
+        "Hotel_name": ["M Village", "M Village", "M Village Tôn Thất Đạm", "No link", None],
+        "Room_type": ["Deluxe", "Deluxe", "Suite", "Deluxe", None],
+    })
+    one, two = "https://trip.com/h?id=1", "https://trip.com/h?id=2"
+
+    assert tripcom.hotel_rooms(df) == {one: [(one, "Deluxe"), (one, "Suite")], two: [(two, "Deluxe")]}
+    assert tripcom.hotel_names(df) == {one: "M Village", two: "M Village"}
+
+
+def test_results_frame_shows_names_per_url():
+    base = datetime(2026, 1, 5)
+    one, two = "https://trip.com/h?id=1", "https://trip.com/h?id=2"
+    logged = {
+        (one, "Deluxe", "2026-01-05"): "1,000,000 ₫",
+        (two, "Deluxe", "2026-01-05"): "2,000,000 ₫",
+    }
+
+    df = tripcom.results_frame([(one, "Deluxe"), (two, "Deluxe")], logged, base, {one: "M Village", two: "M Village"})
+
+    assert df[["Hotel", "Room", "Price W1"]].values.tolist() == [
+        ["M Village", "Deluxe", "1,000,000 ₫"],
+        ["M Village", "Deluxe", "2,000,000 ₫"],
+    ]
+    assert df["Price W2"].isna().sum() == 0 and set(df["Price W2"]) == {NA}
+
+
+# ---------------- BrowserPool ----------------
+def test_browser_pool_uses_the_given_driver_path(tmp_path, monkeypatch):
+    class NoDownload:
+        def install(self):
+            raise AssertionError("chromedriver must not be downloaded")
+
+    monkeypatch.setattr(tripcom, "ChromeDriverManager", NoDownload)
+    cookies = tmp_path / "cookies.json"
+    cookies.write_text(json.dumps([]), encoding="utf-8")
+
+    pool = tripcom.BrowserPool(1, str(cookies), driver_path="/opt/chromedriver")
+
+    assert pool._driver_path == "/opt/chromedriver"
+
+
+# ---------------- room cards (headless Chrome) ----------------
+def test_read_room_cards(driver, hotel):
+    tripcom.open_dates(driver, hotel, "2026-01-05", "2026-01-06")
+
+    assert tripcom.wait_for_room_cards(driver, timeout=5)
+    assert tripcom.read_room_cards(driver) == CARDS
+
+
+def test_find_room_prices_matches_titles_and_skips_unpriced(driver, hotel):
+    tripcom.open_dates(driver, hotel, "2026-01-05", "2026-01-06")
+    tripcom.wait_for_room_cards(driver, timeout=5)
+
+    found = tripcom.find_room_prices(driver, ["superior double", "DELUXE", "Family Suite", "Penthouse"])
+
+    assert found == {
+        "superior double": CARDS[0],
+        "DELUXE": CARDS[1],
+    }
+    assert tripcom.find_room_block_and_price(driver, "Penthouse") == (None, NA)
+
+
+def test_crawl_week_retries_dates_until_priced(driver, hotel):
+    url = f"{hotel}?sold-out=deluxe@2026-01-05,deluxe@2026-01-06,superior@2026-01-06"
+    superior = (url, "Superior Double")
+    deluxe = (url, "Deluxe Twin")
+    suite = (url, "Family Suite")
+    logged = {(*suite, "2026-01-05"): NA}
+
+    entries = tripcom.crawl_week(OnePool(driver), url, [superior, deluxe, suite], DATES, logged)
+
+    assert entries == [
+        (*superior, "2026-01-05", "Total 1,250,000 ₫"),
+        (*deluxe, "2026-01-05", NA),
+        (*deluxe, "2026-01-06", NA),
+        (*suite, "2026-01-06", NA),
+        (*deluxe, "2026-01-07", "1,800,000 ₫"),
+        (*suite, "2026-01-07", NA),
+    ]
+    logged.update({entry[:3]: entry[3] for entry in entries})
+    assert tripcom.week_price(logged, superior, DATES) == "Total 1,250,000 ₫"
+    assert tripcom.week_price(logged, deluxe, DATES) == "1,800,000 ₫"
+    assert tripcom.week_price(logged, suite, DATES) == NA
+
+
+def test_crawl_week_skips_dates_whose_cards_never_load(driver, stub, monkeypatch):
+    stub.pages["/empty"] = "<html><body>No rooms</body></html>"
+    monkeypatch.setattr(tripcom, "wait_for_room_cards", partial(tripcom.wait_for_room_cards, timeout=0.5))
+
+    entries = tripcom.crawl_week(OnePool(driver), f"{stub.root}/empty", [KEY], DATES[:1], {})
+
+    assert entries == []
+    assert [dict(query(path))["checkIn"] for path, _, _ in stub.requests] == ["2026-01-05"]
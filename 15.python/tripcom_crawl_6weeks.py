@@ -0,0 +1,79 @@
+"""
+Trip.com 6-week competitor price crawl (script form of "Updated_Trip - VAT.ipynb").
+
+    python tripcom_crawl_6weeks.py --login                 # once: save cookies.json
+    python tripcom_crawl_6weeks.py "Competitor Tracking.xlsx" --workers 4
+"""
+import argparse
+
+from mvtools.tripcom import (
+    COOKIES_FILE,
+    FINAL_PREFIX,
+    HOME_URL,
+    INPUT_FILE,
+    NAVIGATION,
+    RESULT_MAX_AGE,
+    RESULTS_LOG,
+    SHEET_NAME,
+    WORKERS,
+    crawl,
+    save_cookies,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl Trip.com room prices for the next 6 weeks")
+    parser.add_argument("input", nargs="?", default=INPUT_FILE, help="Competitor tracking workbook")
+    parser.add_argument("--sheet", default=SHEET_NAME)
+    parser.add_argument("--cookies", default=COOKIES_FILE)
+    parser.add_argument(
+        "--login", action="store_true",
+        help="Open a browser to log in by hand and save the cookies, then exit"
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Browsers running in parallel")
+    parser.add_argument("--visible", action="store_true", help="Show the browser windows")
+    parser.add_argument(
+        "--navigation", choices=NAVIGATION, default="url",
+        help="url: dates as hotel URL parameters, one page load per date; "
+             "calendar: pick dates in the page's date picker"
+    )
+    parser.add_argument(
+        "--log", default=RESULTS_LOG,
+        help="Price log (SQLite); lookups already in it are skipped on rerun"
+    )
+    parser.add_argument(
+        "--max-age-hours", type=float, default=RESULT_MAX_AGE / 3600,
+        help="Logged prices older than this are crawled again"
+    )
+    parser.add_argument("--out-prefix", default=FINAL_PREFIX)
+    parser.add_argument(
+        "--home-url", default=HOME_URL,
+        help="Page the cookies are loaded on (e.g. a local fixture server)"
+    )
+    parser.add_argument(
+        "--driver-path",
+        help="chromedriver to use (default: downloaded by webdriver-manager)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.login:
+        save_cookies(args.cookies)
+        return
+
+    crawl(
+        input_file=args.input,
+        sheet_name=args.sheet,
+        cookies_file=args.cookies,
+        workers=args.workers,
+        headless=not args.visible,
+        results_log=args.log,
+        final_prefix=args.out_prefix,
+        home_url=args.home_url,
+        navigation=args.navigation,
+        max_age=args.max_age_hours * 3600,
+        driver_path=args.driver_path,
+    )
+
+
+if __name__ == "__main__":
+    main()